@@ -0,0 +1,5 @@
+"""
+Benchmarks for the instascrape parsing pipeline. Each module can be run
+directly, e.g. python -m benchmarks.flatten_dict, and python -m
+benchmarks.suite times every scrape stage on the checked-in page corpus
+"""
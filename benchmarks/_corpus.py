@@ -0,0 +1,78 @@
+"""
+The checked-in page corpus the benchmark suite runs on. Every file in
+benchmarks/corpus is the gzipped HTML of one page as it's returned for a
+request to instagram.com, named after the kind of page it is, e.g.
+post.html.gz or profile-large.html.gz, and is scraped with that kind's scraper.
+
+The corpus is written from the page builders in benchmarks._pages so its pages
+have the layout and size of real ones without anybody's data in them. Pages
+saved from instagram.com can be dropped in next to them under the same naming
+scheme. Regenerate the built pages with
+
+    python -m benchmarks._corpus
+"""
+
+import gzip
+import pathlib
+from typing import Dict, Tuple
+
+from instascrape import IGTV, Hashtag, Location, Post, Profile, Reel
+
+from benchmarks._pages import as_html, igtv_page, location_page, login_page, post_page, profile_page, reel_page, tag_page
+
+CORPUS_DIR = pathlib.Path(__file__).parent / "corpus"
+
+# Scraper each kind of page is scraped with, a login redirect is what
+# scraping any page without a valid session returns
+SCRAPERS = {
+    "post": Post,
+    "reel": Reel,
+    "igtv": IGTV,
+    "profile": Profile,
+    "hashtag": Hashtag,
+    "location": Location,
+    "login": Post,
+}
+
+_BUILDERS = {
+    "post": post_page,
+    "reel": reel_page,
+    "igtv": igtv_page,
+    "profile": profile_page,
+    "hashtag": tag_page,
+    "location": location_page,
+    "login": login_page,
+}
+
+
+def page_kind(name: str) -> str:
+    """Return the kind of a corpus page from its name, e.g. profile for profile-large"""
+    return name.split("-", 1)[0]
+
+
+def load_corpus() -> Dict[str, Tuple[type, str]]:
+    """Return the scraper class and HTML of every page in the corpus keyed by page name"""
+    corpus = {}
+    for path in sorted(CORPUS_DIR.glob("*.html.gz")):
+        name = path.name[: -len(".html.gz")]
+        kind = page_kind(name)
+        if kind not in SCRAPERS:
+            raise ValueError(f"{path.name} isn't named after a kind of page, use one of {', '.join(SCRAPERS)}")
+        with gzip.open(path, "rt", encoding="utf-8") as infile:
+            corpus[name] = (SCRAPERS[kind], infile.read())
+    return corpus
+
+
+def write_corpus() -> None:
+    """Write the built pages of the corpus, leaving any other page in it untouched"""
+    CORPUS_DIR.mkdir(exist_ok=True)
+    for kind, builder in _BUILDERS.items():
+        path = CORPUS_DIR / f"{kind}.html.gz"
+        # mtime=0 keeps the archive identical between runs
+        with open(path, "wb") as outfile, gzip.GzipFile(fileobj=outfile, mode="wb", mtime=0) as gzfile:
+            gzfile.write(as_html(builder()).encode("utf-8"))
+        print(f"wrote {path.relative_to(CORPUS_DIR.parent.parent)} ({path.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    write_corpus()
@@ -0,0 +1,337 @@
+"""
+Synthetic Instagram pages shaped like the JSON served back by instagram.com so
+the parsing pipeline can be measured without making any requests
+"""
+
+import json
+from typing import Any, Dict
+
+JSONDict = Dict[str, Any]
+
+_CONFIG = {
+    "csrf_token": "bGtbKMiHk2wPlTPbWqjUB1HjTDzH1Y2f",
+    "viewer": None,
+    "viewerId": None,
+}
+
+
+def _user(i: int) -> JSONDict:
+    return {
+        "full_name": f"Tagged User {i}",
+        "id": str(1000 + i),
+        "is_verified": i % 2 == 0,
+        "profile_pic_url": f"https://scontent.cdninstagram.com/v/t51.2885-19/{i}_n.jpg",
+        "username": f"tagged_user_{i}",
+    }
+
+
+def _comment(i: int, replies: int = 0) -> JSONDict:
+    return {
+        "node": {
+            "id": str(17850000000000000 + i),
+            "text": f"Comment number {i} #benchmark",
+            "created_at": 1609459200 + i,
+            "did_report_as_spam": False,
+            "owner": {
+                "id": str(2000 + i),
+                "is_verified": False,
+                "profile_pic_url": f"https://scontent.cdninstagram.com/v/t51.2885-19/c{i}_n.jpg",
+                "username": f"commenter_{i}",
+            },
+            "viewer_has_liked": False,
+            "edge_liked_by": {"count": i % 13},
+            "is_restricted_pending": False,
+            "edge_threaded_comments": {
+                "count": replies,
+                "page_info": {"has_next_page": False, "end_cursor": None},
+                "edges": [_comment(i * 100 + j) for j in range(replies)],
+            },
+        }
+    }
+
+
+def _resources(url: str) -> list:
+    return [
+        {"src": f"{url}?w={width}", "config_width": width, "config_height": width}
+        for width in (150, 240, 320, 480, 640)
+    ]
+
+
+def _media_node(i: int, owner_id: str = "787132", tagged: int = 2) -> JSONDict:
+    display_url = f"https://scontent.cdninstagram.com/v/t51.2885-15/e35/{i}_n.jpg"
+    return {
+        "__typename": "GraphImage",
+        "id": str(2400000000000000000 + i),
+        "shortcode": f"CJpB{i:07d}",
+        "dimensions": {"height": 1080, "width": 1080},
+        "display_url": display_url,
+        "edge_media_to_tagged_user": {"edges": [{"node": {"user": _user(j), "x": 0.5, "y": 0.5}} for j in range(tagged)]},
+        "fact_check_overall_rating": None,
+        "fact_check_information": None,
+        "gating_info": None,
+        "sharing_friction_info": {"should_have_sharing_friction": False, "bloks_app_url": None},
+        "media_overlay_info": None,
+        "media_preview": "ACoqzqKKKAP/2Q==",
+        "owner": {"id": owner_id, "username": "benchmark_profile"},
+        "is_video": False,
+        "accessibility_caption": f"Photo {i} by benchmark_profile.",
+        "edge_media_to_caption": {"edges": [{"node": {"text": f"Caption for post {i} #instascrape #python"}}]},
+        "edge_media_to_comment": {"count": 10 + i},
+        "comments_disabled": False,
+        "taken_at_timestamp": 1609459200 - i * 3600,
+        "edge_liked_by": {"count": 100 + i},
+        "edge_media_preview_like": {"count": 100 + i},
+        "location": None,
+        "thumbnail_src": display_url,
+        "thumbnail_resources": _resources(display_url),
+    }
+
+
+def _edges(amount: int, **kwargs) -> JSONDict:
+    return {
+        "count": amount * 10,
+        "page_info": {"has_next_page": True, "end_cursor": "QVFDbXJ0dGNfZ2ZpUnFaT2"},
+        "edges": [{"node": _media_node(i, **kwargs)} for i in range(amount)],
+    }
+
+
+def _shared_data(page_type: str, page_json: JSONDict) -> JSONDict:
+    return {
+        "config": dict(_CONFIG),
+        "country_code": "US",
+        "language_code": "en",
+        "locale": "en_US",
+        "entry_data": {page_type: [page_json]},
+        "hostname": "www.instagram.com",
+        "is_whitelisted_crawl_bot": False,
+        "deployment_stage": "c2",
+        "platform": "web",
+        "rollout_hash": "0c1ab0c2c1a8",
+    }
+
+
+def post_page(comments: int = 24, replies: int = 2, tagged: int = 2) -> JSONDict:
+    """Return the JSON of a post page with the given amount of comments"""
+    media = _media_node(0, tagged=tagged)
+    display_url = media["display_url"]
+    media.update(
+        {
+            "display_resources": _resources(display_url),
+            "tracking_token": "eyJ2ZXJzaW9uIjo1fQ==",
+            "caption_is_edited": False,
+            "has_ranked_comments": True,
+            "edge_media_to_parent_comment": {
+                "count": comments,
+                "page_info": {"has_next_page": True, "end_cursor": "QVFBZ2N6cXhZ"},
+                "edges": [_comment(i, replies=replies) for i in range(comments)],
+            },
+            "commenting_disabled_for_viewer": False,
+            "edge_media_preview_like": {"count": 4523, "edges": []},
+            "location": {"id": "212988663", "has_public_page": True, "name": "New York, New York", "slug": "new-york-new-york"},
+            "viewer_has_liked": False,
+            "viewer_has_saved": False,
+            "viewer_has_saved_to_collection": False,
+            "viewer_in_photo_of_you": False,
+            "viewer_can_reshare": True,
+            "owner": {
+                "id": "787132",
+                "is_verified": True,
+                "profile_pic_url": "https://scontent.cdninstagram.com/v/t51.2885-19/owner_n.jpg",
+                "username": "benchmark_profile",
+                "full_name": "Benchmark Profile",
+                "is_private": False,
+                "edge_owner_to_timeline_media": {"count": 1234},
+                "edge_followed_by": {"count": 56789},
+            },
+            "is_ad": False,
+        }
+    )
+    return _shared_data("PostPage", {"graphql": {"shortcode_media": media}})
+
+
+def _video_page(product_type: str, comments: int, replies: int) -> JSONDict:
+    json_dict = post_page(comments=comments, replies=replies)
+    media = json_dict["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]
+    media.update(
+        {
+            "__typename": "GraphVideo",
+            "product_type": product_type,
+            "is_video": True,
+            "has_audio": True,
+            "video_url": "https://scontent.cdninstagram.com/v/t50.2886-16/0_n.mp4",
+            "video_view_count": 48213,
+            "video_play_count": 91377,
+            "video_duration": 29.9,
+            "dash_info": {"is_dash_eligible": True, "video_dash_manifest": None, "number_of_qualities": 3},
+            "encoding_status": None,
+            "is_published": True,
+            "title": "Benchmark video" if product_type == "igtv" else "",
+        }
+    )
+    return json_dict
+
+
+def reel_page(comments: int = 24, replies: int = 2) -> JSONDict:
+    """Return the JSON of a reel page with the given amount of comments"""
+    return _video_page("clips", comments, replies)
+
+
+def igtv_page(comments: int = 24, replies: int = 2) -> JSONDict:
+    """Return the JSON of an IGTV page with the given amount of comments"""
+    return _video_page("igtv", comments, replies)
+
+
+def profile_page(posts: int = 12) -> JSONDict:
+    """Return the JSON of a profile page with the given amount of timeline edges"""
+    user = {
+        "biography": "Benchmarking instascrape",
+        "blocked_by_viewer": False,
+        "restricted_by_viewer": None,
+        "country_block": False,
+        "external_url": "https://github.com/chris-greening/instascrape",
+        "external_url_linkshimmed": "https://l.instagram.com/?u=https%3A%2F%2Fgithub.com",
+        "edge_followed_by": {"count": 56789},
+        "fbid": "17841400000000000",
+        "followed_by_viewer": False,
+        "edge_follow": {"count": 321},
+        "follows_viewer": False,
+        "full_name": "Benchmark Profile",
+        "has_ar_effects": False,
+        "has_clips": True,
+        "has_guides": False,
+        "has_channel": False,
+        "has_blocked_viewer": False,
+        "highlight_reel_count": 3,
+        "has_requested_viewer": False,
+        "id": "787132",
+        "is_business_account": True,
+        "is_joined_recently": False,
+        "business_category_name": "Creators & Celebrities",
+        "overall_category_name": None,
+        "category_enum": "PERSONAL_BLOG",
+        "is_private": False,
+        "is_verified": True,
+        "edge_mutual_followed_by": {"count": 0, "edges": []},
+        "profile_pic_url": "https://scontent.cdninstagram.com/v/t51.2885-19/s150x150/owner_n.jpg",
+        "profile_pic_url_hd": "https://scontent.cdninstagram.com/v/t51.2885-19/s320x320/owner_n.jpg",
+        "requested_by_viewer": False,
+        "username": "benchmark_profile",
+        "connected_fb_page": None,
+        "edge_felix_video_timeline": _edges(0),
+        "edge_owner_to_timeline_media": _edges(posts),
+        "edge_saved_media": {"count": 0, "page_info": {"has_next_page": False, "end_cursor": None}, "edges": []},
+        "edge_media_collections": {"count": 0, "page_info": {"has_next_page": False, "end_cursor": None}, "edges": []},
+    }
+    page = {
+        "logging_page_id": "profilePage_787132",
+        "show_suggested_profiles": False,
+        "show_follow_dialog": False,
+        "graphql": {"user": user},
+        "toast_content_on_load": None,
+    }
+    return _shared_data("ProfilePage", page)
+
+
+def tag_page(posts: int = 70, top_posts: int = 9) -> JSONDict:
+    """Return the JSON of a hashtag page with the given amount of media edges"""
+    hashtag = {
+        "id": "17841563269101393",
+        "name": "benchmark",
+        "allow_following": True,
+        "is_following": False,
+        "is_top_media_only": False,
+        "profile_pic_url": "https://scontent.cdninstagram.com/v/t51.2885-15/e35/tag_n.jpg",
+        "edge_hashtag_to_media": _edges(posts),
+        "edge_hashtag_to_top_posts": {"edges": [{"node": _media_node(i)} for i in range(top_posts)]},
+        "edge_hashtag_to_content_advisory": {"count": 0, "edges": []},
+        "edge_hashtag_to_related_tags": {"edges": []},
+        "edge_hashtag_to_null_state": {"edges": []},
+    }
+    return _shared_data("TagPage", {"graphql": {"hashtag": hashtag}})
+
+
+def location_page(posts: int = 24, top_posts: int = 9) -> JSONDict:
+    """Return the JSON of a location page with the given amount of media edges"""
+    location = {
+        "id": "212988663",
+        "name": "New York, New York",
+        "has_public_page": True,
+        "lat": 40.7142,
+        "lng": -74.0064,
+        "slug": "new-york-new-york",
+        "blurb": "",
+        "website": "",
+        "phone": "",
+        "primary_alias_on_fb": "NewYorkNY",
+        "address_json": json.dumps({"street_address": "", "zip_code": "", "city_name": "New York, New York"}),
+        "profile_pic_url": "https://scontent.cdninstagram.com/v/t51.2885-15/e35/location_n.jpg",
+        "edge_location_to_media": _edges(posts),
+        "edge_location_to_top_posts": {"count": top_posts, "edges": [{"node": _media_node(i)} for i in range(top_posts)]},
+        "directory": {"country": {"id": "US", "name": "United States", "slug": "united-states"}},
+    }
+    return _shared_data("LocationsPage", {"graphql": {"location": location}})
+
+
+def login_page() -> JSONDict:
+    """Return the JSON of the login page Instagram redirects to"""
+    return _shared_data("LoginAndSignupPage", {"captcha": {"enabled": False, "key": ""}, "gdpr_required": False})
+
+
+PAGES = {
+    "PostPage": post_page,
+    "ProfilePage": profile_page,
+    "TagPage": tag_page,
+    "LocationsPage": location_page,
+    "LoginAndSignupPage": login_page,
+}
+
+
+_FILLER_SCRIPT = "(function(){var modules={};" + "".join(
+    f"modules['m{i}']=function(e,t,n){{'use strict';n.d(t,'a',function(){{return {i}}})}};" for i in range(400)
+) + "})();"
+
+_FILLER_STYLE = "".join(f".x{i:04x}{{margin:{i % 17}px;padding:{i % 5}px;color:#{i:06x}}}" for i in range(2000))
+
+
+def as_html(json_dict: JSONDict, additional_data: JSONDict = None) -> str:
+    """
+    Wrap page JSON in HTML laid out like an Instagram page: meta and link tags,
+    inline styles and bundled scripts around the window._sharedData script and
+    optionally a window.__additionalDataLoaded script
+    """
+    head = "".join(
+        f'<link rel="preload" href="/static/bundles/es6/Consumer{i}.js/{i:012x}.js" as="script" type="text/javascript" crossorigin="anonymous" />\n'
+        for i in range(40)
+    )
+    meta = "".join(f'<meta property="og:tag{i}" content="Benchmark content {i}" />\n' for i in range(60))
+    body = "".join(
+        f'<div class="Nnq7C weEfm"><div class="v1Nh3 kIKUG _bz0w"><a href="/p/CJpB{i:07d}/"><div class="eLAPa">'
+        f'<div class="KL4Bh"><img alt="Photo {i}" class="FFVAD" src="https://scontent.cdninstagram.com/{i}.jpg" /></div>'
+        f'</div></a></div></div>\n'
+        for i in range(200)
+    )
+    scripts = [f'<script type="text/javascript">window._sharedData = {json.dumps(json_dict)};</script>']
+    if additional_data is not None:
+        scripts.append(
+            f'<script type="text/javascript">window.__additionalDataLoaded(\'/p/CJpB0000000/\',{json.dumps(additional_data)});</script>'
+        )
+    return (
+        '<!DOCTYPE html>\n<html lang="en" class="no-js not-logged-in client-root">\n<head>\n'
+        '<meta charset="utf-8">\n<title>Instagram</title>\n'
+        f"{meta}{head}<style>{_FILLER_STYLE}</style>\n</head>\n"
+        '<body class="">\n<span id="react-root">\n'
+        f"{body}</span>\n"
+        f'<script type="text/javascript">{_FILLER_SCRIPT}</script>\n'
+        + "\n".join(scripts)
+        + '\n<script type="text/javascript">window.__initialDataLoaded(window._sharedData);</script>\n'
+        '<script type="text/javascript" src="/static/bundles/es6/Vendor.js/c911f5848b78.js" crossorigin="anonymous"></script>\n'
+        "</body>\n</html>\n"
+    )
+
+
+def html_pages() -> Dict[str, str]:
+    """Return the HTML of one page of every type"""
+    pages = {page_type: as_html(page_func()) for page_type, page_func in PAGES.items()}
+    post_json = post_page()
+    pages["PostPage (logged in)"] = as_html(post_json, additional_data=post_json["entry_data"]["PostPage"][0])
+    return pages
@@ -0,0 +1,47 @@
+"""
+Helpers shared by the benchmark scripts for timing, measuring peak memory and
+printing results
+"""
+
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+
+def measure(func: Callable, *args: Any, repeat: int = 5, **kwargs: Any) -> Tuple[float, int]:
+    """
+    Return the best wall time in seconds out of `repeat` calls and the peak
+    memory in bytes allocated during a single call
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def print_table(headers: List[str], rows: List[List[Any]]) -> None:
+    """Print rows as a plain-text table aligned under the headers"""
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)).rstrip())
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f} ms"
+
+
+def mb(amount: int) -> str:
+    return f"{amount / 2 ** 20:.2f} MB"
@@ -0,0 +1,54 @@
+"""
+Compare building the posts of a 70 post hashtag page one edge at a time, as
+get_recent_posts used to with a Post.scrape per edge, against decoding all of
+the edges in one batch and building Post objects from it
+
+    python -m benchmarks.edge_decoder
+"""
+
+import warnings
+
+from instascrape import Hashtag, Post, decode_edges
+from instascrape.core._mappings import _PostMapping
+from instascrape.exceptions.exceptions import MissingCookiesWarning
+
+from benchmarks._pages import tag_page
+from benchmarks._utils import mb, measure, ms, print_table
+
+POSTS = 70
+
+
+def _scrape_each_edge(edges):
+    mapping = _PostMapping.compile_post_from_hashtag_mapping()
+    posts = []
+    for edge in edges:
+        post = Post(edge["node"])
+        post.scrape(mapping=mapping)
+        posts.append(post)
+    return posts
+
+
+def main() -> None:
+    warnings.simplefilter("ignore", MissingCookiesWarning)
+    hashtag = Hashtag(tag_page(posts=POSTS))
+    hashtag.scrape()
+    edges = hashtag.json_dict["entry_data"]["TagPage"][0]["graphql"]["hashtag"]["edge_hashtag_to_media"]["edges"]
+    mapping = _PostMapping.compile_post_from_hashtag_mapping()
+
+    cases = {
+        "Post.scrape per edge": lambda: _scrape_each_edge(edges),
+        "decode_edges (columns)": lambda: decode_edges(edges, mapping),
+        "decode_edges + Posts": lambda: decode_edges(edges, mapping).posts(),
+        "get_recent_posts": lambda: hashtag.get_recent_posts(POSTS),
+    }
+    baseline = None
+    rows = []
+    for name, func in cases.items():
+        seconds, peak = measure(func, repeat=20)
+        baseline = baseline or seconds
+        rows.append([name, ms(seconds), f"{seconds / POSTS * 1e6:.1f} us", mb(peak), f"{baseline / seconds:.1f}x"])
+    print_table(["70 post tag page", "time", "per post", "peak memory", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Compare finding the page JSON in HTML with the "soup" extractor, which
+parses the whole page with BeautifulSoup, against the "scanner" extractor,
+which scans the raw HTML string for the script payloads
+
+    python -m benchmarks.extractors
+"""
+
+from instascrape.scrapers.scrape_tools import json_from_html
+
+from benchmarks._pages import html_pages
+from benchmarks._utils import mb, measure, ms, print_table
+
+
+def main() -> None:
+    rows = []
+    for name, html in html_pages().items():
+        assert json_from_html(html, extractor="soup") == json_from_html(html, extractor="scanner")
+        soup_time, soup_peak = measure(json_from_html, html, extractor="soup")
+        scanner_time, scanner_peak = measure(json_from_html, html, extractor="scanner")
+        rows.append(
+            [
+                name,
+                f"{len(html) // 1024} KB",
+                ms(soup_time),
+                ms(scanner_time),
+                f"{soup_time / scanner_time:.1f}x",
+                mb(soup_peak),
+                mb(scanner_peak),
+            ]
+        )
+    print_table(["page", "html", "soup", "scanner", "speedup", "soup peak", "scanner peak"], rows)
+
+
+if __name__ == "__main__":
+    main()
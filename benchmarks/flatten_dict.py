@@ -0,0 +1,50 @@
+"""
+Compare the "tree" and "iterative" engines of flatten_dict on increasingly
+large Profile and Tag pages
+
+    python -m benchmarks.flatten_dict
+"""
+
+from instascrape.scrapers.scrape_tools import flatten_dict
+
+from benchmarks._pages import post_page, profile_page, tag_page
+from benchmarks._utils import mb, measure, ms, print_table
+
+ENGINES = ["tree", "iterative"]
+CASES = [
+    ("PostPage, 24 comments", post_page, {"comments": 24}),
+    ("PostPage, 500 comments", post_page, {"comments": 500}),
+    ("ProfilePage, 12 posts", profile_page, {"posts": 12}),
+    ("ProfilePage, 200 posts", profile_page, {"posts": 200}),
+    ("TagPage, 70 posts", tag_page, {"posts": 70}),
+    ("TagPage, 500 posts", tag_page, {"posts": 500}),
+]
+
+
+def main() -> None:
+    rows = []
+    for name, page_func, kwargs in CASES:
+        json_dict = page_func(**kwargs)
+        results = {engine: flatten_dict(json_dict, engine=engine) for engine in ENGINES}
+        assert results["tree"] == results["iterative"], f"engines disagree on {name}"
+        assert list(results["tree"]) == list(results["iterative"]), f"key order differs on {name}"
+
+        timings = {engine: measure(flatten_dict, json_dict, engine=engine) for engine in ENGINES}
+        tree_time, tree_peak = timings["tree"]
+        iter_time, iter_peak = timings["iterative"]
+        rows.append(
+            [
+                name,
+                len(results["tree"]),
+                ms(tree_time),
+                ms(iter_time),
+                f"{tree_time / iter_time:.1f}x",
+                mb(tree_peak),
+                mb(iter_peak),
+            ]
+        )
+    print_table(["page", "keys", "tree", "iterative", "speedup", "tree peak", "iterative peak"], rows)
+
+
+if __name__ == "__main__":
+    main()
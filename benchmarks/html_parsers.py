@@ -0,0 +1,47 @@
+"""
+Compare the installed HTML parser backends on building a soup and finding
+the page JSON with the soup extractor
+
+    python -m benchmarks.html_parsers
+"""
+
+from instascrape.core._html_parsers import (
+    available_html_parsers,
+    json_strs_from_html,
+    set_html_parser,
+    soup_from_html,
+)
+
+from benchmarks._pages import html_pages
+from benchmarks._utils import measure, ms, print_table
+
+
+def main() -> None:
+    pages = html_pages()
+    rows = []
+    baseline = {}
+    for parser in available_html_parsers():
+        set_html_parser(parser)
+        soup_time = json_time = 0
+        for name, html in pages.items():
+            if parser != "selectolax":
+                soup_time += measure(soup_from_html, html, repeat=3)[0]
+            json_time += measure(json_strs_from_html, html, repeat=3)[0]
+
+            # Every backend has to find the same data
+            found = json_strs_from_html(html)
+            assert baseline.setdefault(name, found) == found, f"{parser} disagrees on {name}"
+        rows.append(
+            [
+                parser,
+                ms(soup_time) if parser != "selectolax" else "n/a (soup falls back)",
+                ms(json_time),
+            ]
+        )
+    set_html_parser(None)
+    print(f"Totals over {len(pages)} pages")
+    print_table(["backend", "soup", "json (soup extractor)"], rows)
+
+
+if __name__ == "__main__":
+    main()
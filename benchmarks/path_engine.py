@@ -0,0 +1,47 @@
+"""
+Compare scraping already fetched pages with the "iterative" engine, which
+flattens every page, against the "path" engine, which walks every page the
+same way but only keys the leaves that can be one of the mapped keys
+
+    python -m benchmarks.path_engine
+"""
+
+import time
+import warnings
+
+from instascrape import Hashtag, Location, Post, Profile
+from instascrape.core.json_algos import _SUFFIX_CACHE
+
+from benchmarks._pages import location_page, post_page, profile_page, tag_page
+from benchmarks._utils import ms, print_table
+
+PAGES_PER_CASE = 50
+CASES = [
+    ("PostPage", Post, post_page),
+    ("ProfilePage", Profile, profile_page),
+    ("TagPage", Hashtag, tag_page),
+    ("LocationsPage", Location, location_page),
+]
+
+
+def scrape_all(scraper, pages, engine):
+    start = time.perf_counter()
+    for page in pages:
+        scraper(page).scrape(engine=engine)
+    return (time.perf_counter() - start) / len(pages)
+
+
+def main() -> None:
+    warnings.simplefilter("ignore")
+    rows = []
+    for name, scraper, page_func in CASES:
+        pages = [page_func() for _ in range(PAGES_PER_CASE)]
+        _SUFFIX_CACHE.clear()
+        iterative_time = scrape_all(scraper, pages, "iterative")
+        path_time = scrape_all(scraper, pages, "path")
+        rows.append([name, ms(iterative_time), ms(path_time), f"{iterative_time / path_time:.1f}x"])
+    print_table(["page", "iterative / page", "path / page", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the memory retained by a collection of scraped Post objects against
+the same collection held as slotted PostRecords
+
+    python -m benchmarks.records
+"""
+
+import gc
+import tracemalloc
+import warnings
+
+from instascrape import Post
+from instascrape.exceptions.exceptions import MissingCookiesWarning
+
+from benchmarks._pages import as_html, post_page
+from benchmarks._utils import mb, print_table
+
+AMOUNTS = [100, 1000]
+
+
+def _pages(amount: int):
+    html = as_html(post_page(comments=24))
+    for i in range(amount):
+        yield html.replace("CJpB", f"C{i:03d}")
+
+
+def _scraped_posts(amount: int):
+    for html in _pages(amount):
+        post = Post(html)
+        post.scrape()
+        yield post
+
+
+def _retained(build) -> int:
+    """Return the bytes still allocated by what build returns once it's done"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    collection = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del collection
+    return after - before
+
+
+def main() -> None:
+    warnings.simplefilter("ignore", MissingCookiesWarning)
+    rows = []
+    for amount in AMOUNTS:
+        posts = _retained(lambda: list(_scraped_posts(amount)))
+        records = _retained(lambda: [post.to_record() for post in _scraped_posts(amount)])
+        rows.append(
+            [
+                amount,
+                mb(posts),
+                mb(records),
+                f"{posts / amount / 1024:.1f} KB",
+                f"{records / amount / 1024:.1f} KB",
+                f"{posts / records:.0f}x",
+            ]
+        )
+    print_table(["posts", "Post objects", "PostRecords", "per Post", "per record", "smaller"], rows)
+
+
+if __name__ == "__main__":
+    main()
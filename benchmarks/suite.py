@@ -0,0 +1,135 @@
+"""
+Time every stage of scraping each page of the checked-in corpus and the peak
+memory it takes, without any network access: extracting the JSON from the
+HTML, flatten_dict, parse_data_from_json, the whole scrape and
+get_recent_posts on pages that have posts. The login redirect page is timed
+up to the InstagramLoginRedirectError it raises.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json
+
+With --compare the run fails if a stage got slower or uses more memory than
+the saved run by more than --tolerance
+"""
+
+import argparse
+import json
+import sys
+import warnings
+from typing import Callable, Dict, List, Tuple
+
+from instascrape.exceptions.exceptions import InstagramLoginRedirectError
+from instascrape.scrapers.scrape_tools import flatten_dict, json_from_html, parse_data_from_json
+
+from benchmarks._corpus import load_corpus, page_kind
+from benchmarks._utils import mb, measure, ms, print_table
+
+Results = Dict[str, Dict[str, float]]
+
+# Differences below these are timer and allocator noise rather than
+# regressions, they matter on stages that take a few microseconds
+NOISE_FLOOR = {"seconds": 50e-6, "peak": 16 * 1024}
+
+
+def _scrape(scraper_cls: type, html: str):
+    scraper = scraper_cls(html)
+    scraper.scrape()
+    return scraper
+
+
+def _redirect(scraper_cls: type, html: str) -> None:
+    try:
+        scraper_cls(html).scrape()
+    except InstagramLoginRedirectError:
+        return
+    raise AssertionError("the login page didn't raise InstagramLoginRedirectError")
+
+
+def stages(scraper_cls: type, name: str, html: str) -> List[Tuple[str, Callable]]:
+    """Return the name and a callable of every stage timed for a page"""
+    if page_kind(name) == "login":
+        return [
+            ("json_from_html", lambda: json_from_html(html)),
+            ("scrape (redirect)", lambda: _redirect(scraper_cls, html)),
+        ]
+
+    json_dicts = json_from_html(html)
+    json_dict = json_dicts[0] if len(json_dicts) == 1 else json_dicts[1]
+    mapping = scraper_cls._Mapping.compile_mapping()
+    flat_keys = mapping.flat_keys + scraper_cls._EXTRA_FLAT_KEYS
+    flat_json_dict = flatten_dict(json_dict, keys=flat_keys)
+    page_stages = [
+        ("json_from_html", lambda: json_from_html(html)),
+        ("flatten_dict", lambda: flatten_dict(json_dict, keys=flat_keys)),
+        ("parse_data_from_json", lambda: parse_data_from_json(flat_json_dict, mapping, nested_json_dict=json_dict)),
+        ("scrape", lambda: _scrape(scraper_cls, html)),
+    ]
+    if hasattr(scraper_cls, "get_recent_posts"):
+        scraper = _scrape(scraper_cls, html)
+        page_stages.append(("get_recent_posts", scraper.get_recent_posts))
+    return page_stages
+
+
+def run(repeat: int) -> Results:
+    """Time every stage of every corpus page, keyed by "page/stage" """
+    results = {}
+    for name, (scraper_cls, html) in load_corpus().items():
+        for stage, func in stages(scraper_cls, name, html):
+            seconds, peak = measure(func, repeat=repeat)
+            results[f"{name}/{stage}"] = {"seconds": seconds, "peak": peak}
+    return results
+
+
+def regressions(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    """Return a line for every stage that got slower or uses more memory than in baseline"""
+    lines = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric, fmt in (("seconds", ms), ("peak", mb)):
+            before, after = baseline[key][metric], result[metric]
+            if before and after > before * (1 + tolerance) and after - before > NOISE_FLOOR[metric]:
+                lines.append(f"{key} {metric}: {fmt(before)} -> {fmt(after)} ({after / before:.2f}x)")
+    return lines
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="calls per stage, the fastest one is reported")
+    parser.add_argument("--save", metavar="PATH", help="write the results to a JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="fail on regressions against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown as a fraction, default 0.25")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore")
+    results = run(args.repeat)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as infile:
+            baseline = json.load(infile)
+    rows = []
+    for key, result in results.items():
+        page, stage = key.split("/", 1)
+        row = [page, stage, ms(result["seconds"]), mb(result["peak"])]
+        if baseline:
+            before = baseline.get(key, {}).get("seconds")
+            row.append(f"{result['seconds'] / before:.2f}x" if before else "new")
+        rows.append(row)
+    print_table(["page", "stage", "time", "peak memory"] + (["vs baseline"] if baseline else []), rows)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as outfile:
+            json.dump(results, outfile, indent=2)
+    if baseline:
+        lines = regressions(results, baseline, args.tolerance)
+        if lines:
+            print(f"\n{len(lines)} regression(s) beyond {args.tolerance:.0%}:")
+            print("\n".join(lines))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Asyncio counterparts of the scraping pipeline. Pages are fetched with aiohttp
+and then parsed by the same scrape() every scraper already uses, so mappings,
+engines and extractors behave identically.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlparse
+
+from instascrape.core._backoff import AdaptiveRateController
+from instascrape.core._page_cache import get_page_cache
+from instascrape.core._rate_limit import TokenBucket
+from instascrape.exceptions.exceptions import InstagramRateLimitError
+
+DEFAULT_HEADERS = {
+    "user-agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Mobile Safari/537.36 Edg/87.0.664.57"
+}
+
+
+class HostRateLimiter:
+    """
+    Keeps one TokenBucket per host so requests to each host are limited to
+    `rate` per second with bursts of up to `burst`
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        try:
+            return self.buckets[host]
+        except KeyError:
+            return self.buckets.setdefault(host, TokenBucket(self.rate, self.burst))
+
+    async def wait(self, url: str) -> None:
+        """Wait until a request to the URL's host is allowed"""
+        delay = self.bucket(url).reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class _PrefetchedPage:
+    """
+    Webdriver-like stand in handed to scrape() as its session so it parses
+    HTML that was already fetched asynchronously instead of requesting it
+    """
+
+    def __init__(self, html: str) -> None:
+        self.page_source = html
+
+    def get(self, url: str) -> None:
+        pass
+
+
+def _require_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError(
+            "Asynchronous scraping requires aiohttp, install it with pip install insta-scrape[async]"
+        ) from None
+    return aiohttp
+
+
+async def fetch_html(url: str, headers: dict, session: "aiohttp.ClientSession", limiter: HostRateLimiter = None) -> str:
+    """Return HTML from requested URL without blocking the event loop"""
+    _, html = await _fetch_page(url, headers=headers, session=session, limiter=limiter)
+    return html
+
+
+async def _fetch_page(
+    url: str, headers: dict, session: "aiohttp.ClientSession", limiter: HostRateLimiter = None
+) -> Tuple[int, str]:
+    """Return the response status and HTML from requested URL"""
+    if limiter is not None:
+        await limiter.wait(url)
+    async with session.get(url, headers=headers) as response:
+        if response.status == 429:
+            raise InstagramRateLimitError
+        return response.status, await response.text()
+
+
+async def ascrape(
+    scraper: "_StaticHtmlScraper",
+    headers: dict = DEFAULT_HEADERS,
+    session: "aiohttp.ClientSession" = None,
+    limiter: HostRateLimiter = None,
+    **scrape_kwargs: Any,
+) -> Any:
+    """Fetch the scraper's page asynchronously, or take it from the page cache, then scrape it with scraper.scrape"""
+    url = scraper._source_url()
+    prefetched = None
+    if url is not None:
+        cache = get_page_cache()
+        html = cache.get(url, headers) if cache is not None else None
+        if html is None:
+            if session is None:
+                aiohttp = _require_aiohttp()
+                async with aiohttp.ClientSession() as session:
+                    status, html = await _fetch_page(url, headers=headers, session=session, limiter=limiter)
+            else:
+                status, html = await _fetch_page(url, headers=headers, session=session, limiter=limiter)
+            if cache is not None and status == 200:
+                cache.set(url, html, headers)
+        prefetched = _PrefetchedPage(html)
+    return scraper.scrape(headers=headers, session=prefetched, **scrape_kwargs)
+
+
+async def scrape_many(
+    scrapers: Iterable["_StaticHtmlScraper"],
+    concurrency: int = 20,
+    rate_limit: float = None,
+    burst: int = 1,
+    headers: dict = DEFAULT_HEADERS,
+    session: "aiohttp.ClientSession" = None,
+    return_exceptions: bool = False,
+    controller: AdaptiveRateController = None,
+    **scrape_kwargs: Any,
+) -> List[Any]:
+    """
+    Scrape many scrapers concurrently on the running event loop
+
+    Parameters
+    ----------
+    scrapers : Iterable[_StaticHtmlScraper]
+        Post, Profile, Hashtag, etc. objects to scrape
+    concurrency : int
+        Maximum amount of requests in flight at once
+    rate_limit : float
+        Maximum requests per second to any one host, unlimited if None
+    burst : int
+        Amount of requests per host allowed at once before rate_limit applies
+    headers : Dict[str, str]
+        Dictionary of request headers to be passed on every GET request
+    session : aiohttp.ClientSession
+        Session for making the requests, one sized for concurrency is created
+        and closed if None
+    return_exceptions : bool
+        Return exceptions in place of failed scrapes instead of raising the
+        first one
+    controller : AdaptiveRateController
+        Backs off and eventually stops requesting with the session once
+        Instagram redirects to login, serves error pages or rate limits it
+    scrape_kwargs
+        Passed on to each scraper's scrape method, e.g. keys or engine
+
+    Returns
+    -------
+    scraped : List[_StaticHtmlScraper]
+        Scraped objects in the same order as scrapers. These are the given
+        objects themselves unless inplace=False was passed
+    """
+    aiohttp = _require_aiohttp()
+    scrapers = list(scrapers)
+    limiter = HostRateLimiter(rate_limit, burst) if rate_limit is not None else None
+    semaphore = asyncio.Semaphore(concurrency)
+    owns_session = session is None
+    if owns_session:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency))
+
+    key = controller.session_key(headers, session) if controller is not None else None
+
+    async def _scrape(scraper):
+        if controller is not None:
+            await controller.async_wait(key)
+        async with semaphore:
+            try:
+                result = await ascrape(scraper, headers=headers, session=session, limiter=limiter, **scrape_kwargs)
+            except Exception as e:
+                if controller is not None:
+                    controller.record_failure(key, e)
+                raise
+        if controller is not None:
+            controller.record_success(key)
+        return scraper if result is None else result
+
+    try:
+        return await asyncio.gather(*(_scrape(scraper) for scraper in scrapers), return_exceptions=return_exceptions)
+    finally:
+        if owns_session:
+            await session.close()
@@ -0,0 +1,258 @@
+"""
+Adaptive backoff and circuit breaking for when Instagram starts redirecting
+to the login page, serving error pages or answering with HTTP 429
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from instascrape.core._page_cache import cookie_identity
+from instascrape.exceptions.exceptions import (
+    CircuitOpenError,
+    InstagramErrorPageError,
+    InstagramLoginRedirectError,
+    InstagramRateLimitError,
+)
+
+# Exceptions that mean Instagram is pushing back on our requests
+THROTTLE_EXCEPTIONS = (InstagramLoginRedirectError, InstagramErrorPageError, InstagramRateLimitError)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    """Backoff and circuit state of a single session/cookie"""
+
+    __slots__ = (
+        "state",
+        "delay",
+        "consecutive_failures",
+        "total_failures",
+        "total_successes",
+        "opened_at",
+        "open_for",
+        "probing",
+        "last_failure",
+    )
+
+    def __init__(self) -> None:
+        self.state = CLOSED
+        self.delay = 0.0
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.opened_at = None
+        self.open_for = 0.0
+        self.probing = False
+        self.last_failure = None
+
+
+class AdaptiveRateController:
+    """
+    Slows requests down with jittered exponential backoff each time a session
+    is redirected to the login page, served the error page or rate limited,
+    and opens a circuit for that session once it happens repeatedly. After
+    recovery_time a single probe request is let through; success closes the
+    circuit, failure opens it again for twice as long.
+
+    Attributes
+    ----------
+    base_delay : float
+        Delay in seconds after the first failure
+    max_delay : float
+        Upper bound of the backoff delay
+    multiplier : float
+        Growth of the delay per consecutive failure
+    jitter : float
+        Fraction of the delay that is randomized, 0 disables jitter
+    failure_threshold : int
+        Consecutive failures that open the circuit
+    recovery_time : float
+        Seconds the circuit stays open before probing
+    max_recovery_time : float
+        Upper bound of the open time after failed probes
+
+    Methods
+    -------
+    session_key(headers, session=None) -> str
+        Identify the session/cookie requests are made with
+    before_request(key) -> float
+        Return seconds to wait before requesting, raise CircuitOpenError if
+        the circuit is open
+    wait(key) -> None
+        Block until a request is allowed
+    record_success(key) / record_failure(key, exception) -> None
+        Report the outcome of a request
+    state() -> Dict[str, Dict[str, Any]]
+        Snapshot of every circuit for monitoring
+    """
+
+    def __init__(
+        self,
+        base_delay: float = 5,
+        max_delay: float = 900,
+        multiplier: float = 2,
+        jitter: float = 0.5,
+        failure_threshold: int = 3,
+        recovery_time: float = 600,
+        max_recovery_time: float = 6 * 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.max_recovery_time = max_recovery_time
+        self.clock = clock
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {len(self._circuits)} sessions>"
+
+    @staticmethod
+    def session_key(headers: dict = None, session: Any = None) -> str:
+        """Identify a session by a hash of its sessionid cookie, else by the session object"""
+        identity = cookie_identity(headers)
+        if identity:
+            return "sessionid:" + identity
+        if session is not None:
+            return f"session:{id(session):x}"
+        return "default"
+
+    def before_request(self, key: str) -> float:
+        """Return the seconds to wait before requesting, raise CircuitOpenError if the circuit is open"""
+        with self._lock:
+            circuit = self._circuit(key)
+            if circuit.state == OPEN:
+                retry_after = circuit.opened_at + circuit.open_for - self.clock()
+                if retry_after > 0:
+                    raise CircuitOpenError(retry_after)
+                circuit.state = HALF_OPEN
+                circuit.probing = False
+            if circuit.state == HALF_OPEN:
+                if circuit.probing:
+                    raise CircuitOpenError(max(self.base_delay, 1.0), "Waiting on the probe request to recover")
+                circuit.probing = True
+                return 0.0
+            return circuit.delay
+
+    def wait(self, key: str, stop: threading.Event = None) -> bool:
+        """
+        Block until a request with the session is allowed. Returns False
+        instead if stop is set while waiting, an open circuit can keep the
+        session waiting for as long as recovery_time
+        """
+        # Event.wait returns True once the event is set, time.sleep None
+        sleep = time.sleep if stop is None else stop.wait
+        while True:
+            try:
+                delay = self.before_request(key)
+            except CircuitOpenError as e:
+                if sleep(e.retry_after):
+                    return False
+                continue
+            if delay and sleep(delay):
+                return False
+            return True
+
+    async def async_wait(self, key: str) -> None:
+        """Wait without blocking the event loop until a request with the session is allowed"""
+        while True:
+            try:
+                delay = self.before_request(key)
+            except CircuitOpenError as e:
+                await asyncio.sleep(e.retry_after)
+                continue
+            if delay:
+                await asyncio.sleep(delay)
+            return
+
+    def record_success(self, key: str) -> None:
+        """Reset the backoff and close the circuit after a successful request"""
+        with self._lock:
+            circuit = self._circuit(key)
+            circuit.total_successes += 1
+            circuit.consecutive_failures = 0
+            circuit.delay = 0.0
+            circuit.state = CLOSED
+            circuit.probing = False
+            circuit.open_for = 0.0
+
+    def record_failure(self, key: str, exception: BaseException) -> bool:
+        """
+        Back off after a failed request. Returns True if the exception was a
+        sign of Instagram pushing back. Other exceptions say nothing about
+        throttling so the backoff is left as it is, they only let the next
+        request probe a half open circuit
+        """
+        if not isinstance(exception, THROTTLE_EXCEPTIONS):
+            with self._lock:
+                self._circuit(key).probing = False
+            return False
+        with self._lock:
+            circuit = self._circuit(key)
+            circuit.total_failures += 1
+            circuit.consecutive_failures += 1
+            circuit.last_failure = type(exception).__name__
+            delay = min(self.max_delay, self.base_delay * self.multiplier ** (circuit.consecutive_failures - 1))
+            circuit.delay = delay * (1 - self.jitter * random.random())
+            if circuit.state == HALF_OPEN:
+                self._open(circuit, min(self.max_recovery_time, circuit.open_for * 2))
+            elif circuit.consecutive_failures >= self.failure_threshold:
+                self._open(circuit, self.recovery_time)
+        return True
+
+    def call(self, key: str, func: Callable, *args: Any, stop: threading.Event = None, **kwargs: Any) -> Any:
+        """
+        Wait for the session, call func, and record how it went. Returns None
+        without calling func if stop is set while waiting
+        """
+        if not self.wait(key, stop):
+            return None
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(key, e)
+            raise
+        self.record_success(key)
+        return result
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot of every session's circuit for monitoring"""
+        now = self.clock()
+        with self._lock:
+            return {
+                key: {
+                    "state": circuit.state,
+                    "delay": circuit.delay,
+                    "consecutive_failures": circuit.consecutive_failures,
+                    "total_failures": circuit.total_failures,
+                    "total_successes": circuit.total_successes,
+                    "last_failure": circuit.last_failure,
+                    "retry_in": max(0.0, circuit.opened_at + circuit.open_for - now) if circuit.state == OPEN else 0.0,
+                }
+                for key, circuit in self._circuits.items()
+            }
+
+    def _circuit(self, key: str) -> _Circuit:
+        try:
+            return self._circuits[key]
+        except KeyError:
+            circuit = self._circuits[key] = _Circuit()
+            return circuit
+
+    def _open(self, circuit: _Circuit, open_for: float) -> None:
+        circuit.state = OPEN
+        circuit.opened_at = self.clock()
+        circuit.open_for = open_for
+        circuit.probing = False
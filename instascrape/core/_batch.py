@@ -0,0 +1,503 @@
+"""
+Batch parsing of saved Instagram pages. A directory, zip or tar archive of
+saved HTML is walked, each page's type is detected from its JSON and the page
+is parsed with the matching scraper on a pool of processes, chunks of pages
+at a time, while the rows are streamed to one NDJSON or Parquet file per kind
+of page. Nothing is requested, so archived pages can be re-parsed whenever a
+mapping changes.
+
+    python -m instascrape.core._batch pages.zip parsed/ --format parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tarfile
+import time
+import warnings
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from instascrape.core._export import (
+    DEFAULT_BATCH_SIZE,
+    _require_pyarrow,
+    _row_batches,
+    _write_ndjson_rows,
+    arrow_schema,
+    export_rows,
+    export_schema,
+)
+from instascrape.core._mappings import _MetaMapping
+from instascrape.core.json_algos import _scan_json_str
+from instascrape.exceptions.exceptions import MissingCookiesWarning, MissingSessionIDWarning
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Saved pages are recognised by their extension, optionally gzipped
+PAGE_SUFFIXES = (".html", ".htm", ".html.gz", ".htm.gz")
+
+# A page is read where it's parsed: a file's path, or a zip member's archive
+# and name, is all that's sent to a worker. Tar members can only be read in
+# order so their bytes are sent instead
+Page = Tuple[str, ...]
+
+# Reels and IGTV videos are post pages too, told apart by their product type
+_PRODUCT_KINDS = {"clips": "reel", "igtv": "igtv"}
+
+
+def _scrapers() -> Dict[str, type]:
+    """Return the scraper of every kind of page, imported late as the scrapers import core"""
+    from instascrape.scrapers.hashtag import Hashtag
+    from instascrape.scrapers.igtv import IGTV
+    from instascrape.scrapers.location import Location
+    from instascrape.scrapers.post import Post
+    from instascrape.scrapers.profile import Profile
+    from instascrape.scrapers.reel import Reel
+
+    return {"post": Post, "reel": Reel, "igtv": IGTV, "profile": Profile, "hashtag": Hashtag, "location": Location}
+
+
+def _kind_of_mapping(mapping: type) -> Union[str, None]:
+    for kind, scraper_cls in _scrapers().items():
+        if scraper_cls._Mapping is mapping:
+            return kind
+    return None
+
+
+def _is_page(name: str) -> bool:
+    return name.lower().endswith(PAGE_SUFFIXES)
+
+
+def iter_pages(path: str) -> Iterator[Page]:
+    """
+    Yield every saved page under path, a directory walked recursively or a
+    zip or tar archive, in a stable order
+
+    Parameters
+    ----------
+    path : str
+        Directory, .zip or .tar(.gz) archive of saved pages
+
+    Returns
+    -------
+    pages : Iterator[Tuple[str, ...]]
+        Where each page is read from, see read_page and page_name
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if _is_page(name):
+                    yield ("file", os.path.join(root, name))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = [info.filename for info in archive.infolist() if not info.is_dir() and _is_page(info.filename)]
+        for name in names:
+            yield ("zip", path, name)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path, "r:*") as archive:
+            for member in archive:
+                if member.isfile() and _is_page(member.name):
+                    yield ("data", member.name, archive.extractfile(member).read())
+    else:
+        raise ValueError(f"{path} is not a directory, zip or tar archive")
+
+
+# Zip archives stay open in each process for the chunks that follow
+_zip_files: Dict[str, zipfile.ZipFile] = {}
+
+
+def page_name(page: Page) -> str:
+    """Return the name a page yielded by iter_pages is reported under, its path in the archive for zips"""
+    return f"{page[1]}/{page[2]}" if page[0] == "zip" else page[1]
+
+
+def read_page(page: Page) -> bytes:
+    """Return the raw bytes of a page yielded by iter_pages, gunzipped if need be"""
+    if page[0] == "file":
+        with open(page[1], "rb") as infile:
+            data = infile.read()
+    elif page[0] == "zip":
+        archive = _zip_files.get(page[1])
+        if archive is None:
+            archive = _zip_files[page[1]] = zipfile.ZipFile(page[1])
+        data = archive.read(page[2])
+    else:
+        data = page[2]
+    if page_name(page).lower().endswith(".gz"):
+        data = gzip.decompress(data)
+    return data
+
+
+def detect_page(html: str) -> Tuple[str, Union[dict, None]]:
+    """
+    Return the kind of a page, e.g. post or profile, and the JSON it's
+    scraped from. The JSON is picked the way scrape picks it and its type
+    read with determine_json_type, so pages scrape refuses are detected as
+    "LoginAndSignupPage", "HttpErrorPage" or "Inconclusive" instead
+
+    Parameters
+    ----------
+    html : str
+        HTML of a saved page
+
+    Returns
+    -------
+    kind : str
+        Kind of page, e.g. post, reel or profile, else the page type that
+        can't be parsed
+    json_dict : Union[dict, None]
+        JSON data of the page, None if it has none
+    """
+    from instascrape.scrapers.scrape_tools import determine_json_type
+
+    json_strs = _scan_json_str(html)
+    if not json_strs:
+        return "Inconclusive", None
+    json_dict = json.loads(json_strs[0] if len(json_strs) == 1 else json_strs[1])
+    page_type = determine_json_type(json_dict)
+    try:
+        kind = _kind_of_mapping(_MetaMapping.get_mapper(page_type))
+    except KeyError:
+        kind = None
+    if kind is None:
+        return page_type, json_dict
+    if kind == "post":
+        try:
+            media = json_dict["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]
+            kind = _PRODUCT_KINDS.get(media.get("product_type"), kind)
+        except (KeyError, IndexError, TypeError):
+            pass
+    return kind, json_dict
+
+
+class ParsedPage:
+    """Outcome of parsing one saved page"""
+
+    __slots__ = ("name", "kind", "row", "size", "error")
+
+    def __init__(self, name: str, kind: Union[str, None], row: dict = None, size: int = 0, error: str = None) -> None:
+        self.name = name
+        self.kind = kind
+        self.row = row
+        self.size = size
+        self.error = error
+
+    def __repr__(self) -> str:
+        status = f"failed, {self.error}" if self.error is not None else self.kind
+        return f"<{type(self).__name__}: {self.name} {status}>"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def parse_page(page: Page, exclude: List[str] = None) -> ParsedPage:
+    """
+    Read, detect and scrape one page yielded by iter_pages and return its
+    row of exported columns, or why it couldn't be parsed
+    """
+    name = page_name(page)
+    try:
+        data = read_page(page)
+    except Exception as e:  # pylint: disable=broad-except
+        # A corrupt member, e.g. BadZipFile on a bad CRC or zlib.error on
+        # damaged gzip data, only fails its own page
+        return ParsedPage(name, None, error=f"{type(e).__name__}: {e}")
+    kind = None
+    try:
+        kind, json_dict = detect_page(data.decode("utf-8", errors="replace"))
+        scraper_cls = _scrapers().get(kind)
+        if scraper_cls is None:
+            return ParsedPage(name, kind, size=len(data), error=f"{kind} is not a page that can be parsed")
+        scraper = scraper_cls(json_dict)
+        with warnings.catch_warnings():
+            # Nothing is requested so there's no session to warn about
+            warnings.simplefilter("ignore", MissingSessionIDWarning)
+            warnings.simplefilter("ignore", MissingCookiesWarning)
+            scraper.scrape(exclude=exclude, retain="none")
+        row = next(export_rows([scraper], export_schema(scraper_cls, exclude=exclude)))
+    except Exception as e:  # pylint: disable=broad-except
+        return ParsedPage(name, kind, size=len(data), error=f"{type(e).__name__}: {e}")
+    return ParsedPage(name, kind, row, len(data))
+
+
+def _parse_chunk(chunk: List[Page], exclude: List[str]) -> List[ParsedPage]:
+    return [parse_page(page, exclude) for page in chunk]
+
+
+def _chunks(pages: Iterable[Page], chunk_size: int) -> Iterator[List[Page]]:
+    chunk = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_parsed(
+    pages: Union[str, Iterable[Page]],
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    exclude: List[str] = None,
+) -> Iterator[ParsedPage]:
+    """
+    Parse saved pages on a pool of processes and yield each ParsedPage as
+    its chunk finishes, so results arrive in chunk completion order. Only a
+    couple of chunks per worker are queued at once, which keeps memory flat
+    however many pages there are
+
+    Parameters
+    ----------
+    pages : Union[str, Iterable[Tuple[str, ...]]]
+        Directory or archive of saved pages, or pages yielded by iter_pages
+    workers : int
+        Processes to parse with, os.cpu_count() if None and in this process
+        if 0
+    chunk_size : int
+        Pages sent to a worker at a time
+    exclude : List[str]
+        Keys to leave out of every kind of page
+    """
+    if isinstance(pages, str):
+        pages = iter_pages(pages)
+    chunks = _chunks(pages, chunk_size)
+    if workers == 0:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk, exclude)
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(_parse_chunk, chunk, exclude))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+
+class BatchReport:
+    """
+    Counts and throughput of a batch parse, updated as pages are parsed
+
+    Attributes
+    ----------
+    kinds : Counter
+        Pages parsed of every kind
+    failed : int
+        Pages that couldn't be parsed
+    bytes : int
+        Bytes of HTML read
+    seconds : float
+        Wall clock time so far
+    """
+
+    def __init__(self) -> None:
+        self.kinds = Counter()
+        self.failed = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__}: {self.parsed} parsed, {self.failed} failed, "
+            f"{self.pages_per_second:.1f} pages/s, {self.bytes_per_second / 2 ** 20:.2f} MiB/s>"
+        )
+
+    @property
+    def parsed(self) -> int:
+        return sum(self.kinds.values())
+
+    @property
+    def pages(self) -> int:
+        return self.parsed + self.failed
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+class _NdjsonSink:
+    """Rows of every kind of page appended to <kind>.ndjson"""
+
+    suffix = ".ndjson"
+
+    def __init__(self, directory: str, exclude: List[str], batch_size: int) -> None:
+        self.directory = directory
+        self._files: Dict[str, IO[str]] = {}
+
+    def write(self, kind: str, row: dict) -> None:
+        outfile = self._files.get(kind)
+        if outfile is None:
+            fp = os.path.join(self.directory, kind + self.suffix)
+            outfile = self._files[kind] = open(fp, "w", encoding="utf-8")
+        _write_ndjson_rows([row], outfile)
+
+    def close(self) -> None:
+        for outfile in self._files.values():
+            outfile.close()
+
+
+class _ParquetSink:
+    """Rows of every kind of page written to <kind>.parquet, one row group per batch"""
+
+    suffix = ".parquet"
+
+    def __init__(self, directory: str, exclude: List[str], batch_size: int) -> None:
+        self.directory = directory
+        self.exclude = exclude
+        self.batch_size = batch_size
+        self._pa = _require_pyarrow()
+        self._writers: Dict[str, Tuple[Any, list, list]] = {}
+
+    def write(self, kind: str, row: dict) -> None:
+        entry = self._writers.get(kind)
+        if entry is None:
+            schema = export_schema(_scrapers()[kind], exclude=self.exclude)
+            fp = os.path.join(self.directory, kind + self.suffix)
+            writer = self._pa.parquet.ParquetWriter(fp, arrow_schema(schema), compression="zstd")
+            entry = self._writers[kind] = (writer, schema, [])
+        writer, schema, rows = entry
+        rows.append(row)
+        if len(rows) == self.batch_size:
+            self._flush(writer, schema, rows)
+
+    def close(self) -> None:
+        for writer, schema, rows in self._writers.values():
+            self._flush(writer, schema, rows)
+            writer.close()
+
+    @staticmethod
+    def _flush(writer: Any, schema: list, rows: list) -> None:
+        for batch in _row_batches(rows, schema, len(rows) or 1):
+            writer.write_batch(batch)
+        rows.clear()
+
+
+_SINKS = {"ndjson": _NdjsonSink, "parquet": _ParquetSink}
+
+
+def parse_pages(
+    pages: Union[str, Iterable[Page]],
+    directory: str,
+    format: str = "ndjson",
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    exclude: List[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Callable[[BatchReport], None] = None,
+    progress_every: float = 5.0,
+) -> BatchReport:
+    """
+    Parse every saved page of a directory or archive on a pool of processes
+    and stream the rows to one file per kind of page, e.g. post.ndjson and
+    profile.ndjson, with the same columns to_ndjson and to_parquet export.
+    Pages that can't be parsed, login redirects included, are listed in
+    errors.ndjson
+
+    Parameters
+    ----------
+    pages : Union[str, Iterable[Tuple[str, ...]]]
+        Directory or archive of saved pages, or pages yielded by iter_pages
+    directory : str
+        Directory to write to, created if it doesn't exist
+    format : str
+        "ndjson" or "parquet"
+    workers : int
+        Processes to parse with, os.cpu_count() if None and in this process
+        if 0
+    chunk_size : int
+        Pages sent to a worker at a time
+    exclude : List[str]
+        Keys to leave out of every kind of page
+    batch_size : int
+        Rows per Parquet row group
+    progress : Callable[[BatchReport], None]
+        Called with the report every progress_every seconds and once done
+    progress_every : float
+        Seconds between progress calls
+
+    Returns
+    -------
+    report : BatchReport
+        Pages parsed of every kind, failures and throughput
+    """
+    if format not in _SINKS:
+        raise ValueError(f"{format} is not a valid format, use {' or '.join(_SINKS)}")
+    os.makedirs(directory, exist_ok=True)
+    sink = _SINKS[format](directory, exclude, batch_size)
+    report = BatchReport()
+    start = last_progress = time.perf_counter()
+    with open(os.path.join(directory, "errors.ndjson"), "w", encoding="utf-8") as errors:
+        try:
+            for parsed in iter_parsed(pages, workers=workers, chunk_size=chunk_size, exclude=exclude):
+                report.bytes += parsed.size
+                if parsed.ok:
+                    sink.write(parsed.kind, parsed.row)
+                    report.kinds[parsed.kind] += 1
+                else:
+                    _write_ndjson_rows([{"page": parsed.name, "kind": parsed.kind, "error": parsed.error}], errors)
+                    report.failed += 1
+                now = time.perf_counter()
+                report.seconds = now - start
+                if progress is not None and now - last_progress >= progress_every:
+                    progress(report)
+                    last_progress = now
+        finally:
+            sink.close()
+    report.seconds = time.perf_counter() - start
+    if progress is not None:
+        progress(report)
+    return report
+
+
+def _print_progress(report: BatchReport) -> None:
+    kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(report.kinds.items()))
+    print(
+        f"{report.pages} pages ({kinds or 'none parsed'}), {report.failed} failed, "
+        f"{report.pages_per_second:.1f} pages/s, {report.bytes_per_second / 2 ** 20:.2f} MiB/s",
+        file=sys.stderr,
+    )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse a directory or archive of saved Instagram pages")
+    parser.add_argument("pages", help="directory, zip or tar archive of saved pages")
+    parser.add_argument("directory", help="directory to write <kind>.ndjson/.parquet and errors.ndjson to")
+    parser.add_argument("--format", choices=sorted(_SINKS), default="ndjson")
+    parser.add_argument("--workers", type=int, default=None, help="processes to parse with, 0 parses in this one")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="pages sent to a worker at a time")
+    parser.add_argument("--exclude", nargs="*", default=None, help="keys to leave out")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    report = parse_pages(
+        args.pages,
+        args.directory,
+        format=args.format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        exclude=args.exclude,
+        progress=_print_progress,
+        progress_every=args.progress_every,
+    )
+    return 1 if report.failed and not report.parsed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
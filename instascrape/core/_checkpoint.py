@@ -0,0 +1,95 @@
+"""
+Append-only journal of the posts a batch has finished scraping, so a run that
+crashed or was rate limited resumes where it stopped instead of starting over
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Any, Union
+
+_SHORTCODE_RE = re.compile(r"/(?:p|reel|tv)/([^/?#]+)")
+
+
+def post_key(post: Any) -> Union[str, None]:
+    """
+    Return the shortcode a post is journaled under, read from its scraped
+    data, URL or shortcode source. None if it isn't known until the post is
+    scraped, as for html or JSON sources
+    """
+    shortcode = getattr(post, "shortcode", None)
+    if isinstance(shortcode, str):
+        return shortcode
+    source = getattr(post, "source", None)
+    if not isinstance(source, str) or "window._sharedData" in source or source.startswith('{"config"'):
+        return None
+    if "://" in source:
+        match = _SHORTCODE_RE.search(source)
+        return match.group(1) if match else None
+    return source.strip("/")
+
+
+class CheckpointJournal:
+    """
+    Shortcodes of completed posts, one per line in an append-only file that
+    is flushed after every post
+
+    Attributes
+    ----------
+    path : str
+        Filepath of the journal, created if it doesn't exist
+
+    Methods
+    -------
+    add(shortcode) -> None
+        Record a post as completed
+    close() -> None
+        Close the journal file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._completed = set(self._load(path))
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {len(self)} completed>"
+
+    def __contains__(self, shortcode: str) -> bool:
+        return shortcode in self._completed
+
+    def __len__(self) -> int:
+        return len(self._completed)
+
+    def __enter__(self) -> CheckpointJournal:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, shortcode: str) -> None:
+        """Record the post as completed, written through before returning"""
+        with self._lock:
+            if shortcode in self._completed:
+                return
+            self._file.write(shortcode + "\n")
+            self._file.flush()
+            self._completed.add(shortcode)
+
+    def close(self) -> None:
+        self._file.close()
+
+    @staticmethod
+    def _load(path: str):
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb+") as journal:
+            data = journal.read()
+            complete = data.rfind(b"\n") + 1
+            if complete != len(data):
+                # A crash mid-write left half a shortcode behind, drop it
+                journal.truncate(complete)
+        return [line for line in data[:complete].decode("utf-8").splitlines() if line]
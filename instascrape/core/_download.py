@@ -0,0 +1,238 @@
+"""
+Streaming media downloads: large buffered chunks, resumable partial files and
+atomic renames, shared by Post.download and the concurrent bulk downloader
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Union
+
+import requests
+
+from instascrape.core._hooks import emit, has_hooks
+from instascrape.core._http import http_session
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Suffix of files still being downloaded, kept on failure so the next attempt
+# resumes with a Range request instead of starting over
+PARTIAL_SUFFIX = ".part"
+
+
+class DownloadResult:
+    """Outcome of downloading one post's media"""
+
+    __slots__ = ("post", "path", "bytes", "seconds", "resumed", "skipped", "exception")
+
+    def __init__(self, post, path, bytes=0, seconds=0.0, resumed=False, skipped=False, exception=None) -> None:
+        self.post = post
+        self.path = path
+        self.bytes = bytes
+        self.seconds = seconds
+        self.resumed = resumed
+        self.skipped = skipped
+        self.exception = exception
+
+    def __repr__(self) -> str:
+        status = "failed" if self.exception is not None else "skipped" if self.skipped else f"{self.bytes} bytes"
+        return f"<{type(self).__name__}: {self.path} {status}>"
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+
+class DownloadReport:
+    """
+    Results of a bulk download along with its throughput
+
+    Attributes
+    ----------
+    results : List[DownloadResult]
+        One result per post, in the order the posts were given
+    seconds : float
+        Wall clock time of the whole download
+    """
+
+    def __init__(self, results: List[DownloadResult], seconds: float) -> None:
+        self.results = results
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__}: {len(self.downloaded)} downloaded, {len(self.failed)} failed, "
+            f"{self.bytes_per_second / 2 ** 20:.2f} MiB/s>"
+        )
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    @property
+    def bytes(self) -> int:
+        return sum(result.bytes for result in self.results)
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    @property
+    def downloaded(self) -> List[DownloadResult]:
+        return [result for result in self.results if result.ok and not result.skipped]
+
+    @property
+    def failed(self) -> List[DownloadResult]:
+        return [result for result in self.results if not result.ok]
+
+
+def _range_total(content_range: str) -> Union[int, None]:
+    """Return the complete length of a Content-Range header, e.g. 5000 of "bytes */5000", None if unknown"""
+    _, _, length = content_range.rpartition("/")
+    return int(length) if length.isdigit() else None
+
+
+def download_file(
+    url: str,
+    fp: str,
+    session: requests.Session = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    headers: dict = None,
+) -> DownloadResult:
+    """
+    Stream url to fp through a partial file that is renamed into place once
+    complete, resuming an earlier partial download with an HTTP Range request
+
+    Returns
+    -------
+    result : DownloadResult
+        Bytes transferred by this call and whether it resumed a partial file
+    """
+    if session is None:
+        session = http_session()
+    headers = dict(headers or {})
+    partial_fp = fp + PARTIAL_SUFFIX
+    offset = os.path.getsize(partial_fp) if os.path.exists(partial_fp) else 0
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+
+    start = time.perf_counter()
+    # Progress counts the bytes of the whole file, resumed ones included
+    report = has_hooks()
+    done = written = 0
+    total = error = None
+    try:
+        resp = session.get(url, stream=True, headers=headers)
+        if resp.status_code == 416 and offset:
+            with resp:
+                complete = _range_total(resp.headers.get("Content-Range", "")) == offset
+            if complete:
+                # The partial file already holds everything
+                os.replace(partial_fp, fp)
+                done = total = offset
+                return DownloadResult(None, fp, 0, time.perf_counter() - start, resumed=True)
+            # The partial file isn't the length of the file, e.g. the file was
+            # replaced by a smaller one since, so start over instead of
+            # putting a file that may be truncated or corrupt in place
+            os.remove(partial_fp)
+            offset = 0
+            del headers["Range"]
+            resp = session.get(url, stream=True, headers=headers)
+        with resp:
+            resp.raise_for_status()
+            resumed = offset > 0 and resp.status_code == 206
+            done = offset if resumed else 0
+            length = resp.headers.get("Content-Length", "")
+            total = done + int(length) if length.isdigit() else None
+            with open(partial_fp, "ab" if resumed else "wb", buffering=chunk_size) as outfile:
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    outfile.write(chunk)
+                    written += len(chunk)
+                    if report:
+                        emit(
+                            "download_progress", url=url, fp=fp, written=done + written, total=total, chunk=len(chunk)
+                        )
+        os.replace(partial_fp, fp)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if report:
+            emit("download_finished", url=url, fp=fp, written=done + written, total=total, error=error)
+    return DownloadResult(None, fp, written, time.perf_counter() - start, resumed=resumed)
+
+
+def media_url(post) -> str:
+    """Return the URL of the post's video, or its image if it isn't a video"""
+    return post.video_url if post.is_video else post.display_url
+
+
+def default_filename(post) -> str:
+    """Return shortcode.mp4 for videos and shortcode.jpg for images"""
+    return f"{post.shortcode}{'.mp4' if post.is_video else '.jpg'}"
+
+
+def download_posts(
+    posts: Iterable["Post"],
+    directory: str = ".",
+    filename=default_filename,
+    workers: int = 8,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overwrite: bool = False,
+    on_exception: str = "raise",
+    headers: dict = None,
+) -> DownloadReport:
+    """
+    Download the media of many scraped Post, Reel or IGTV objects concurrently
+
+    Parameters
+    ----------
+    posts : Iterable[Post]
+        Scraped posts to download the image or video of
+    directory : str
+        Directory to download into, created if it doesn't exist
+    filename : Callable[[Post], str]
+        Returns the file name to save each post's media as
+    workers : int
+        Amount of downloads streaming at once
+    chunk_size : int
+        Bytes read from the network and written to disk at a time
+    overwrite : bool
+        Download media that already exists in directory again
+    on_exception : str
+        "raise" the first exception, or "pass" and record it in the post's
+        DownloadResult
+    headers : Dict[str, str]
+        Request headers passed on every GET request
+
+    Returns
+    -------
+    report : DownloadReport
+        One DownloadResult per post along with the total bytes and bytes/sec
+    """
+    if on_exception not in ("raise", "pass"):
+        raise ValueError(f'on_exception must be "raise" or "pass", got {on_exception}')
+    os.makedirs(directory, exist_ok=True)
+    posts = list(posts)
+
+    def _download(post):
+        fp = os.path.join(directory, filename(post))
+        if not overwrite and os.path.exists(fp):
+            return DownloadResult(post, fp, skipped=True)
+        try:
+            result = download_file(media_url(post), fp, chunk_size=chunk_size, headers=headers)
+        except Exception as e:
+            if on_exception == "raise":
+                raise
+            return DownloadResult(post, fp, exception=e)
+        result.post = post
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_download, posts))
+    return DownloadReport(results, time.perf_counter() - start)
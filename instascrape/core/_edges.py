@@ -0,0 +1,169 @@
+"""
+Batch decoding of the post edges on profile, hashtag and location pages. The
+whole edges array is decoded column by column, with each column's path into
+a node learned once per shape of node instead of flattening and parsing every
+node on its own, and Post objects are only built when asked for.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+from instascrape.core._mappings import _CompiledMapping
+from instascrape.core._records import record_type
+from instascrape.core.json_algos import _MISSING, _SuffixCache, _flatten_iterative, _follow_path, _leaf_paths
+
+_NAN = float("nan")
+
+
+def _learn_paths(node: Dict[str, Any], mapping: _CompiledMapping) -> List[Tuple[str, tuple, tuple, bool]]:
+    """
+    Return the key, steps and path into the node of every directive, resolved
+    the way parse_data_from_json resolves it: the first step is a flattened
+    key and the rest traverse into its value, else every step is followed
+    from the root. The last item tells whether the path came from flattening.
+    """
+    flat_paths = {}
+    _flatten_iterative(node, paths=flat_paths)
+    paths = []
+    for key, steps in mapping.items():
+        flat_path = flat_paths.get(steps[0])
+        if flat_path is not None and _follow_path(node, flat_path + steps[1:]) is not _MISSING:
+            paths.append((key, steps, flat_path + steps[1:], True))
+        else:
+            paths.append((key, steps, steps, False))
+    return paths
+
+
+def _decode_node(node: Dict[str, Any], steps: tuple) -> Any:
+    """Resolve one directive in a node the learned path misses, exactly as scrape would"""
+    # Imported here since scrape_tools imports this module
+    from instascrape.scrapers.scrape_tools import parse_data_from_json
+
+    return parse_data_from_json(_flatten_iterative(node), {"value": steps}, nested_json_dict=node)["value"]
+
+
+def decode_edges(edges: List[Dict[str, Any]], mapping: Union[_CompiledMapping, Dict[str, deque]], **constants: Any) -> PostBatch:
+    """
+    Decode the nodes of an edges array into columns of post data
+
+    Parameters
+    ----------
+    edges : List[Dict[str, Any]]
+        Edges of a page, each holding a post under "node"
+    mapping : Union[_CompiledMapping, Dict[str, deque]]
+        Mapping of the columns to decode, e.g.
+        _PostMapping.compile_post_from_hashtag_mapping()
+    constants : Any
+        Columns with the same value for every post, e.g. the username of the
+        profile the posts are from
+
+    Returns
+    -------
+    batch : PostBatch
+        The decoded columns along with the nodes they came from
+    """
+    if not isinstance(mapping, _CompiledMapping):
+        mapping = _CompiledMapping(mapping.items())
+    nodes = [edge["node"] for edge in edges]
+    columns = {key: [_NAN] * len(nodes) for key in mapping}
+
+    # Flattened keys are named after the leaves that share their suffixes,
+    # so nodes with those leaves at the same paths share learned paths
+    names = _SuffixCache._suffixes(tuple(str(steps[0]) for steps in mapping.values()))
+    shapes: Dict[tuple, List[int]] = {}
+    for i, node in enumerate(nodes):
+        shapes.setdefault(_leaf_paths(node, names), []).append(i)
+    for indices in shapes.values():
+        for key, steps, path, flattened in _learn_paths(nodes[indices[0]], mapping):
+            column = columns[key]
+            for i in indices:
+                value = _follow_path(nodes[i], path)
+                if value is _MISSING:
+                    value = _decode_node(nodes[i], steps) if flattened else _NAN
+                column[i] = value
+
+    # Derived the same way Post.scrape derives them
+    if "timestamp" in columns:
+        columns["upload_date"] = [
+            datetime.datetime.fromtimestamp(timestamp) if isinstance(timestamp, (int, float)) and timestamp == timestamp else _NAN
+            for timestamp in columns["timestamp"]
+        ]
+    if "shortcode" in columns:
+        columns["url"] = [
+            f"https://www.instagram.com/p/{shortcode}/" if isinstance(shortcode, str) else None
+            for shortcode in columns["shortcode"]
+        ]
+    for key, value in constants.items():
+        columns[key] = [value] * len(nodes)
+    columns["scrape_timestamp"] = [datetime.datetime.now()] * len(nodes)
+    return PostBatch(columns, nodes)
+
+
+class PostBatch:
+    """
+    Posts decoded from a page's edges, held as columns until Post objects are
+    asked for
+
+    Attributes
+    ----------
+    columns : Dict[str, list]
+        One list of values per scraped attribute, in the order of the posts
+    nodes : List[Dict[str, Any]]
+        The JSON of each post
+
+    Methods
+    -------
+    row(i) -> Dict[str, Any]
+        Return the i-th post's values keyed by attribute
+    post(i) -> Post
+        Build a Post object of the i-th post
+    posts() -> List[Post]
+        Build a Post object of every post
+    records() -> List[PostRecord]
+        Return every post as a compact PostRecord
+    """
+
+    def __init__(self, columns: Dict[str, list], nodes: List[Dict[str, Any]]) -> None:
+        self.columns = columns
+        self.nodes = nodes
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {len(self)} posts>"
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __getitem__(self, i: int) -> "Post":
+        return self.post(i)
+
+    def __iter__(self) -> Iterator["Post"]:
+        return (self.post(i) for i in range(len(self)))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Return the i-th post's values keyed by attribute"""
+        return {key: column[i] for key, column in self.columns.items()}
+
+    def post(self, i: int) -> "Post":
+        """Build a Post object of the i-th post, as get_recent_posts returns them"""
+        from instascrape.scrapers.post import Post
+
+        node = self.nodes[i]
+        post = Post(node)
+        for key, column in self.columns.items():
+            setattr(post, key, column[i])
+        post.json_dict = node
+        return post
+
+    def posts(self) -> List["Post"]:
+        """Build a Post object of every post"""
+        return list(self)
+
+    def records(self) -> List["_Record"]:
+        """Return every post as a compact PostRecord, columns a PostRecord doesn't have are left out"""
+        from instascrape.scrapers.post import Post
+
+        record_cls = record_type(Post)
+        return [record_cls(**self.row(i)) for i in range(len(self))]
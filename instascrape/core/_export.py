@@ -0,0 +1,297 @@
+"""
+Collection exporters that stream many scraped objects into one NDJSON,
+Parquet or Arrow file in a single pass, with columns and types taken from
+the scrapers' _Mapping classes so every file of a kind has the same schema
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import math
+import os
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+DEFAULT_BATCH_SIZE = 10_000
+
+Schema = List[Tuple[str, str]]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Parquet and Arrow exports require pyarrow, install it with pip install insta-scrape[parquet]"
+        ) from None
+    return pyarrow
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_timestamp(value: Any) -> Union[datetime.datetime, None]:
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+    return datetime.datetime.fromtimestamp(value)
+
+
+def _to_bool(value: Any) -> bool:
+    # bool("False") is True, so only bools and numbers are taken as truth values
+    if isinstance(value, (bool, int, float)):
+        return bool(value)
+    raise TypeError(f"{value!r} is not a truth value")
+
+
+def _to_str_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    return [str(item) for item in value]
+
+
+def _to_json(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": _to_bool,
+    "timestamp": _to_timestamp,
+    "list<str>": _to_str_list,
+    "json": _to_json,
+}
+
+
+def _convert(value: Any, column_type: str) -> Any:
+    """Return the value as the column type, None if it's missing or can't be converted"""
+    if _is_missing(value):
+        return None
+    try:
+        return _CONVERTERS[column_type](value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def export_schema(scraper: Any, keys: List[str] = None, exclude: List[str] = None) -> Schema:
+    """
+    Return the column names and types a scraper type is exported with
+
+    Parameters
+    ----------
+    scraper : Union[_StaticHtmlScraper, type]
+        Scraper object or class, e.g. Post or Profile
+    keys : List[str]
+        Only export these columns
+    exclude : List[str]
+        Leave these columns out
+
+    Returns
+    -------
+    schema : List[Tuple[str, str]]
+        Column names and their types
+    """
+    scraper_cls = scraper if isinstance(scraper, type) else type(scraper)
+    return scraper_cls._Mapping.return_schema(keys=keys, exclude=exclude)
+
+
+def arrow_schema(schema: Schema) -> "pyarrow.Schema":
+    """Return the pyarrow.Schema of an export schema"""
+    pa = _require_pyarrow()
+    arrow_types = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("ms"),
+        "list<str>": pa.list_(pa.string()),
+        "json": pa.string(),
+    }
+    return pa.schema([(name, arrow_types[column_type]) for name, column_type in schema])
+
+
+def export_rows(scrapers: Iterable[Any], schema: Schema) -> Iterator[Dict[str, Any]]:
+    """Yield each scraper as a dict of its schema columns converted to their types"""
+    for scraper in scrapers:
+        yield {name: _convert(getattr(scraper, name, None), column_type) for name, column_type in schema}
+
+
+def _first_and_rest(scrapers: Iterable[Any]) -> Tuple[Any, Iterator[Any]]:
+    scrapers = iter(scrapers)
+    first = next(scrapers, None)
+    if first is None:
+        return None, iter(())
+
+    def _chained():
+        yield first
+        yield from scrapers
+
+    return first, _chained()
+
+
+def _resolve_schema(scrapers: Iterable[Any], schema_from: Any, keys: List[str], exclude: List[str]):
+    first, scrapers = _first_and_rest(scrapers)
+    source = schema_from if schema_from is not None else first
+    if source is None:
+        raise ValueError("Can't determine the schema of an empty collection, pass schema_from")
+    return export_schema(source, keys=keys, exclude=exclude), scrapers
+
+
+def to_ndjson(
+    scrapers: Iterable[Any],
+    fp: Union[str, os.PathLike, IO[str]],
+    keys: List[str] = None,
+    exclude: List[str] = None,
+    schema_from: Any = None,
+) -> int:
+    """
+    Stream scraped objects to newline delimited JSON, one object per line
+
+    Parameters
+    ----------
+    scrapers : Iterable[_StaticHtmlScraper]
+        Scraped objects of one type, consumed lazily so a generator keeps
+        memory bounded
+    fp : Union[str, os.PathLike, IO[str]]
+        Filepath or open text file to write to
+    keys : List[str]
+        Only export these columns
+    exclude : List[str]
+        Leave these columns out
+    schema_from : Union[_StaticHtmlScraper, type]
+        Scraper class to take the schema from instead of the first object
+
+    Returns
+    -------
+    count : int
+        Amount of objects written
+    """
+    schema, scrapers = _resolve_schema(scrapers, schema_from, keys, exclude)
+    if isinstance(fp, (str, os.PathLike)):
+        with open(fp, "w", encoding="utf-8") as outfile:
+            return _write_ndjson(scrapers, schema, outfile)
+    return _write_ndjson(scrapers, schema, fp)
+
+
+def _write_ndjson(scrapers: Iterable[Any], schema: Schema, outfile: IO[str]) -> int:
+    return _write_ndjson_rows(export_rows(scrapers, schema), outfile)
+
+
+def _write_ndjson_rows(rows: Iterable[Dict[str, Any]], outfile: IO[str]) -> int:
+    count = 0
+    for row in rows:
+        outfile.write(json.dumps(row, default=_json_default, ensure_ascii=False))
+        outfile.write("\n")
+        count += 1
+    return count
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _record_batches(scrapers: Iterable[Any], schema: Schema, batch_size: int) -> Iterator["pyarrow.RecordBatch"]:
+    return _row_batches(export_rows(scrapers, schema), schema, batch_size)
+
+
+def _row_batches(rows: Iterable[Dict[str, Any]], schema: Schema, batch_size: int) -> Iterator["pyarrow.RecordBatch"]:
+    pa = _require_pyarrow()
+    pa_schema = arrow_schema(schema)
+    names = [name for name, _ in schema]
+    columns = {name: [] for name in names}
+    size = 0
+    for row in rows:
+        for name in names:
+            columns[name].append(row[name])
+        size += 1
+        if size == batch_size:
+            yield _record_batch(pa, pa_schema, columns)
+            columns = {name: [] for name in names}
+            size = 0
+    if size:
+        yield _record_batch(pa, pa_schema, columns)
+
+
+def _record_batch(pa, pa_schema: "pyarrow.Schema", columns: Dict[str, list]) -> "pyarrow.RecordBatch":
+    arrays = [pa.array(columns[field.name], type=field.type) for field in pa_schema]
+    return pa.RecordBatch.from_arrays(arrays, schema=pa_schema)
+
+
+def to_parquet(
+    scrapers: Iterable[Any],
+    fp: str,
+    keys: List[str] = None,
+    exclude: List[str] = None,
+    schema_from: Any = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compression: str = "zstd",
+) -> int:
+    """
+    Stream scraped objects to a Parquet file, one row group per batch
+
+    Parameters
+    ----------
+    scrapers : Iterable[_StaticHtmlScraper]
+        Scraped objects of one type, consumed lazily so only batch_size rows
+        are held in memory at once
+    fp : str
+        Filepath to write to
+    keys : List[str]
+        Only export these columns
+    exclude : List[str]
+        Leave these columns out
+    schema_from : Union[_StaticHtmlScraper, type]
+        Scraper class to take the schema from instead of the first object
+    batch_size : int
+        Rows converted and written at a time
+    compression : str
+        Parquet compression codec
+
+    Returns
+    -------
+    count : int
+        Amount of objects written
+    """
+    pa = _require_pyarrow()
+    schema, scrapers = _resolve_schema(scrapers, schema_from, keys, exclude)
+    count = 0
+    with pa.parquet.ParquetWriter(fp, arrow_schema(schema), compression=compression) as writer:
+        for batch in _record_batches(scrapers, schema, batch_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def to_arrow(
+    scrapers: Iterable[Any],
+    fp: str,
+    keys: List[str] = None,
+    exclude: List[str] = None,
+    schema_from: Any = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Stream scraped objects to an Arrow IPC (Feather v2) file, see to_parquet
+    for the parameters
+
+    Returns
+    -------
+    count : int
+        Amount of objects written
+    """
+    pa = _require_pyarrow()
+    schema, scrapers = _resolve_schema(scrapers, schema_from, keys, exclude)
+    count = 0
+    with pa.ipc.new_file(fp, arrow_schema(schema)) as writer:
+        for batch in _record_batches(scrapers, schema, batch_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
@@ -0,0 +1,138 @@
+"""
+Hooks that are told what scraping is doing: every request sent through the
+pooled sessions, login redirects and error pages, every scrape that succeeds
+or fails and the progress of media downloads. Subclass ScrapeHooks, override
+the events of interest and register an instance with add_hooks. With no
+hooks registered an event costs one truth test.
+"""
+
+from __future__ import annotations
+
+import threading
+import warnings
+from typing import Any, Tuple, Union
+
+import requests
+
+
+class ScrapeHooks:
+    """
+    Interface of the events scraping reports, every method does nothing
+    unless overridden. Methods may be called from several threads at once
+
+    Methods
+    -------
+    request_started(method, url) -> None
+        An HTTP request is about to be sent
+    request_finished(method, url, status, seconds, size, error) -> None
+        An HTTP request got its response, or failed with error
+    redirect_detected(url, kind) -> None
+        Instagram answered with its login page, kind "login", or its error
+        page, kind "error_page", instead of the requested page
+    scrape_succeeded(scraper, seconds) -> None
+        A scraper finished scraping
+    scrape_failed(scraper, seconds, error) -> None
+        A scraper raised error while scraping
+    download_progress(url, fp, written, total, chunk) -> None
+        A chunk of chunk bytes of a media download was written to fp, which
+        now holds written of its total bytes, those of a resumed partial
+        file included
+    download_finished(url, fp, written, total, error) -> None
+        A media download ended, complete or failed with error, with written
+        bytes of fp written
+    """
+
+    def request_started(self, method: str, url: str) -> None:
+        pass
+
+    def request_finished(
+        self, method: str, url: str, status: Union[int, None], seconds: float, size: Union[int, None], error: Exception
+    ) -> None:
+        pass
+
+    def redirect_detected(self, url: Union[str, None], kind: str) -> None:
+        pass
+
+    def scrape_succeeded(self, scraper: Any, seconds: float) -> None:
+        pass
+
+    def scrape_failed(self, scraper: Any, seconds: float, error: Exception) -> None:
+        pass
+
+    def download_progress(self, url: str, fp: str, written: int, total: Union[int, None], chunk: int) -> None:
+        pass
+
+    def download_finished(
+        self, url: str, fp: str, written: int, total: Union[int, None], error: Union[Exception, None]
+    ) -> None:
+        pass
+
+
+# Replaced rather than mutated, so emitting iterates without a lock
+_hooks: Tuple[ScrapeHooks, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+def add_hooks(hooks: ScrapeHooks) -> None:
+    """Register hooks to be told about every event from now on"""
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hooks,)
+
+
+def remove_hooks(hooks: ScrapeHooks) -> None:
+    """Stop telling registered hooks about events"""
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(registered for registered in _hooks if registered is not hooks)
+
+
+def get_hooks() -> Tuple[ScrapeHooks, ...]:
+    """Return the registered hooks"""
+    return _hooks
+
+
+def has_hooks() -> bool:
+    """Return whether any hooks are registered, to skip preparing an event's arguments"""
+    return bool(_hooks)
+
+
+def emit(event: str, **kwargs: Any) -> None:
+    """
+    Call the event's method on every registered hook. A hook that raises is
+    reported with a warning instead of interrupting the scrape
+    """
+    for hooks in _hooks:
+        try:
+            getattr(hooks, event)(**kwargs)
+        except Exception as e:  # pylint: disable=broad-except
+            warnings.warn(f"{hooks!r} raised {e!r} on {event}", RuntimeWarning)
+
+
+class HookedSession(requests.Session):
+    """Session that reports every request it sends to the registered hooks"""
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if not _hooks:
+            return super().send(request, **kwargs)
+        emit("request_started", method=request.method, url=request.url)
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as e:
+            emit("request_finished", method=request.method, url=request.url, status=None, seconds=0.0, size=None, error=e)
+            raise
+        if kwargs.get("stream"):
+            length = response.headers.get("Content-Length")
+            size = int(length) if length is not None and length.isdigit() else None
+        else:
+            size = len(response.content)
+        emit(
+            "request_finished",
+            method=request.method,
+            url=request.url,
+            status=response.status_code,
+            seconds=response.elapsed.total_seconds(),
+            size=size,
+            error=None,
+        )
+        return response
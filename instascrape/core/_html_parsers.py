@@ -0,0 +1,104 @@
+"""
+HTML parser backend shared by everything that parses Instagram HTML. The
+backend can be set per deployment with set_html_parser or the
+INSTASCRAPE_HTML_PARSER environment variable.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import List
+
+from bs4 import BeautifulSoup
+
+from instascrape.core.json_algos import _parse_json_str
+
+HTML_PARSERS = ("html.parser", "lxml", "selectolax")
+
+# Backend used for soups when selectolax is selected, since BeautifulSoup
+# can't build its tree with it
+_SOUP_FALLBACKS = ("lxml", "html.parser")
+
+_html_parser = None
+
+
+def set_html_parser(parser: str = None) -> None:
+    """
+    Set the HTML parser backend used for soups, JSON parsed with the soup
+    extractor, and Profile.get_posts
+
+    Parameters
+    ----------
+    parser : str
+        One of "html.parser", "lxml" or "selectolax". None restores the
+        defaults of each call site
+    """
+    global _html_parser
+    if parser is not None and parser not in available_html_parsers():
+        raise ValueError(
+            f"{parser} is not an available HTML parser, use one of {', '.join(available_html_parsers())}"
+        )
+    _html_parser = parser
+
+
+def get_html_parser(default: str = "html.parser") -> str:
+    """Return the configured HTML parser backend, or default if none is set"""
+    return _html_parser if _html_parser is not None else default
+
+
+def available_html_parsers() -> List[str]:
+    """Return the HTML parser backends that are installed"""
+    return [parser for parser in HTML_PARSERS if _is_installed(parser)]
+
+
+def soup_from_html(html: str, default: str = "html.parser") -> BeautifulSoup:
+    """Return BeautifulSoup of the HTML built with the configured backend"""
+    parser = get_html_parser(default)
+    if parser == "selectolax":
+        parser = next(fallback for fallback in _SOUP_FALLBACKS if _is_installed(fallback))
+    return BeautifulSoup(html, features=parser)
+
+
+def json_strs_from_html(html: str, default: str = "html.parser") -> List[str]:
+    """Return the strings of JSON data in the HTML's <script> tags"""
+    if get_html_parser(default) != "selectolax":
+        return _parse_json_str(soup_from_html(html, default=default))
+
+    json_data = []
+    for script in _selectolax_tree(html).css("script"):
+        script_tag = script.html
+        if "config" in script_tag:
+            left_index = script_tag.find("{")
+            right_index = script_tag.rfind("}") + 1
+            json_data.append(script_tag[left_index:right_index])
+    return json_data
+
+
+def _selectolax_tree(html: str):
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+    return HTMLParser(html)
+
+
+def _parser_from_env() -> None:
+    """Set the parser from INSTASCRAPE_HTML_PARSER, so a typo fails on import instead of on the first scrape"""
+    parser = os.environ.get("INSTASCRAPE_HTML_PARSER") or None
+    try:
+        set_html_parser(parser)
+    except ValueError as e:
+        raise ValueError(f"INSTASCRAPE_HTML_PARSER: {e}") from None
+
+
+def _is_installed(parser: str) -> bool:
+    if parser == "html.parser":
+        return True
+    try:
+        __import__(parser)
+    except ImportError:
+        return False
+    return True
+
+
+_parser_from_env()
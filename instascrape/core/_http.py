@@ -0,0 +1,181 @@
+"""
+Connection pooling shared by every HTTP request instascrape makes, so pages,
+JSON and media reuse keep-alive connections instead of paying a TCP and TLS
+handshake per request.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from instascrape.core._hooks import HookedSession
+
+
+class _ConnectionCounter:
+    """Thread-safe counts of requests sent and connections opened"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.opened = 0
+        self._lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self) -> None:
+        with self._lock:
+            self.opened += 1
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every connection they open"""
+
+    def __init__(self, counter: _ConnectionCounter, **kwargs) -> None:
+        self.counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        counter = self.counter
+
+        def _counting(pool_cls):
+            def _new_conn(pool):
+                counter.count_connection()
+                return pool_cls._new_conn(pool)
+
+            return type(f"Counting{pool_cls.__name__}", (pool_cls,), {"_new_conn": _new_conn})
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting(HTTPConnectionPool),
+            "https": _counting(HTTPSConnectionPool),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self.counter.count_request()
+        return super().send(request, *args, **kwargs)
+
+
+class SessionManager:
+    """
+    Hands out requests sessions that all send through one set of connection
+    pools sized for the concurrency they're used at
+
+    By default each thread gets its own session, so cookies and other session
+    state are never mutated by two threads at once, while the urllib3 pools
+    underneath, which are thread-safe, are shared.
+
+    Attributes
+    ----------
+    pool_connections : int
+        Amount of hosts to keep a connection pool for
+    pool_maxsize : int
+        Connections kept alive per host, should be at least the amount of
+        threads requesting at once
+    max_retries : int
+        Retries of failed connections, passed on to HTTPAdapter
+    per_thread : bool
+        Give each thread its own session instead of sharing one
+    adapter : requests.adapters.BaseAdapter
+        Adapter every session sends through instead of the pooled
+        HTTPAdapter, e.g. a RecordingAdapter or ReplayAdapter. Only requests
+        through the pooled HTTPAdapter are counted in stats
+
+    Methods
+    -------
+    session() -> requests.Session
+        Return the session for the calling thread
+    stats() -> Dict[str, int]
+        Requests sent and connections opened vs. reused
+    close() -> None
+        Close every pooled connection
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        max_retries: int = 0,
+        per_thread: bool = True,
+        adapter: BaseAdapter = None,
+    ) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.per_thread = per_thread
+        self._counter = _ConnectionCounter()
+        if adapter is None:
+            adapter = _CountingAdapter(
+                self._counter, pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries
+            )
+        self._adapter = adapter
+        self._local = threading.local()
+        self._shared = None
+        self._sessions = 0
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.pool_maxsize} connections per host>"
+
+    def session(self) -> requests.Session:
+        """Return the session for the calling thread, creating it on first use"""
+        if not self.per_thread:
+            if self._shared is None:
+                with self._lock:
+                    if self._shared is None:
+                        self._shared = self._new_session()
+            return self._shared
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._new_session()
+        return session
+
+    def stats(self) -> Dict[str, int]:
+        """Return the amount of requests sent and connections opened and reused for them"""
+        with self._counter._lock:
+            requests_sent, opened = self._counter.requests, self._counter.opened
+        return {
+            "sessions": self._sessions,
+            "requests": requests_sent,
+            "connections_opened": opened,
+            "connections_reused": max(0, requests_sent - opened),
+        }
+
+    def close(self) -> None:
+        """Close every pooled connection, sessions keep working and reconnect"""
+        self._adapter.close()
+
+    def _new_session(self) -> requests.Session:
+        session = HookedSession()
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
+        with self._lock:
+            self._sessions += 1
+        return session
+
+
+_session_manager = SessionManager()
+
+
+def set_session_manager(manager: SessionManager) -> None:
+    """
+    Set the SessionManager every request without an explicit session goes
+    through, e.g. SessionManager(pool_maxsize=64) when scraping with 64 threads
+    """
+    global _session_manager
+    _session_manager = manager
+
+
+def get_session_manager() -> SessionManager:
+    """Return the SessionManager requests without an explicit session go through"""
+    return _session_manager
+
+
+def http_session() -> requests.Session:
+    """Return the pooled session for the calling thread"""
+    return _session_manager.session()
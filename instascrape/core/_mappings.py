@@ -8,7 +8,8 @@ from __future__ import annotations
 from abc import ABC
 from collections import deque
 from copy import deepcopy
-from typing import Dict, List, Union
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, Union
 
 # pylint: disable=used-before-assignment
 
@@ -16,6 +17,60 @@ from typing import Dict, List, Union
 MappingObject = Union["_PostMapping", "_ProfileMapping", "_HashtagMapping", "_LoginMapping"]
 
 
+class _CompiledMapping:
+    """
+    Immutable form of a mapping where each directive is a tuple of steps, so it
+    can be shared between scrapes and consumed without being copied
+
+    Attributes
+    ----------
+    flat_keys : Tuple[str]
+        The first step of every directive, i.e. the flattened keys that get
+        looked up
+    """
+
+    __slots__ = ("_items", "flat_keys", "_variants")
+
+    def __init__(self, directives: Iterable[Tuple[str, Iterable]]) -> None:
+        self._items = tuple((key, tuple(steps)) for key, steps in directives)
+        self.flat_keys = tuple(steps[0] for _, steps in self._items)
+        self._variants = {}
+
+    def __iter__(self):
+        return (key for key, _ in self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key == item_key for item_key, _ in self._items)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {', '.join(self)}>"
+
+    def items(self) -> Tuple[Tuple[str, tuple], ...]:
+        return self._items
+
+    def values(self) -> Tuple[tuple, ...]:
+        return tuple(steps for _, steps in self._items)
+
+    def with_overrides(self, overrides: Tuple[Tuple[str, tuple], ...]) -> _CompiledMapping:
+        """Return a compiled mapping with the given directives replaced or added"""
+        try:
+            return self._variants[overrides]
+        except KeyError:
+            directives = dict(self._items)
+            directives.update(overrides)
+            variant = self._variants[overrides] = _CompiledMapping(directives.items())
+            return variant
+
+
+@lru_cache(maxsize=256)
+def _compile_mapping(mapping_cls: type, keys: Tuple[str, ...], exclude: Tuple[str, ...]) -> _CompiledMapping:
+    """Compile the directives of a mapping class once per keys/exclude combination"""
+    return _CompiledMapping(mapping_cls.return_mapping(keys=list(keys), exclude=list(exclude)).items())
+
+
 class _GeneralMapping(ABC):
     """
     Maps the user interfacing attribute names with their keys as given in a JSON
@@ -28,11 +83,18 @@ class _GeneralMapping(ABC):
         Each key: val pair represents one data point and the directive for
         traversing a JSON dict and accessing that value
 
+    types : Dict[str, str]
+        Column type of each key when exporting, one of "str", "int", "float",
+        "bool", "timestamp", "list<str>" or "json". Keys that aren't in mapping
+        are attributes the scraper derives after parsing
+
     Methods
     -------
     return_mapping(keys: List[str]=[]) -> Dict[str, deque]
         Interface for returning only mapping directives that are specified in
         a list of keys
+    return_schema(keys: List[str]=[]) -> List[Tuple[str, str]]
+        Column names and types of the specified keys for exporting
 
     """
 
@@ -53,6 +115,8 @@ class _GeneralMapping(ABC):
         # "frontend_dev": deque(["frontend_env"]),
     }
 
+    types = {}
+
     @classmethod
     def return_mapping(cls, keys: List[str] = None, exclude: List[str] = None) -> Dict[str, deque]:
         """
@@ -85,6 +149,58 @@ class _GeneralMapping(ABC):
         directive_dict = {key: deepcopy(cls.mapping[key]) for key in keys}
         return directive_dict
 
+    @classmethod
+    def compile_mapping(cls, keys: List[str] = None, exclude: List[str] = None) -> _CompiledMapping:
+        """
+        Return the key-directive pairs specified by key names as a cached,
+        immutable _CompiledMapping. If no keys are specified, return all
+
+        Parameters
+        ----------
+        keys : List[str]
+            Keys that specify what directives to return
+        exclude : List[str]
+            Keys that specify what directives to leave out
+
+        Returns
+        -------
+        compiled_mapping : _CompiledMapping
+            Compiled keys and their directives, shared between calls
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        return _compile_mapping(cls, tuple(keys or ()), tuple(exclude or ()))
+
+    @classmethod
+    def return_schema(cls, keys: List[str] = None, exclude: List[str] = None) -> List[Tuple[str, str]]:
+        """
+        Return the column names and types scraped data is exported with,
+        mapped keys first followed by derived ones. If no keys are specified,
+        return all
+
+        Parameters
+        ----------
+        keys : List[str]
+            Keys that specify what columns to return
+        exclude : List[str]
+            Keys that specify what columns to leave out
+
+        Returns
+        -------
+        schema : List[Tuple[str, str]]
+            Column names and their types, "json" for keys without a type
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        if not keys:
+            keys = list(cls.mapping) + [key for key in cls.types if key not in cls.mapping]
+        exclude = set(exclude or ())
+        return [(key, cls.types.get(key, "json")) for key in keys if key not in exclude]
+
 
 class _PostMapping(_GeneralMapping):
     """Mapping specific to Instagram post pages"""
@@ -128,9 +244,45 @@ class _PostMapping(_GeneralMapping):
             "full_name": deque(['owner_full_name']),
         }
     )
+    types = {
+        "id": "str",
+        "shortcode": "str",
+        "height": "int",
+        "width": "int",
+        "dimensions": "json",
+        "fact_check_overall_rating": "str",
+        "media_preview": "str",
+        "display_url": "str",
+        "accessibility_caption": "str",
+        "is_video": "bool",
+        "tracking_token": "str",
+        "tagged_users": "list<str>",
+        "caption": "str",
+        "caption_is_edited": "bool",
+        "has_ranked_comments": "bool",
+        "comments": "int",
+        "comments_disabled": "bool",
+        "commenting_disabled_for_viewer": "bool",
+        "timestamp": "int",
+        "likes": "int",
+        "location": "str",
+        "viewer_has_liked": "bool",
+        "viewer_has_saved": "bool",
+        "viewer_has_saved_to_collection": "bool",
+        "viewer_in_photo_of_you": "bool",
+        "viewer_can_reshare": "bool",
+        "video_url": "str",
+        "has_audio": "bool",
+        "video_view_count": "int",
+        "username": "str",
+        "full_name": "str",
+        "owner": "str",
+        "upload_date": "timestamp",
+        "hashtags": "list<str>",
+    }
 
     @classmethod
-    def post_from_profile_mapping(cls):
+    def post_from_profile_mapping(cls) -> Dict[str, deque]:
         """
         Return the mapping needed for parsing a post's JSON data from the JSON
         served back after requesting a Profile page.
@@ -154,7 +306,16 @@ class _PostMapping(_GeneralMapping):
         }
 
     @classmethod
-    def post_from_hashtag_mapping(cls):
+    @lru_cache(maxsize=None)
+    def compile_post_from_profile_mapping(cls) -> _CompiledMapping:
+        """
+        Return post_from_profile_mapping compiled once, to be shared by every
+        post decoded from a Profile page
+        """
+        return _CompiledMapping(cls.post_from_profile_mapping().items())
+
+    @classmethod
+    def post_from_hashtag_mapping(cls) -> Dict[str, deque]:
         """
         Return the mapping needed for parsing a post's JSON data from the JSON
         served back after requesting a Hashtag page.
@@ -174,6 +335,15 @@ class _PostMapping(_GeneralMapping):
             "accessibility_caption": deque(["accessibility_caption"]),
         }
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def compile_post_from_hashtag_mapping(cls) -> _CompiledMapping:
+        """
+        Return post_from_hashtag_mapping compiled once, to be shared by every
+        post decoded from a Hashtag page
+        """
+        return _CompiledMapping(cls.post_from_hashtag_mapping().items())
+
 
 class _ReelMapping(_PostMapping):
     mapping = _PostMapping.return_mapping().copy()
@@ -182,6 +352,7 @@ class _ReelMapping(_PostMapping):
             "video_play_count": deque(["video_play_count"]),
         }
     )
+    types = {**_PostMapping.types, "video_play_count": "int"}
 
 
 class _IGTVMapping(_PostMapping):
@@ -232,6 +403,43 @@ class _ProfileMapping(_GeneralMapping):
             "posts": deque(["edge_owner_to_timeline_media_count"]),
         }
     )
+    types = {
+        "logging_page_id": "str",
+        "show_suggested_profiles": "bool",
+        "show_follow_dialog": "bool",
+        "biography": "str",
+        "blocked_by_viewer": "bool",
+        "restricted_by_viewer": "bool",
+        "country_block": "bool",
+        "external_url": "str",
+        "external_url_linkshimmed": "str",
+        "followers": "int",
+        "followed_by_viewer": "bool",
+        "following": "int",
+        "follows_viewer": "bool",
+        "full_name": "str",
+        "has_ar_effects": "bool",
+        "has_clips": "bool",
+        "has_guides": "bool",
+        "has_channel": "bool",
+        "has_blocked_viewer": "bool",
+        "highlight_reel_count": "int",
+        "has_requested_viewer": "bool",
+        "id": "str",
+        "is_business_account": "bool",
+        "is_joined_recently": "bool",
+        "business_category_name": "str",
+        "overall_category_name": "str",
+        "category_enum": "str",
+        "is_private": "bool",
+        "is_verified": "bool",
+        "mutual_followers": "int",
+        "profile_pic_url": "str",
+        "profile_pic_url_hd": "str",
+        "requested_by_viewer": "bool",
+        "username": "str",
+        "posts": "int",
+    }
 
 
 class _HashtagMapping(_GeneralMapping):
@@ -249,6 +457,15 @@ class _HashtagMapping(_GeneralMapping):
             "amount_of_posts": deque(["count"]),
         }
     )
+    types = {
+        "id": "str",
+        "name": "str",
+        "allow_following": "bool",
+        "is_following": "bool",
+        "is_top_media_only": "bool",
+        "profile_pic_url": "str",
+        "amount_of_posts": "int",
+    }
 
 
 class _LocationMapping(_GeneralMapping):
@@ -275,6 +492,48 @@ class _LocationMapping(_GeneralMapping):
             "amount_of_posts": deque(["count"]),
         }
     )
+    types = {
+        "id": "str",
+        "name": "str",
+        "has_public_page": "bool",
+        "latitude": "float",
+        "longitude": "float",
+        "slug": "str",
+        "blurb": "str",
+        "website": "str",
+        "phone": "str",
+        "primary_alias_on_fb": "str",
+        "stress_address": "str",
+        "zip_code": "str",
+        "city_name": "str",
+        "region_name": "str",
+        "country_code": "str",
+        "amount_of_posts": "int",
+    }
+
+
+class _CommentMapping(_GeneralMapping):
+    """
+    Schema of the comment nodes of a post's comment thread. Comment's
+    properties read the nodes themselves, so there are no directives and
+    the types alone give the columns
+    """
+
+    mapping = {}
+    types = {
+        "id": "str",
+        "text": "str",
+        "created_at": "timestamp",
+        "username": "str",
+        "is_verified": "bool",
+        "profile_pic_url": "str",
+        "likes": "int",
+        "reply_count": "int",
+        "viewer_has_liked": "bool",
+        "did_report_as_spam": "bool",
+        "is_restricted_pending": "bool",
+        "parent_id": "str",
+    }
 
 
 class _LoginMapping(_GeneralMapping):
@@ -0,0 +1,219 @@
+"""
+Prometheus metrics of scraping, collected through ScrapeHooks and rendered in
+the Prometheus text exposition format, either written to a file for the node
+exporter's textfile collector or served over HTTP for Prometheus to scrape.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple, Union
+from urllib.parse import urlparse
+
+from instascrape.core._hooks import ScrapeHooks
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Histogram:
+    """Cumulative bucket counts, sum and count of observed values"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * buckets
+        self.total = 0.0
+        self.count = 0
+
+
+class PrometheusExporter(ScrapeHooks):
+    """
+    ScrapeHooks that keep Prometheus counters and histograms of requests,
+    redirects, scrapes and downloads. Thread-safe
+
+    Metrics
+    -------
+    instascrape_requests_total{method, status}
+        Requests sent, status "error" for ones that got no response
+    instascrape_request_duration_seconds{method}
+        Histogram of the time until a response's headers arrived
+    instascrape_response_bytes_total
+        Bytes of the response bodies read
+    instascrape_requests_in_flight
+        Requests sent that have no response yet
+    instascrape_redirects_total{kind}
+        Login redirects and error pages served instead of the requested page
+    instascrape_scrapes_total{scraper, outcome}
+        Scrapes that succeeded or failed, by scraper class
+    instascrape_scrape_errors_total{scraper, error}
+        Failed scrapes by exception class
+    instascrape_scrape_duration_seconds{scraper}
+        Histogram of scrape durations, fetching included
+    instascrape_download_bytes_total
+        Media bytes written by downloads
+
+    Methods
+    -------
+    render() -> str
+        Return every metric in the Prometheus text format
+    write(fp) -> None
+        Atomically write the metrics to a file
+    serve(port=9464, addr="127.0.0.1") -> ThreadingHTTPServer
+        Serve the metrics at /metrics on a background thread
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = defaultdict(dict)
+        self._in_flight = 0
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}>"
+
+    def request_started(self, method: str, url: str) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self, method, url, status, seconds, size, error) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._inc("instascrape_requests_total", (("method", method), ("status", str(status or "error"))))
+            if error is None:
+                self._observe("instascrape_request_duration_seconds", (("method", method),), seconds)
+            if size:
+                self._inc("instascrape_response_bytes_total", (), size)
+
+    def redirect_detected(self, url, kind) -> None:
+        with self._lock:
+            self._inc("instascrape_redirects_total", (("kind", kind),))
+
+    def scrape_succeeded(self, scraper, seconds) -> None:
+        name = type(scraper).__name__
+        with self._lock:
+            self._inc("instascrape_scrapes_total", (("scraper", name), ("outcome", "success")))
+            self._observe("instascrape_scrape_duration_seconds", (("scraper", name),), seconds)
+
+    def scrape_failed(self, scraper, seconds, error) -> None:
+        name = type(scraper).__name__
+        with self._lock:
+            self._inc("instascrape_scrapes_total", (("scraper", name), ("outcome", "failure")))
+            self._inc("instascrape_scrape_errors_total", (("scraper", name), ("error", type(error).__name__)))
+            self._observe("instascrape_scrape_duration_seconds", (("scraper", name),), seconds)
+
+    def download_progress(self, url, fp, written, total, chunk) -> None:
+        with self._lock:
+            self._inc("instascrape_download_bytes_total", (), chunk)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            for name, help_text in _COUNTERS:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for labels, value in self._counters[name].items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            lines += [
+                "# HELP instascrape_requests_in_flight Requests sent that have no response yet",
+                "# TYPE instascrape_requests_in_flight gauge",
+                f"instascrape_requests_in_flight {self._in_flight}",
+            ]
+            for name, help_text in _HISTOGRAMS:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, histogram in self._histograms[name].items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (math.inf,), histogram.counts):
+                        cumulative += count
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, fp: str) -> None:
+        """Write the metrics to fp through a temporary file, so readers never see half of them"""
+        tmp_fp = f"{fp}.tmp"
+        with open(tmp_fp, "w", encoding="utf-8") as outfile:
+            outfile.write(self.render())
+        os.replace(tmp_fp, fp)
+
+    def serve(self, port: int = 9464, addr: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve the metrics at /metrics on a daemon thread and return the
+        server, call its shutdown method to stop serving
+        """
+        exporter = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if urlparse(self.path).path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _inc(self, name: str, labels: Labels, amount: Union[int, float] = 1) -> None:
+        self._counters[name][labels] += amount
+
+    def _observe(self, name: str, labels: Labels, value: float) -> None:
+        histogram = self._histograms[name].get(labels)
+        if histogram is None:
+            histogram = self._histograms[name][labels] = _Histogram(len(self.buckets) + 1)
+        histogram.counts[bisect_left(self.buckets, value)] += 1
+        histogram.total += value
+        histogram.count += 1
+
+
+_COUNTERS = (
+    ("instascrape_requests_total", "HTTP requests sent, by method and response status"),
+    ("instascrape_response_bytes_total", "Bytes of response bodies read"),
+    ("instascrape_redirects_total", "Login redirects and error pages served instead of the requested page"),
+    ("instascrape_scrapes_total", "Scrapes by scraper class and outcome"),
+    ("instascrape_scrape_errors_total", "Failed scrapes by scraper class and exception"),
+    ("instascrape_download_bytes_total", "Media bytes written by downloads"),
+)
+
+_HISTOGRAMS = (
+    ("instascrape_request_duration_seconds", "Seconds until a response's headers arrived"),
+    ("instascrape_scrape_duration_seconds", "Seconds a scrape took, fetching included"),
+)
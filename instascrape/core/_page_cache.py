@@ -0,0 +1,254 @@
+"""
+Optional on-disk cache of fetched Instagram pages so repeated scrapes of the
+same URL don't refetch its HTML. Pages are stored zlib compressed in a SQLite
+database, which handles locking so one cache can be shared by every process
+on a host.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from http.cookies import SimpleCookie
+from typing import Dict, Union
+
+# Seconds each page type is served from the cache before it's refetched
+DEFAULT_TTLS = {
+    "post": 24 * 3600,
+    "igtv": 24 * 3600,
+    "reel": 24 * 3600,
+    "profile": 15 * 60,
+    "hashtag": 10 * 60,
+    "location": 10 * 60,
+}
+
+_PAGE_TYPE_PATTERNS = (
+    ("post", re.compile(r"instagram\.com/p/")),
+    ("igtv", re.compile(r"instagram\.com/tv/")),
+    ("reel", re.compile(r"instagram\.com/reel/")),
+    ("hashtag", re.compile(r"instagram\.com/(?:explore/)?tags/")),
+    ("location", re.compile(r"instagram\.com/explore/locations/")),
+)
+
+# Pages that mean the request was turned away and mustn't be served again
+_REJECTED_PAGE_MARKERS = ('"LoginAndSignupPage"', '"HttpErrorPage"')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    page_type TEXT NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_STATS = ("hits", "misses", "stores", "expired", "evictions")
+
+
+def page_type_from_url(url: str) -> str:
+    """Return the kind of Instagram page the URL is for, profile if it's none of the others"""
+    for page_type, pattern in _PAGE_TYPE_PATTERNS:
+        if pattern.search(url):
+            return page_type
+    return "profile"
+
+
+def cookie_identity(headers: dict = None) -> str:
+    """Return a hash of the sessionid cookie in headers, empty if there's none"""
+    cookie = SimpleCookie()
+    try:
+        cookie.load((headers or {}).get("cookie", ""))
+    except Exception:
+        return ""
+    if "sessionid" not in cookie or not cookie["sessionid"].value:
+        return ""
+    return hashlib.sha1(cookie["sessionid"].value.encode()).hexdigest()[:12]
+
+
+class PageCache:
+    """
+    Size bounded, least recently used cache of pages on disk with a time to
+    live per page type. Pages are keyed by URL and the sessionid they were
+    requested with, since logged in and anonymous requests get different pages.
+
+    Attributes
+    ----------
+    path : str
+        SQLite database file, created if it doesn't exist
+    max_bytes : int
+        Compressed size of all pages after which the least recently used are
+        evicted
+    ttls : Dict[str, float]
+        Seconds each page type ("post", "profile", "hashtag", "location",
+        "igtv", "reel") stays fresh, merged over DEFAULT_TTLS
+
+    Methods
+    -------
+    get(url, headers=None) -> Union[str, None]
+        Return the cached page, None if it isn't cached or has expired
+    set(url, html, headers=None) -> bool
+        Cache a page, returns False if the page wasn't cacheable
+    stats() -> Dict[str, int]
+        Hit/miss counters shared by every process using the cache
+    clear() -> None
+        Remove every page and reset the counters
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 2 ** 20, ttls: Dict[str, float] = None) -> None:
+        if os.path.isdir(path):
+            path = os.path.join(path, "instascrape-pages.sqlite3")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+        with self._connect() as connection:
+            connection.executemany("INSERT OR IGNORE INTO stats VALUES (?, 0)", ((name,) for name in _STATS))
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.path}>"
+
+    def get(self, url: str, headers: dict = None) -> Union[str, None]:
+        """Return the cached page, None if it isn't cached or has expired"""
+        key = self._key(url, headers)
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute("SELECT data, expires_at FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(connection, "misses")
+                return None
+            data, expires_at = row
+            if expires_at <= now:
+                connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._count(connection, "misses", "expired")
+                return None
+            connection.execute("UPDATE pages SET last_access = ? WHERE key = ?", (now, key))
+            self._count(connection, "hits")
+        return zlib.decompress(data).decode("utf-8")
+
+    def set(self, url: str, html: str, headers: dict = None) -> bool:
+        """Cache a page, login redirects and error pages aren't cached"""
+        if any(marker in html for marker in _REJECTED_PAGE_MARKERS):
+            return False
+        page_type = page_type_from_url(url)
+        ttl = self.ttls.get(page_type, 0)
+        if ttl <= 0:
+            return False
+        data = zlib.compress(html.encode("utf-8"))
+        if len(data) > self.max_bytes:
+            return False
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(url, headers), url, page_type, data, len(data), now + ttl, now),
+            )
+            self._count(connection, "stores")
+            self._evict(connection)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters along with the amount and size of cached pages"""
+        connection = self._connection()
+        stats = dict(connection.execute("SELECT name, value FROM stats").fetchall())
+        stats["entries"], stats["bytes"] = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        """Remove every page and reset the counters"""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM pages")
+            connection.execute("UPDATE stats SET value = 0")
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in connection.execute("SELECT key, size FROM pages ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        connection.execute("UPDATE stats SET value = value + ? WHERE name = 'evictions'", (evicted,))
+
+    @staticmethod
+    def _count(connection: sqlite3.Connection, *names: str) -> None:
+        connection.executemany("UPDATE stats SET value = value + 1 WHERE name = ?", ((name,) for name in names))
+
+    @staticmethod
+    def _key(url: str, headers: dict = None) -> str:
+        return f"{cookie_identity(headers)}|{url.rstrip('/')}"
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections can't be shared between threads or survive a fork
+        pid = os.getpid()
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != pid:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = pid
+        return connection
+
+    def _connect(self) -> "_Transaction":
+        return _Transaction(self._connection())
+
+
+class _Transaction:
+    """Runs a block in an immediate transaction so concurrent writers queue up instead of deadlocking"""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+_page_cache = None
+
+
+def set_page_cache(cache: Union[PageCache, str, None]) -> None:
+    """
+    Set the cache pages fetched by scrape and json_from_url go through
+
+    Parameters
+    ----------
+    cache : Union[PageCache, str, None]
+        PageCache, or a path to create one at with the default settings. None
+        disables caching
+    """
+    global _page_cache
+    if isinstance(cache, (str, os.PathLike)):
+        cache = PageCache(os.fspath(cache))
+    _page_cache = cache
+
+
+def get_page_cache() -> Union[PageCache, None]:
+    """Return the page cache in use, None if caching is disabled"""
+    return _page_cache
+
+
+if os.environ.get("INSTASCRAPE_PAGE_CACHE"):
+    set_page_cache(os.environ["INSTASCRAPE_PAGE_CACHE"])
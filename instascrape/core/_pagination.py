@@ -0,0 +1,231 @@
+"""
+Cursor based pagination of the posts on profile, hashtag and location pages
+and of a post's comments. The first page comes from the scraped page itself,
+each one after it from Instagram's GraphQL endpoint using the
+page_info.end_cursor of the one before.
+"""
+
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterator, List
+from urllib.parse import quote
+
+import requests
+
+from instascrape.core._async import DEFAULT_HEADERS
+from instascrape.core._edges import PostBatch, decode_edges
+from instascrape.core._hooks import emit
+from instascrape.core._http import http_session
+from instascrape.core._mappings import _CompiledMapping, _PostMapping
+from instascrape.core.json_algos import _MISSING, _follow_path
+from instascrape.exceptions.exceptions import InstagramLoginRedirectError, InstagramRateLimitError
+
+GRAPHQL_URL = "https://www.instagram.com/graphql/query/"
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def graphql_url(query_hash: str, variables: Dict[str, Any]) -> str:
+    """Return the URL of a GraphQL query"""
+    variables = quote(json.dumps(variables, separators=(",", ":")))
+    return f"{GRAPHQL_URL}?query_hash={query_hash}&variables={variables}"
+
+
+def fetch_edge_page(
+    url: str,
+    edges_path: tuple,
+    headers: dict = DEFAULT_HEADERS,
+    session: requests.Session = None,
+    limiter: "TokenBucket" = None,
+) -> Dict[str, Any]:
+    """
+    Request one page of a GraphQL query and return the edge at edges_path,
+    holding the page's edges and its page_info
+    """
+    if limiter is not None:
+        limiter.acquire()
+    if session is None:
+        session = http_session()
+    response = session.get(url, headers=headers)
+    if response.status_code == 429:
+        raise InstagramRateLimitError
+    try:
+        json_dict = response.json()
+    except ValueError:
+        # Instagram answers with its login page instead of JSON
+        emit("redirect_detected", url=url, kind="login")
+        raise InstagramLoginRedirectError from None
+    edge = _follow_path(json_dict, edges_path)
+    if edge is _MISSING or not isinstance(edge, dict):
+        raise ValueError(f"{url} didn't return a page of edges, got {str(json_dict)[:200]}")
+    return edge
+
+
+def iter_cursor_pages(
+    edge: Dict[str, Any],
+    query_hash: str,
+    variables: Dict[str, Any],
+    edges_path: tuple,
+    amount: int = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    headers: dict = DEFAULT_HEADERS,
+    session: requests.Session = None,
+    limiter: "TokenBucket" = None,
+    prefetch: bool = True,
+) -> Iterator[List[dict]]:
+    """
+    Yield the edges of edge and of every page after it one page at a time,
+    following end_cursor until Instagram reports there is no next page or
+    amount edges have been yielded
+
+    With prefetch the next page is requested on a background thread as soon
+    as its cursor is known, so it downloads while the current page is being
+    consumed
+    """
+    remaining = amount
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        while True:
+            edges = edge.get("edges", [])
+            if remaining is not None:
+                edges = edges[:remaining]
+                remaining -= len(edges)
+            page_info = edge.get("page_info") or {}
+            next_page = None
+            if page_info.get("has_next_page") and page_info.get("end_cursor") and remaining != 0:
+                first = page_size if remaining is None else min(page_size, remaining)
+                page_variables = dict(variables, first=first, after=page_info["end_cursor"])
+                next_page = partial(
+                    fetch_edge_page,
+                    graphql_url(query_hash, page_variables),
+                    edges_path,
+                    headers=headers,
+                    session=session,
+                    limiter=limiter,
+                )
+                if executor is not None:
+                    next_page = executor.submit(next_page).result
+            yield edges
+            if next_page is None:
+                return
+            edge = next_page()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def iter_edge_pages(
+    scraper: "_StaticHtmlScraper",
+    amount: int = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    headers: dict = DEFAULT_HEADERS,
+    session: requests.Session = None,
+    limiter: "TokenBucket" = None,
+    prefetch: bool = True,
+) -> Iterator[List[dict]]:
+    """
+    Yield the edges of a scraped page's posts one page at a time with
+    iter_cursor_pages, using the scraper's GraphQL query for the pages after
+    the first
+    """
+    edge = _follow_path(scraper.json_dict, scraper._EDGES_PATH) if scraper.json_dict else _MISSING
+    if edge is _MISSING:
+        raise ValueError(
+            f"Can't page through posts without first scraping the {type(scraper).__name__}. Call the scrape method on your object first."
+        )
+    return iter_cursor_pages(
+        edge,
+        scraper._GRAPHQL_QUERY_HASH,
+        scraper._graphql_variables(),
+        scraper._GRAPHQL_EDGES_PATH,
+        amount=amount,
+        page_size=page_size,
+        headers=headers,
+        session=session,
+        limiter=limiter,
+        prefetch=prefetch,
+    )
+
+
+def iter_edge_posts(scraper: "_StaticHtmlScraper", amount: int = None, **page_kwargs: Any) -> Iterator["Post"]:
+    """Yield the posts of iter_edge_pages as Post objects"""
+    if amount is not None and amount <= 0:
+        return
+    for edges in iter_edge_pages(scraper, amount=amount, **page_kwargs):
+        yield from scraper._posts_from_edges(edges)
+
+
+class _EdgePostsMixin(ABC):
+    """
+    Posts of the profile, hashtag and location scrapers, decoded from the
+    edges at _EDGES_PATH of the scraped page and paged through
+    _GRAPHQL_QUERY_HASH. Subclasses provide _graphql_variables and may
+    override _edge_mapping and _decode_edges_kwargs.
+    """
+
+    def iter_recent_posts(
+        self,
+        amount: int = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        headers: dict = DEFAULT_HEADERS,
+        session: requests.Session = None,
+        limiter: "TokenBucket" = None,
+        prefetch: bool = True,
+    ) -> Iterator["Post"]:
+        """
+        Yield the page's posts page by page, starting with the ones on the
+        scraped page and following its end_cursor through Instagram's GraphQL
+        endpoint for the rest
+
+        Parameters
+        ----------
+        amount : int
+            Amount of posts to yield, default is all of them
+        page_size : int
+            Posts requested per page after the first
+        headers : Dict[str, str]
+            Request headers passed on every page request, e.g. with a
+            sessionid cookie
+        session : requests.Session
+            Session for requesting the pages, the pooled session if None
+        limiter : TokenBucket
+            Rate limiter to wait on before requesting each page
+        prefetch : bool
+            Request the next page in the background while the current one is
+            being consumed
+
+        Yields
+        ------
+        post : Post
+            Each post with the data available on the page
+        """
+        return iter_edge_posts(
+            self,
+            amount=amount,
+            page_size=page_size,
+            headers=headers,
+            session=session,
+            limiter=limiter,
+            prefetch=prefetch,
+        )
+
+    def _edge_mapping(self) -> _CompiledMapping:
+        return _PostMapping.compile_post_from_hashtag_mapping()
+
+    def _decode_edges_kwargs(self) -> Dict[str, Any]:
+        return {}
+
+    def _decode_edges(self, edges: List[dict]) -> PostBatch:
+        """Decode the edges of the page's posts in one pass"""
+        return decode_edges(edges, self._edge_mapping(), **self._decode_edges_kwargs())
+
+    def _posts_from_edges(self, edges: List[dict]) -> List["Post"]:
+        return self._decode_edges(edges).posts()
+
+    @abstractmethod
+    def _graphql_variables(self) -> Dict[str, Any]:
+        """Return the variables of the GraphQL query, less its cursor and page size"""
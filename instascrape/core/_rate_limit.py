@@ -0,0 +1,62 @@
+"""
+Token bucket rate limiting shared by the threaded and asyncio scraping modes
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that allows `rate` requests per second on
+    average with bursts of up to `burst` requests
+
+    Callers that find the bucket empty still take a token and are told how
+    long to wait for it, so waiting callers are served in the order they
+    arrived instead of racing each other.
+
+    Attributes
+    ----------
+    rate : float
+        Tokens added to the bucket per second
+    burst : int
+        Maximum amount of tokens the bucket holds
+
+    Methods
+    -------
+    reserve() -> float
+        Take a token and return the seconds to wait before using it
+    acquire() -> None
+        Take a token, sleeping until it is available
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.rate}/s, burst {self.burst}>"
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Take a token, sleeping until it is available"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
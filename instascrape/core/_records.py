@@ -0,0 +1,140 @@
+"""
+Compact record types for holding large collections of scraped data. Each
+record type is generated from a scraper's _Mapping with one __slot__ per
+exported column, so a record keeps the scraped values without the per-object
+__dict__ or the html, soup and JSON a scraper holds onto.
+"""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+# Slots every record has on top of its mapping's columns
+_RECORD_METADATA = ("url", "scrape_timestamp")
+
+
+class _Record:
+    """
+    Base class of the generated record types. Records compare and hash by
+    their values, so one used in a set or as a dict key shouldn't be changed
+
+    Methods
+    -------
+    from_scraper(scraper) -> _Record
+        Copy a scraper's scraped values into a record
+    to_scraper() -> _StaticHtmlScraper
+        Return a scraper object holding the record's values
+    to_dict() -> Dict[str, Any]
+        Return the record's values keyed by column
+    """
+
+    __slots__ = ()
+
+    _scraper_cls = None
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, **values: Any) -> None:
+        for field in self._fields:
+            setattr(self, field, values.get(field, float("nan")))
+
+    def __repr__(self) -> str:
+        identifier = next(
+            (getattr(self, key) for key in ("shortcode", "username", "name", "id") if key in self._fields), None
+        )
+        return f"<{type(self).__name__}: {identifier}>"
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(_same(a, b) for a, b in zip(self._values(), other._values()))
+
+    def __hash__(self) -> int:
+        return hash(tuple(_hash_key(value) for value in self._values()))
+
+    def __reduce__(self):
+        # Generated types can't be looked up by name, so rebuild them from
+        # their scraper class
+        return _rebuild_record, (self._scraper_cls, self.to_dict())
+
+    @classmethod
+    def from_scraper(cls, scraper: "_StaticHtmlScraper") -> _Record:
+        """Copy the scraper's scraped values into a new record"""
+        record = cls.__new__(cls)
+        nan = float("nan")
+        for field in cls._fields:
+            setattr(record, field, getattr(scraper, field, nan))
+        return record
+
+    def to_scraper(self) -> "_StaticHtmlScraper":
+        """
+        Return a scraper object holding the record's values. It has no html or
+        JSON, scrape() it again to refetch them
+        """
+        source = getattr(self, "shortcode", None) if "shortcode" in self._fields else None
+        if not isinstance(source, str):
+            source = self.url
+        scraper = self._scraper_cls(source)
+        for field in self._fields:
+            setattr(scraper, field, getattr(self, field))
+        return scraper
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record's values keyed by column"""
+        return {field: getattr(self, field) for field in self._fields}
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field) for field in self._fields)
+
+
+def _same(a: Any, b: Any) -> bool:
+    # Missing values are NaN, which would otherwise never equal itself
+    return a is b or a == b or (isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b))
+
+
+def _hash_key(value: Any) -> Any:
+    # NaN hashes by identity and lists and dicts not at all, so equal records
+    # could hash differently or fail to hash, those are left out instead
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value
+
+
+@lru_cache(maxsize=None)
+def record_type(scraper_cls: type) -> type:
+    """
+    Return the record type of a scraper class, generated on first use from
+    the columns of its _Mapping. A record only holds those columns, values a
+    scraper was given by a mapping the schema doesn't list are left out
+
+    Parameters
+    ----------
+    scraper_cls : type
+        Scraper class such as Post or Profile
+
+    Returns
+    -------
+    record_cls : type
+        Slotted _Record subclass named after the scraper, e.g. PostRecord
+    """
+    fields = tuple(name for name, _ in scraper_cls._Mapping.return_schema())
+    fields += tuple(name for name in _RECORD_METADATA if name not in fields)
+    return type(
+        f"{scraper_cls.__name__}Record",
+        (_Record,),
+        {
+            "__slots__": fields,
+            "__module__": scraper_cls.__module__,
+            "_fields": fields,
+            "_scraper_cls": scraper_cls,
+        },
+    )
+
+
+def _rebuild_record(scraper_cls: type, values: Dict[str, Any]) -> _Record:
+    return record_type(scraper_cls)(**values)
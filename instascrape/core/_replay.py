@@ -0,0 +1,256 @@
+"""
+Record every HTTP request a scrape run makes to a compact archive and replay
+it later without network access, so the whole pipeline, scrape_posts and
+pagination included, can be profiled and load-tested on identical inputs.
+Recording and replaying both happen at the requests transport adapter, below
+_html_from_url, json_from_url, the GraphQL pagination and media downloads.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.response import HTTPResponse
+
+from instascrape.core._http import SessionManager, get_session_manager, set_session_manager
+from instascrape.exceptions.exceptions import ReplayMissError
+
+_INDEX_NAME = "index.json"
+
+# The recorded body is already decoded and whole, so the headers describing
+# how it was sent over the wire no longer apply to it
+_DROPPED_HEADERS = frozenset(("content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive"))
+
+
+class ReplayArchive:
+    """
+    Responses of a scrape run, stored as a zip holding an index of every
+    request in the order it was made and each distinct response body once
+
+    Attributes
+    ----------
+    path : str
+        Path of the archive
+    mode : str
+        "w" to record into a new archive, "r" to replay one
+
+    Methods
+    -------
+    add(method, url, response, elapsed) -> None
+        Record a response
+    lookup(method, url) -> Tuple[Dict[str, Any], bytes]
+        Return the next recorded response of a request
+    close() -> None
+        Write the index when recording and close the archive
+    """
+
+    def __init__(self, path: str, mode: str = "r") -> None:
+        if mode not in ("r", "w"):
+            raise ValueError(f"{mode} is not a valid mode, use r to replay or w to record")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, mode, compression=zipfile.ZIP_DEFLATED)
+        self._entries: List[Dict[str, Any]] = []
+        self._bodies = set()
+        self._replayed: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._by_request: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        if mode == "r":
+            self._entries = json.loads(self._zip.read(_INDEX_NAME))
+            for entry in self._entries:
+                self._by_request[(entry["method"], entry["url"])].append(entry)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {len(self)} responses in {self.path}>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> ReplayArchive:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, method: str, url: str, response: requests.Response, elapsed: float) -> None:
+        """Record a response whose content has been read, and the seconds it took"""
+        body = response.content or b""
+        digest = hashlib.sha1(body).hexdigest()
+        headers = {key: value for key, value in response.headers.items() if key.lower() not in _DROPPED_HEADERS}
+        entry = {
+            "method": method,
+            "url": url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            "body": digest,
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock:
+            if digest not in self._bodies:
+                self._zip.writestr(f"bodies/{digest}", body)
+                self._bodies.add(digest)
+            self._entries.append(entry)
+
+    def lookup(self, method: str, url: str) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Return the next recorded response of a request and its body. A
+        request made more often than it was recorded gets its last response
+        again
+        """
+        key = (method, url)
+        with self._lock:
+            entries = self._by_request.get(key)
+            if not entries:
+                raise ReplayMissError(f"{self.path} has no recorded response for {method} {url}")
+            entry = entries[min(self._replayed[key], len(entries) - 1)]
+            self._replayed[key] += 1
+            body = self._zip.read(f"bodies/{entry['body']}")
+        return entry, body
+
+    def close(self) -> None:
+        """Write the index when recording and close the archive"""
+        with self._lock:
+            if self._zip.fp is None:
+                return
+            if self.mode == "w":
+                self._zip.writestr(_INDEX_NAME, json.dumps(self._entries, separators=(",", ":")))
+            self._zip.close()
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    Transport adapter that sends requests for real through another adapter
+    and records every response into a ReplayArchive. Responses are read in
+    full before they are returned, streamed ones included
+    """
+
+    def __init__(self, archive: ReplayArchive, adapter: BaseAdapter = None) -> None:
+        super().__init__()
+        self.archive = archive
+        self.adapter = adapter if adapter is not None else HTTPAdapter(pool_maxsize=32)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        start = time.perf_counter()
+        response = self.adapter.send(request, **kwargs)
+        response.content  # pylint: disable=pointless-statement
+        self.archive.add(request.method, request.url, response, time.perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        self.adapter.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Transport adapter that answers requests with the responses recorded in a
+    ReplayArchive instead of sending them
+
+    Attributes
+    ----------
+    archive : ReplayArchive
+        Archive opened for replaying
+    latency : Union[str, float]
+        "recorded" to wait as long as the recorded request took, else the
+        seconds to wait before every response, 0 for none
+    """
+
+    def __init__(self, archive: ReplayArchive, latency: Union[str, float] = 0) -> None:
+        super().__init__()
+        if latency != "recorded" and not isinstance(latency, (int, float)):
+            raise ValueError(f"{latency} is not a valid latency, use recorded or an amount of seconds")
+        self.archive = archive
+        self.latency = latency
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs: Any) -> requests.Response:
+        # pylint: disable=arguments-differ
+        entry, body = self.archive.lookup(request.method, request.url)
+        delay = entry["elapsed"] if self.latency == "recorded" else self.latency
+        if delay:
+            time.sleep(delay)
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers={**entry["headers"], "Content-Length": str(len(body))},
+            status=entry["status"],
+            reason=entry["reason"],
+            preload_content=False,
+        )
+        response = self.build_response(request, raw)
+        response.elapsed = timedelta(seconds=delay)
+        if not stream:
+            response.content  # pylint: disable=pointless-statement
+        return response
+
+
+@contextmanager
+def record_traffic(path: str, **manager_kwargs: Any) -> Iterator[ReplayArchive]:
+    """
+    Record every request made through the pooled sessions while the context
+    is open into a new archive at path
+
+    Parameters
+    ----------
+    path : str
+        Path of the archive to write
+    manager_kwargs : Any
+        Passed on to the SessionManager used while recording, e.g.
+        pool_maxsize
+
+    Yields
+    ------
+    archive : ReplayArchive
+        The archive being recorded into
+    """
+    with ReplayArchive(path, "w") as archive:
+        adapter = RecordingAdapter(archive, HTTPAdapter(pool_maxsize=manager_kwargs.get("pool_maxsize", 32)))
+        with _session_manager(SessionManager(adapter=adapter, **manager_kwargs)):
+            yield archive
+
+
+@contextmanager
+def replay_traffic(path: str, latency: Union[str, float] = 0, **manager_kwargs: Any) -> Iterator[ReplayArchive]:
+    """
+    Answer every request made through the pooled sessions while the context
+    is open from an archive recorded with record_traffic, without network
+    access. Raises ReplayMissError for requests that weren't recorded
+
+    Parameters
+    ----------
+    path : str
+        Path of the archive to replay
+    latency : Union[str, float]
+        "recorded" to take as long as each request did when recorded, else
+        the seconds every response takes, 0 for none
+    manager_kwargs : Any
+        Passed on to the SessionManager used while replaying
+
+    Yields
+    ------
+    archive : ReplayArchive
+        The archive being replayed
+    """
+    with ReplayArchive(path, "r") as archive:
+        with _session_manager(SessionManager(adapter=ReplayAdapter(archive, latency=latency), **manager_kwargs)):
+            yield archive
+
+
+@contextmanager
+def _session_manager(manager: SessionManager) -> Iterator[SessionManager]:
+    previous = get_session_manager()
+    set_session_manager(manager)
+    try:
+        yield manager
+    finally:
+        set_session_manager(previous)
+        manager.close()
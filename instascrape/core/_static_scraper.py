@@ -8,18 +8,37 @@ from typing import Union, Dict, List, Any
 import sys
 import os
 from collections import namedtuple, deque
+import time
 import warnings
 
 import requests
 from bs4 import BeautifulSoup
 
-from instascrape.scrapers.scrape_tools import parse_data_from_json, determine_json_type, flatten_dict, json_from_soup
-from instascrape.exceptions.exceptions import InstagramLoginRedirectError, MissingSessionIDWarning, MissingCookiesWarning
+from instascrape.scrapers.scrape_tools import parse_data_from_json, determine_json_type, flatten_dict
+from instascrape.core._mappings import _CompiledMapping
+from instascrape.core._html_parsers import soup_from_html
+from instascrape.core._http import http_session
+from instascrape.core._page_cache import get_page_cache
+from instascrape.core._records import record_type
+from instascrape.core._hooks import emit, has_hooks
+from instascrape.core._stats import NULL_STATS, ScrapeStats, get_stats_aggregator
+from instascrape.core.json_algos import _parse_json_str, _prune_json, _scan_json_str
+from instascrape.core._async import ascrape as _ascrape
+from instascrape.exceptions.exceptions import (
+    InstagramErrorPageError,
+    InstagramLoginRedirectError,
+    InstagramRateLimitError,
+    MissingSessionIDWarning,
+    MissingCookiesWarning,
+)
 
 # pylint: disable=no-member
 
 JSONDict = Dict[str, Any]
 
+# What a scraper keeps of its source after scraping, see scrape's retain
+RETENTION_POLICIES = ("all", "json", "none")
+
 class _StaticHtmlScraper(ABC):
     """
     Base class for all of the scrapers, handles general functionality that all
@@ -38,12 +57,33 @@ class _StaticHtmlScraper(ABC):
         "json_flattener",
         "flat_json_dict",
         "soup",
+        "_soup",
         "html",
         "source",
+        "scrape_stats",
     ]
     _ASSOCIATED_JSON_TYPE = None
 
-    session = requests.Session()
+    # Flattened keys that are read after parsing the mapping
+    _EXTRA_FLAT_KEYS = ()
+
+    # Directives patched into the mapping when a sessionid is present
+    _SESSIONID_OVERRIDES = (
+        ("profile_pic_url", ("user_profile_pic_url",)),
+        ("profile_pic_url_hd", ("user_profile_pic_url_hd",)),
+    )
+
+    # Paths into json_dict that methods read after scraping, kept when the
+    # rest of the JSON is released with retain="none"
+    _RETAINED_JSON_PATHS = ()
+
+    # Session used when scrape isn't given one, None means the calling
+    # thread's pooled session from instascrape.core._http
+    session = None
+
+    # Record a ScrapeStats of every scrape into scrape_stats. When turned off,
+    # the stages aren't timed and nothing reaches the stats aggregator
+    collect_stats = True
 
     def __init__(self, source: Union[str, BeautifulSoup, JSONDict]) -> None:
         """
@@ -58,7 +98,7 @@ class _StaticHtmlScraper(ABC):
         # Instance variables that are given values elsewhere
         self.url = None
         self.html = None
-        self.soup = None
+        self._soup = None
         self.json_dict = None
         self.flat_json_dict = None
         self.scrape_timestamp = None
@@ -66,6 +106,17 @@ class _StaticHtmlScraper(ABC):
     def __getitem__(self, key: str) -> Any:
         return getattr(self, key)
 
+    @property
+    def soup(self) -> BeautifulSoup:
+        """BeautifulSoup of the scraped HTML, only parsed once it's asked for"""
+        if self._soup is None and self.html is not None:
+            self._soup = self._soup_from_html(self.html)
+        return self._soup
+
+    @soup.setter
+    def soup(self, soup: BeautifulSoup) -> None:
+        self._soup = soup
+
     def __repr__(self) -> str:
         return f"<{type(self).__name__}>"
 
@@ -79,14 +130,17 @@ class _StaticHtmlScraper(ABC):
         },
         inplace=True,
         session=None,
-        webdriver=None
+        webdriver=None,
+        engine="iterative",
+        extractor="scanner",
+        retain="all"
     ) -> None:
         """
         Scrape data from the source
 
         Parameters
         ----------
-        mapping : Dict[str, deque]
+        mapping : Union[_CompiledMapping, Dict[str, deque]]
             Dictionary of parsing queue's that tell the JSON engine how to
             process the JSON data
         keys : List[str]
@@ -100,10 +154,23 @@ class _StaticHtmlScraper(ABC):
             Determines if data modified inplace or return a new object with the
             scraped data
         session : requests.Session
-            Session for making the GET request
+            Session for making the GET request, the calling thread's pooled
+            session from the SessionManager if None
         webdriver : selenium.webdriver.chrome.webdriver.WebDriver
             Webdriver for scraping the page, overrides any default or passed
             session
+        engine : str
+            JSON engine used for flattening the scraped JSON, "iterative",
+            the original "tree", or "path" to flatten only the mapped keys
+        extractor : str
+            How the JSON is found in HTML, "scanner" scans the raw HTML and
+            only builds the soup when .soup is accessed, "soup" parses the
+            HTML with BeautifulSoup first
+        retain : str
+            What to keep once the data is scraped, "all" of the html, soup and
+            JSON, only the nested "json" so the soup is never built, or "none"
+            of it beyond the parts of the JSON methods such as
+            get_recent_posts still read
 
         Returns
         -------
@@ -112,10 +179,35 @@ class _StaticHtmlScraper(ABC):
             if inplace arg is True
         """
 
+        stats = ScrapeStats() if self.collect_stats else NULL_STATS
+        start = time.perf_counter()
+        try:
+            with stats.stage("total"):
+                return_instance = self._scrape(
+                    mapping, keys, exclude, headers, inplace, session, webdriver, engine, extractor, retain, stats
+                )
+        except Exception as e:
+            if has_hooks():
+                emit("scrape_failed", scraper=self, seconds=time.perf_counter() - start, error=e)
+            raise
+        if has_hooks():
+            emit("scrape_succeeded", scraper=return_instance, seconds=time.perf_counter() - start)
+        if stats is not NULL_STATS:
+            aggregator = get_stats_aggregator()
+            if aggregator is not None:
+                aggregator.record(type(self).__name__, stats)
+        return None if return_instance is self else return_instance
+
+    def _scrape(self, mapping, keys, exclude, headers, inplace, session, webdriver, engine, extractor, retain, stats):
+        """Scrape as documented in scrape, timing each stage into stats, and return the scraped instance"""
+        if retain not in RETENTION_POLICIES:
+            raise ValueError(f"{retain} is not a valid retention policy, use all, json or none")
         if mapping is None:
-            mapping = self._Mapping.return_mapping(keys=keys, exclude=exclude)
+            mapping = self._Mapping.compile_mapping(keys=keys, exclude=exclude)
+        elif not isinstance(mapping, _CompiledMapping):
+            mapping = _CompiledMapping(mapping.items())
         if session is None:
-            session = self.session
+            session = self.session if self.session is not None else http_session()
         if webdriver is not None:
             session = webdriver
         if keys is None:
@@ -141,29 +233,86 @@ class _StaticHtmlScraper(ABC):
         if isinstance(self.source, type(self)):
             scraped_dict = self.source.to_dict()
         else:
-            return_data = self._get_json_from_source(self.source, headers=headers, session=session)
-            flat_json_dict = flatten_dict(return_data["json_dict"])
+            return_data = self._get_json_from_source(
+                self.source, headers=headers, session=session, extractor=extractor, stats=stats
+            )
 
             #HACK: patch mapping to fix the profile pic scrape when a sessionid is present
             try:
                 if "sessionid" in headers["cookie"]:
-                    mapping["profile_pic_url"] = deque(["user_profile_pic_url"])
-                    mapping["profile_pic_url_hd"] = deque(["user_profile_pic_url_hd"])
+                    mapping = mapping.with_overrides(self._SESSIONID_OVERRIDES)
             except KeyError:
                 pass
 
-            scraped_dict = parse_data_from_json(
-                json_dict=flat_json_dict,
-                map_dict=mapping,
-            )
+            flat_keys = mapping.flat_keys + self._EXTRA_FLAT_KEYS
+            with stats.stage("flatten"):
+                flat_json_dict = flatten_dict(return_data["json_dict"], engine=engine, keys=flat_keys)
+            stats.flat_keys = len(flat_json_dict)
+
+            with stats.stage("parse"):
+                scraped_dict = parse_data_from_json(
+                    json_dict=flat_json_dict,
+                    map_dict=mapping,
+                    nested_json_dict=return_data["json_dict"],
+                )
         return_data["scrape_timestamp"] = datetime.datetime.now()
         return_data["flat_json_dict"] = flat_json_dict
+        if stats is not NULL_STATS:
+            return_data["scrape_stats"] = stats
         return_instance = self._load_into_namespace(
                             scraped_dict=scraped_dict,
                             return_data=return_data,
                             inplace=inplace
         )
-        return None if return_instance is self else return_instance
+        return_instance._release(retain)
+        return return_instance
+
+    async def ascrape(
+        self,
+        mapping=None,
+        keys: List[str] = None,
+        exclude: List[str] = None,
+        headers={
+            "user-agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Mobile Safari/537.36 Edg/87.0.664.57"
+        },
+        inplace=True,
+        session=None,
+        engine="iterative",
+        extractor="scanner",
+        limiter=None,
+        retain="all"
+    ):
+        """
+        Asynchronously fetch the source with aiohttp and scrape it. Takes the
+        same arguments as scrape except webdriver
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession
+            Session for making the GET request, a temporary one is used if
+            None
+        limiter : instascrape.core._async.HostRateLimiter
+            Per-host rate limiter to wait on before making the request
+
+        Returns
+        -------
+        return_instance
+            Optionally returns a scraped instance instead of modifying inplace
+            if inplace arg is True
+        """
+        return await _ascrape(
+            self,
+            headers=headers,
+            session=session,
+            limiter=limiter,
+            mapping=mapping,
+            keys=keys,
+            exclude=exclude,
+            inplace=inplace,
+            engine=engine,
+            extractor=extractor,
+            retain=retain,
+        )
 
     def to_dict(self, metadata: bool = False) -> Dict[str, Any]:
         """
@@ -187,6 +336,20 @@ class _StaticHtmlScraper(ABC):
         )
         return data_dict
 
+    def to_record(self) -> "_Record":
+        """
+        Return the scraped data as a compact, slotted record without the
+        html, soup and JSON the scraper holds onto. Use record.to_scraper()
+        to get a scraper object back
+
+        Returns
+        -------
+        record : _Record
+            Record of the type generated for this scraper's class, e.g.
+            PostRecord for Post
+        """
+        return record_type(type(self)).from_scraper(self)
+
     def to_csv(self, fp: str) -> None:
         """
         Write scraped data to .csv at the given filepath
@@ -218,8 +381,17 @@ class _StaticHtmlScraper(ABC):
     def _url_from_suburl(self, suburl: str) -> str:
         pass
 
-    def _get_json_from_source(self, source: Any, headers: dict, session: requests.Session) -> JSONDict:
+    def _get_json_from_source(
+        self,
+        source: Any,
+        headers: dict,
+        session: requests.Session,
+        extractor: str = "scanner",
+        stats: ScrapeStats = NULL_STATS,
+    ) -> JSONDict:
         """Parses the JSON data out from the source based on what type the source is"""
+        if extractor not in ("scanner", "soup"):
+            raise ValueError(f"{extractor} is not a valid extractor, use scanner or soup")
         initial_type = True
         return_data = {"source": self.source}
         if isinstance(source, str):
@@ -241,15 +413,28 @@ class _StaticHtmlScraper(ABC):
         if source_type == "url":
             if initial_type:
                 url = self.source
-            html = self._html_from_url(url=url, headers=headers, session=session)
+            with stats.stage("fetch"):
+                html = self._html_from_url(url=url, headers=headers, session=session)
             source_type = "html"
             initial_type = False
             return_data["html"] = html
 
-        if source_type == "html":
+        if source_type == "html" and extractor == "scanner":
             if initial_type:
                 html = self.source
-            soup = self._soup_from_html(html)
+            stats.html_bytes = len(html)
+            with stats.stage("scan"):
+                json_strs = _scan_json_str(html)
+            initial_type = False
+            return_data["html"] = html
+            return_data["soup"] = None
+
+        if source_type == "html" and extractor == "soup":
+            if initial_type:
+                html = self.source
+            stats.html_bytes = len(html)
+            with stats.stage("soup"):
+                soup = self._soup_from_html(html)
             source_type = "soup"
             initial_type = False
             return_data["soup"] = soup
@@ -257,7 +442,13 @@ class _StaticHtmlScraper(ABC):
         if source_type == "soup":
             if initial_type:
                 soup = self.source
-            json_dict_arr = json_from_soup(soup)
+            with stats.stage("scan"):
+                json_strs = _parse_json_str(soup)
+
+        if source_type in ("html", "soup"):
+            stats.json_bytes = sum(len(json_str) for json_str in json_strs)
+            with stats.stage("json_loads"):
+                json_dict_arr = [json.loads(json_str) for json_str in json_strs]
             if len(json_dict_arr) == 1:
                 json_dict = json_dict_arr[0]
             else:
@@ -268,6 +459,21 @@ class _StaticHtmlScraper(ABC):
 
         return return_data
 
+    def _release(self, retain: str) -> None:
+        """Drop the raw html, soup and JSON the retention policy doesn't keep"""
+        if retain == "all":
+            return
+        self.html = None
+        self._soup = None
+        self.flat_json_dict = None
+        # The source may be the page itself, keep only where it came from
+        if isinstance(self.source, (BeautifulSoup, dict)) or (
+            isinstance(self.source, str) and self._determine_string_type(self.source) in ("html", "JSON dict str")
+        ):
+            self.source = self.url
+        if retain == "none":
+            self.json_dict = _prune_json(self.json_dict, self._RETAINED_JSON_PATHS) if self.json_dict else None
+
     def _load_into_namespace(self, scraped_dict: dict, return_data, inplace) -> None:
         """Loop through the scraped dictionary and set them as instance attr"""
         instance = self if inplace else type(self)(return_data["source"])
@@ -280,10 +486,19 @@ class _StaticHtmlScraper(ABC):
 
     @staticmethod
     def _html_from_url(url: str, headers: dict, session: requests.Session) -> str:
-        """Return HTML from requested URL"""
+        """Return HTML from requested URL, served from the page cache if one is set"""
         if isinstance(session, requests.Session):
+            cache = get_page_cache()
+            if cache is not None:
+                page_source = cache.get(url, headers)
+                if page_source is not None:
+                    return page_source
             response = session.get(url, headers=headers)
+            if response.status_code == 429:
+                raise InstagramRateLimitError
             page_source = response.text
+            if cache is not None and response.status_code == 200:
+                cache.set(url, page_source, headers)
         else:
             session.get(url)
             page_source = session.page_source
@@ -291,17 +506,30 @@ class _StaticHtmlScraper(ABC):
 
     @staticmethod
     def _soup_from_html(html: str) -> BeautifulSoup:
-        """Return BeautifulSoup from source HTML"""
-        return BeautifulSoup(html, features="html.parser")
+        """Return BeautifulSoup from source HTML using the configured parser backend"""
+        return soup_from_html(html, default="html.parser")
 
     def _validate_scrape(self, json_dict: str) -> JSONDict:
         """Raise exceptions if the scrape did not properly execute"""
         json_type = determine_json_type(json_dict)
         if json_type == "LoginAndSignupPage" and not type(self).__name__ == "LoginAndSignupPage":
+            emit("redirect_detected", url=self._source_url(), kind="login")
             raise InstagramLoginRedirectError
         elif json_type == "HttpErrorPage" and not type(self).__name__ == "HttpErrorPage":
+            emit("redirect_detected", url=self._source_url(), kind="error_page")
             source_str = self.url if hasattr(self, "url") else "Source"
-            raise ValueError(f"{source_str} is not a valid Instagram page. Please provide a valid argument.")
+            raise InstagramErrorPageError(f"{source_str} is not a valid Instagram page. Please provide a valid argument.")
+
+    def _source_url(self) -> Union[str, None]:
+        """Return the URL scrape would request for the source, None if it doesn't request one"""
+        if not isinstance(self.source, str):
+            return None
+        source_type = self._determine_string_type(self.source)
+        if source_type == "url":
+            return self.source
+        if source_type == "suburl":
+            return self._url_from_suburl(self.source)
+        return None
 
     @staticmethod
     def _determine_string_type(string_data: str) -> str:
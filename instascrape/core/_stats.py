@@ -0,0 +1,220 @@
+"""
+Timing of the stages of a scrape. Every scrape records how long fetching,
+soup parsing, finding the JSON, json.loads, flattening and parsing the
+mapping took, and how much HTML and JSON it went through, into a ScrapeStats
+on the scraper. A StatsAggregator set with set_stats_aggregator also collects
+every scrape's stats for percentiles across a whole run.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Tuple, Union
+
+# Stages of a scrape in the order they happen, not every scrape has all of them
+STAGES = ("fetch", "soup", "scan", "json_loads", "flatten", "parse", "total")
+
+# Sizes recorded next to the durations
+SIZES = ("html_bytes", "json_bytes", "flat_keys")
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class _StageTimer:
+    """Context manager adding the seconds spent inside it to a stage"""
+
+    __slots__ = ("stats", "stage", "start")
+
+    def __init__(self, stats: ScrapeStats, stage: str) -> None:
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        stages = self.stats.stages
+        stages[self.stage] = stages.get(self.stage, 0.0) + time.perf_counter() - self.start
+
+
+class ScrapeStats:
+    """
+    Durations of the stages of one scrape and the sizes of what they handled
+
+    Attributes
+    ----------
+    stages : Dict[str, float]
+        Seconds spent in each stage that ran, see STAGES
+    html_bytes : int
+        Length of the HTML the JSON was extracted from, None for JSON sources
+    json_bytes : int
+        Length of the JSON strings found in the HTML, None for JSON sources
+    flat_keys : int
+        Amount of keys in the flattened JSON
+    """
+
+    __slots__ = ("stages", "html_bytes", "json_bytes", "flat_keys")
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self.html_bytes = None
+        self.json_bytes = None
+        self.flat_keys = None
+
+    def __repr__(self) -> str:
+        stages = ", ".join(f"{stage}={seconds * 1000:.2f}ms" for stage, seconds in self.stages.items())
+        return f"<{type(self).__name__}: {stages}>"
+
+    def stage(self, stage: str) -> _StageTimer:
+        """Return a context manager timing the code inside it as the given stage"""
+        return _StageTimer(self, stage)
+
+    def to_dict(self) -> Dict[str, Union[float, int]]:
+        """Return the stage durations and sizes in one dict"""
+        return {**self.stages, **{size: getattr(self, size) for size in SIZES}}
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _NullStats(ScrapeStats):
+    """ScrapeStats that records nothing, used by scrapers with collect_stats off"""
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        for name in ScrapeStats.__slots__:
+            object.__setattr__(self, name, {} if name == "stages" else None)
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+    def stage(self, stage: str) -> _NullTimer:
+        return _NULL_TIMER
+
+
+NULL_STATS = _NullStats()
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    """Return the percentile of sorted values, interpolating between the closest ranks"""
+    if not ordered:
+        return float("nan")
+    rank = (len(ordered) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class StatsAggregator:
+    """
+    Collects the ScrapeStats of many scrapes, keyed by the scraper class they
+    came from, and summarizes them as percentiles. Thread-safe
+
+    Attributes
+    ----------
+    max_samples : int
+        Most recent samples kept per scraper class and stage, older ones are
+        dropped so memory stays bounded on long runs
+
+    Methods
+    -------
+    record(kind, stats) -> None
+        Add the stats of one scrape
+    percentile(stage, percent, kind=None) -> float
+        Return a percentile of a stage's durations or of a size
+    summary(kind=None, percentiles=(50, 90, 99)) -> Dict[str, Dict[str, float]]
+        Count, mean and percentiles of every stage and size
+    reset() -> None
+        Drop every sample
+    """
+
+    def __init__(self, max_samples: int = 10_000) -> None:
+        self.max_samples = max_samples
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.count()} scrapes>"
+
+    def record(self, kind: str, stats: ScrapeStats) -> None:
+        """Add the stats of one scrape by a scraper of the given class name"""
+        with self._lock:
+            for stage, seconds in stats.stages.items():
+                self._samples[(kind, stage)].append(seconds)
+            for size in SIZES:
+                value = getattr(stats, size)
+                if value is not None:
+                    self._samples[(kind, size)].append(value)
+
+    def count(self, kind: str = None) -> int:
+        """Return the amount of scrapes recorded, of one scraper class if given"""
+        return len(self._values("total", kind))
+
+    def percentile(self, stage: str, percent: float, kind: str = None) -> float:
+        """Return a percentile of a stage's durations in seconds, or of a size"""
+        return _percentile(sorted(self._values(stage, kind)), percent)
+
+    def summary(self, kind: str = None, percentiles: Tuple[float, ...] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, float]]:
+        """
+        Return the count, mean, max and percentiles of every stage and size
+        recorded, of one scraper class if given
+
+        Returns
+        -------
+        summary : Dict[str, Dict[str, float]]
+            e.g. {"fetch": {"count": 120, "mean": 0.41, "p50": 0.38, ...}}
+        """
+        with self._lock:
+            names = {name for _, name in self._samples}
+        summary = {}
+        for name in [stage for stage in STAGES + SIZES if stage in names] + sorted(names - set(STAGES + SIZES)):
+            ordered = sorted(self._values(name, kind))
+            if not ordered:
+                continue
+            summary[name] = {"count": len(ordered), "mean": sum(ordered) / len(ordered), "max": ordered[-1]}
+            for percent in percentiles:
+                summary[name][f"p{percent:g}"] = _percentile(ordered, percent)
+        return summary
+
+    def reset(self) -> None:
+        """Drop every sample"""
+        with self._lock:
+            self._samples.clear()
+
+    def _values(self, name: str, kind: str = None) -> List[float]:
+        with self._lock:
+            values = []
+            for (sample_kind, sample_name), samples in self._samples.items():
+                if sample_name == name and (kind is None or sample_kind == kind):
+                    values.extend(samples)
+            return values
+
+
+_stats_aggregator = None
+
+
+def set_stats_aggregator(aggregator: StatsAggregator = None) -> None:
+    """
+    Set the StatsAggregator every scrape's stats are added to, None to stop
+    aggregating
+    """
+    global _stats_aggregator
+    _stats_aggregator = aggregator
+
+
+def get_stats_aggregator() -> Union[StatsAggregator, None]:
+    """Return the StatsAggregator scrapes are added to, None if none is set"""
+    return _stats_aggregator
@@ -0,0 +1,115 @@
+"""
+A trace of scraping written as JSON Lines, one event per line, to be loaded
+into pandas, jq or a log pipeline for latency histograms, throughput and
+error rates after the fact.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import IO, Any, Dict, Union
+
+from instascrape.core._hooks import ScrapeHooks
+
+DEFAULT_PROGRESS_EVERY = 1 << 20
+
+
+class JsonlTraceSink(ScrapeHooks):
+    """
+    ScrapeHooks that append every event to a JSON Lines file. Each line has
+    the event's name, its wall clock time and its fields, e.g.
+
+        {"event": "request_finished", "time": 1609459200.12, "method": "GET",
+         "url": "https://www.instagram.com/p/CJpB0000000/", "status": 200,
+         "seconds": 0.41, "size": 216234, "error": null}
+
+    Scrapers are written as their class name and URL, exceptions as their
+    class name and message. Lines are flushed as they're written so the file
+    can be tailed while scraping runs. Thread-safe
+
+    Attributes
+    ----------
+    fp : Union[str, IO[str]]
+        Path of the file to append to, or an open text file
+    progress_every : int
+        Bytes between the download_progress events of one download that are
+        written, the event completing a download of known size and every
+        download_finished event are always written
+    """
+
+    def __init__(self, fp: Union[str, IO[str]], progress_every: int = DEFAULT_PROGRESS_EVERY) -> None:
+        self.fp = fp
+        self.progress_every = progress_every
+        self._owns_file = isinstance(fp, str)
+        self._outfile = open(fp, "a", encoding="utf-8") if self._owns_file else fp
+        self._lock = threading.Lock()
+        self._progress: Dict[tuple, int] = {}
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.fp}>"
+
+    def __enter__(self) -> JsonlTraceSink:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def request_started(self, method, url) -> None:
+        self._write("request_started", method=method, url=url)
+
+    def request_finished(self, method, url, status, seconds, size, error) -> None:
+        self._write("request_finished", method=method, url=url, status=status, seconds=seconds, size=size, error=error)
+
+    def redirect_detected(self, url, kind) -> None:
+        self._write("redirect_detected", url=url, kind=kind)
+
+    def scrape_succeeded(self, scraper, seconds) -> None:
+        self._write("scrape_succeeded", **self._scraper_fields(scraper), seconds=seconds)
+
+    def scrape_failed(self, scraper, seconds, error) -> None:
+        self._write("scrape_failed", **self._scraper_fields(scraper), seconds=seconds, error=error)
+
+    def download_progress(self, url, fp, written, total, chunk) -> None:
+        key = (url, fp)
+        finished = total is not None and written >= total
+        with self._lock:
+            last = self._progress.get(key, 0)
+            if not finished and written - last < self.progress_every:
+                return
+            if finished:
+                self._progress.pop(key, None)
+            else:
+                self._progress[key] = written
+        self._write("download_progress", url=url, fp=str(fp), written=written, total=total, chunk=chunk)
+
+    def download_finished(self, url, fp, written, total, error) -> None:
+        with self._lock:
+            self._progress.pop((url, fp), None)
+        self._write("download_finished", url=url, fp=str(fp), written=written, total=total, error=error)
+
+    def close(self) -> None:
+        """Close the file if the sink opened it"""
+        with self._lock:
+            if self._owns_file and not self._outfile.closed:
+                self._outfile.close()
+
+    @staticmethod
+    def _scraper_fields(scraper: Any) -> Dict[str, Any]:
+        url = getattr(scraper, "url", None)
+        if url is None:
+            url = scraper._source_url()
+        return {"scraper": type(scraper).__name__, "url": url}
+
+    def _write(self, event: str, **fields: Any) -> None:
+        line = json.dumps({"event": event, "time": time.time(), **fields}, default=_json_default)
+        with self._lock:
+            self._outfile.write(line + "\n")
+            self._outfile.flush()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseException):
+        return f"{type(value).__name__}: {value}"
+    return str(value)
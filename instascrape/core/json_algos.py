@@ -4,7 +4,7 @@ intended for top level use but instead imported for top level functions to lever
 """
 
 from collections import deque
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Tuple, Union
 
 from bs4 import BeautifulSoup
 
@@ -69,6 +69,213 @@ class _JSONNode:
         return str(self.json_data)
 
 
+def _flatten_tree(json_dict: JSONDict) -> JSONDict:
+    """Flatten by mapping out a full _JSONTree and joining each leaf's keys"""
+    json_tree = _JSONTree(json_dict)
+    flattened_dict = {}
+    for leaf_node in json_tree.leaf_nodes:
+        key_arr = deque([])
+        for key in leaf_node.prior_keys[::-1]:
+            key_arr.appendleft(str(key))
+            new_key = "_".join(key_arr)
+            if new_key not in flattened_dict:
+                break
+        flattened_dict[new_key] = list(leaf_node.json_data.values())[0]
+    return flattened_dict
+
+def _flatten_iterative(json_dict: JSONDict, paths: Dict[str, tuple] = None) -> JSONDict:
+    """
+    Flatten in a single depth-first pass using an explicit stack of iterators.
+
+    Produces exactly the same keys as _flatten_tree: leaves are visited in the
+    same order and a leaf's key is the shortest suffix of its path that hasn't
+    been taken yet. Only one shared path list is kept instead of a node object
+    per value. If a paths dict is given, the full path of every flattened key
+    is recorded in it.
+    """
+    flattened_dict = {}
+    stack = [iter(json_dict.items())]
+    path = [None]
+    while stack:
+        for key, value in stack[-1]:
+            path[-1] = key
+            value_type = type(value)
+            if value_type is dict:
+                stack.append(iter(value.items()))
+                path.append(None)
+                break
+            if value_type is list:
+                stack.append(enumerate(value))
+                path.append(None)
+                break
+
+            # Grow the key towards the root until it no longer collides
+            new_key = str(key)
+            depth = len(path) - 1
+            while depth and new_key in flattened_dict:
+                depth -= 1
+                new_key = f"{path[depth]}_{new_key}"
+            flattened_dict[new_key] = value
+            if paths is not None:
+                paths[new_key] = tuple(path)
+        else:
+            stack.pop()
+            path.pop()
+    return flattened_dict
+
+_MISSING = object()
+
+def _follow_path(json_dict: JSONDict, path: tuple) -> Any:
+    """Return the value at the end of the path or _MISSING if it isn't there"""
+    value = json_dict
+    try:
+        for step in path:
+            value = value[step]
+    except (KeyError, IndexError, TypeError):
+        return _MISSING
+    return value
+
+
+def _prune_json(json_dict: JSONDict, paths: Tuple[tuple, ...]) -> Union[JSONDict, None]:
+    """
+    Return a skeleton of the JSON holding only the values at the end of the
+    given paths, or None if none of them are there. List indices are kept so
+    code indexing into the original works on the skeleton unchanged.
+    """
+    pruned = None
+    for path in paths:
+        value = _follow_path(json_dict, path)
+        if value is _MISSING or not path:
+            continue
+        if pruned is None:
+            pruned = {}
+        node = pruned
+        for step, next_step in zip(path, path[1:]):
+            if isinstance(next_step, int):
+                if isinstance(node, dict) and step not in node or isinstance(node, list) and node[step] is None:
+                    node[step] = []
+                child = node[step]
+                child.extend([None] * (next_step + 1 - len(child)))
+            elif isinstance(node, dict) and step not in node or isinstance(node, list) and node[step] is None:
+                node[step] = {}
+            node = node[step]
+        node[path[-1]] = value
+    return pruned
+
+
+def _flatten_keys(json_dict: JSONDict, keys: Tuple[str, ...], suffixes: frozenset) -> JSONDict:
+    """
+    Flatten only the given keys, exactly as _flatten_iterative would.
+
+    A leaf's key is grown from its own name towards the root until it no
+    longer collides, so whether it collides with one of the given keys
+    depends only on the leaves whose names are one of the keys' "_"-joined
+    suffixes, e.g. id, media_id and shortcode_media_id for shortcode_media_id.
+    Every leaf is still visited in the same order, but only those are keyed.
+    """
+    flattened_dict = {}
+    stack = [iter(json_dict.items())]
+    path = [None]
+    while stack:
+        for key, value in stack[-1]:
+            path[-1] = key
+            value_type = type(value)
+            if value_type is dict:
+                stack.append(iter(value.items()))
+                path.append(None)
+                break
+            if value_type is list:
+                stack.append(enumerate(value))
+                path.append(None)
+                break
+
+            new_key = str(key)
+            if new_key not in suffixes:
+                continue
+            depth = len(path) - 1
+            while depth and new_key in flattened_dict:
+                depth -= 1
+                new_key = f"{path[depth]}_{new_key}"
+            # Grown past every suffix, it can't collide with a given key anymore
+            if new_key in suffixes:
+                flattened_dict[new_key] = value
+        else:
+            stack.pop()
+            path.pop()
+    return {key: flattened_dict[key] for key in keys if key in flattened_dict}
+
+
+def _leaf_paths(json_dict: JSONDict, names: frozenset) -> Tuple[tuple, ...]:
+    """
+    Return the paths of the leaves named one of names, in the order
+    _flatten_iterative visits them. The keys _flatten_keys gives names are a
+    function of these paths alone, so two dicts with the same leaf paths
+    flatten those keys to the same paths.
+    """
+    leaf_paths = []
+    stack = [iter(json_dict.items())]
+    path = [None]
+    while stack:
+        for key, value in stack[-1]:
+            value_type = type(value)
+            if value_type is dict:
+                path[-1] = key
+                stack.append(iter(value.items()))
+                path.append(None)
+                break
+            if value_type is list:
+                path[-1] = key
+                stack.append(enumerate(value))
+                path.append(None)
+                break
+            # List indices are never names, so keys aren't converted to str
+            if key in names:
+                path[-1] = key
+                leaf_paths.append(tuple(path))
+        else:
+            stack.pop()
+            path.pop()
+    return tuple(leaf_paths)
+
+
+class _SuffixCache:
+    """
+    Flattens only the keys a scrape needs, caching the suffixes of each set
+    of keys so they're worked out once per mapping. Every page is still
+    walked in full, only the leaves that can't be one of the keys are left
+    unkeyed, so the keys and their values are always the same as those of a
+    full flatten, whatever the page's layout.
+    """
+
+    def __init__(self) -> None:
+        self.suffixes = {}
+
+    def flatten(self, json_dict: JSONDict, keys: List[str]) -> JSONDict:
+        """Return a flattened dictionary of the given keys that exist"""
+        keys = tuple(keys)
+        suffixes = self.suffixes.get(keys)
+        if suffixes is None:
+            suffixes = self.suffixes[keys] = self._suffixes(keys)
+        return _flatten_keys(json_dict, keys, suffixes)
+
+    def clear(self) -> None:
+        self.suffixes.clear()
+
+    @staticmethod
+    def _suffixes(keys: Tuple[str, ...]) -> frozenset:
+        suffixes = set()
+        for key in keys:
+            parts = key.split("_")
+            suffixes.update("_".join(parts[i:]) for i in range(len(parts)))
+        return frozenset(suffixes)
+
+_SUFFIX_CACHE = _SuffixCache()
+
+_FLATTEN_ENGINES = {
+    "tree": _flatten_tree,
+    "iterative": _flatten_iterative,
+}
+
 def _parse_json_str(source: str) -> str:
     """Return the parsed string of JSON data from the BeautifulSoup"""
     json_data = []
@@ -79,3 +286,21 @@ def _parse_json_str(source: str) -> str:
         json_str = script_tag[left_index:right_index]
         json_data.append(json_str)
     return json_data
+
+def _scan_json_str(html: str) -> List[str]:
+    """
+    Return the same JSON strings as _parse_json_str but by scanning the raw
+    HTML for <script> tags instead of building a BeautifulSoup first
+    """
+    json_data = []
+    start = html.find("<script")
+    while start != -1:
+        end = html.find("</script>", start)
+        if end == -1:
+            end = len(html)
+        if html.find("config", start, end) != -1:
+            left_index = html.find("{", start, end)
+            right_index = html.rfind("}", start, end) + 1
+            json_data.append(html[left_index:right_index])
+        start = html.find("<script", end)
+    return json_data
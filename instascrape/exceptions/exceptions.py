@@ -21,6 +21,46 @@ class WrongSourceError(Exception):
         super().__init__(message)
 
 
+class InstagramRateLimitError(Exception):
+    """
+    Exception that indicates Instagram answered with HTTP 429 Too Many Requests
+    """
+
+    def __init__(
+        self,
+        message="Instagram is rate limiting your requests (HTTP 429). Slow down or pause scraping before trying again",
+    ):
+        super().__init__(message)
+
+
+class InstagramErrorPageError(ValueError):
+    """
+    Exception that indicates Instagram served its error page instead of the
+    requested page, either because the page doesn't exist or because the
+    requests are being blocked
+    """
+
+
+class ReplayMissError(LookupError):
+    """
+    Exception that indicates a request was made while replaying an archive
+    that has no recorded response for it
+    """
+
+
+class CircuitOpenError(Exception):
+    """
+    Exception that indicates requests for a session are paused after repeated
+    login redirects, error pages or rate limits.
+    """
+
+    def __init__(self, retry_after: float, message: str = None):
+        self.retry_after = retry_after
+        if message is None:
+            message = f"Circuit is open after repeated redirects/rate limits, retry in {retry_after:.0f} seconds"
+        super().__init__(message)
+
+
 class MissingSessionIDWarning(UserWarning):
     pass
 
@@ -2,35 +2,210 @@
 Parse data related to comments, including comments in a thread
 """
 
+from __future__ import annotations
+
 import datetime
+from typing import Any, Dict, Iterable, Iterator, List
+
+import requests
+
+from instascrape.core._async import DEFAULT_HEADERS
+from instascrape.core._mappings import _CommentMapping
+from instascrape.core._pagination import DEFAULT_PAGE_SIZE, iter_cursor_pages
+from instascrape.core._rate_limit import TokenBucket
 
 
 class Comment:
-    """A single comment and its respective data"""
+    """
+    A single comment and its respective data. Attributes are read from the
+    comment's JSON when they're accessed and replies are only built into
+    Comment objects the first time they're asked for, so a large thread costs
+    little more than its JSON
 
-    # pylint: disable=too-many-instance-attributes, too-few-public-methods
+    Attributes
+    ----------
+    comment_dict : Dict[str, Any]
+        The comment's node in the thread's JSON
+    parent_id : str
+        id of the comment this is a reply to, None for top level comments
+    """
 
-    def __init__(self, comment_dict: dict) -> None:
-        self.comment_dict = comment_dict["node"]
+    # pylint: disable=too-many-public-methods
 
-        self._parse_data()
+    __slots__ = ("comment_dict", "parent_id", "_replies")
+
+    _Mapping = _CommentMapping
+    _GRAPHQL_QUERY_HASH = "1ee91c32fc020d44158a3192eda98247"
+    _GRAPHQL_EDGES_PATH = ("data", "comment", "edge_threaded_comments")
+
+    def __init__(self, comment_dict: dict, parent_id: str = None) -> None:
+        self.comment_dict = comment_dict["node"]
+        self.parent_id = parent_id
+        self._replies = None
 
     def __repr__(self) -> str:
         return f"<Comment: {self.username}: {self.text}"
 
-    def _parse_data(self) -> None:
-        self.text = self.comment_dict["text"]
-        self.created_at = datetime.datetime.fromtimestamp(self.comment_dict["created_at"])
-        self.did_report_as_spam = self.comment_dict["did_report_as_spam"]
-        self.is_verified = self.comment_dict["owner"]["is_verified"]
-        self.profile_pic_url = self.comment_dict["owner"]["profile_pic_url"]
-        self.username = self.comment_dict["owner"]["username"]
-        self.viewer_has_liked = self.comment_dict["viewer_has_liked"]
-        self.likes = self.comment_dict["edge_liked_by"]["count"]
-        self.is_restricted_pending = self.comment_dict["is_restricted_pending"]
-
-        try:
-            comments = self.comment_dict["edge_threaded_comments"]["edges"]
-            self.replies = [Comment(comment_dict) for comment_dict in comments]
-        except KeyError:
-            self.replies = []
+    @property
+    def id(self) -> str:
+        # pylint: disable=invalid-name
+        return self.comment_dict.get("id")
+
+    @property
+    def text(self) -> str:
+        return self.comment_dict["text"]
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.comment_dict["created_at"])
+
+    @property
+    def did_report_as_spam(self) -> bool:
+        return self.comment_dict["did_report_as_spam"]
+
+    @property
+    def is_verified(self) -> bool:
+        return self.comment_dict["owner"]["is_verified"]
+
+    @property
+    def profile_pic_url(self) -> str:
+        return self.comment_dict["owner"]["profile_pic_url"]
+
+    @property
+    def username(self) -> str:
+        return self.comment_dict["owner"]["username"]
+
+    @property
+    def viewer_has_liked(self) -> bool:
+        return self.comment_dict["viewer_has_liked"]
+
+    @property
+    def likes(self) -> int:
+        return self.comment_dict["edge_liked_by"]["count"]
+
+    @property
+    def is_restricted_pending(self) -> bool:
+        return self.comment_dict["is_restricted_pending"]
+
+    @property
+    def reply_count(self) -> int:
+        """Amount of replies the comment has, including ones not embedded in its JSON"""
+        thread = self._thread()
+        return thread.get("count", len(thread.get("edges", [])))
+
+    @property
+    def replies(self) -> List[Comment]:
+        """Replies embedded in the comment's JSON, built on first access"""
+        if self._replies is None:
+            self._replies = [Comment(reply_dict, parent_id=self.id) for reply_dict in self._thread().get("edges", [])]
+        return self._replies
+
+    def iter_replies(
+        self,
+        amount: int = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        headers: dict = DEFAULT_HEADERS,
+        session: requests.Session = None,
+        limiter: TokenBucket = None,
+        prefetch: bool = True,
+    ) -> Iterator[Comment]:
+        """
+        Yield all of the comment's replies, starting with the ones embedded in
+        its JSON and following their end_cursor through Instagram's GraphQL
+        endpoint for the rest
+
+        Parameters
+        ----------
+        amount : int
+            Amount of replies to yield, default is all of them
+        page_size : int
+            Replies requested per page after the first
+        headers : Dict[str, str]
+            Request headers passed on every page request, e.g. with a
+            sessionid cookie
+        session : requests.Session
+            Session for requesting the pages, the pooled session if None
+        limiter : TokenBucket
+            Rate limiter to wait on before requesting each page
+        prefetch : bool
+            Request the next page in the background while the current one is
+            being consumed
+
+        Yields
+        ------
+        reply : Comment
+            Each reply, in the order Instagram returns them
+        """
+        if amount is not None and amount <= 0:
+            return
+        pages = iter_cursor_pages(
+            self._thread(),
+            self._GRAPHQL_QUERY_HASH,
+            {"comment_id": self.id},
+            self._GRAPHQL_EDGES_PATH,
+            amount=amount,
+            page_size=page_size,
+            headers=headers,
+            session=session,
+            limiter=limiter,
+            prefetch=prefetch,
+        )
+        for edges in pages:
+            for reply_dict in edges:
+                yield Comment(reply_dict, parent_id=self.id)
+
+    def _thread(self) -> Dict[str, Any]:
+        return self.comment_dict.get("edge_threaded_comments") or {}
+
+
+def iter_thread(comments: Iterable[Comment], fetch_replies: bool = False, **page_kwargs: Any) -> Iterator[Comment]:
+    """
+    Yield each comment followed by its replies, depth first
+
+    Parameters
+    ----------
+    comments : Iterable[Comment]
+        Top level comments, e.g. from Post.iter_comments
+    fetch_replies : bool
+        Page through every comment's replies with Comment.iter_replies
+        instead of only yielding the ones embedded in its JSON
+    page_kwargs : Any
+        Passed on to Comment.iter_replies, e.g. headers or a limiter
+
+    Yields
+    ------
+    comment : Comment
+        Every comment of the thread, with parent_id set on replies
+    """
+    for comment in comments:
+        yield comment
+        replies = comment.iter_replies(**page_kwargs) if fetch_replies else comment.replies
+        yield from iter_thread(replies, fetch_replies=fetch_replies, **page_kwargs)
+
+
+def comment_columns(
+    comments: Iterable[Comment], keys: List[str] = None, exclude: List[str] = None
+) -> Dict[str, list]:
+    """
+    Export comments as columns, one list of values per attribute
+
+    Parameters
+    ----------
+    comments : Iterable[Comment]
+        Comments to export, e.g. iter_thread(post.iter_comments()) for a
+        post's full thread, consumed lazily
+    keys : List[str]
+        Only export these columns
+    exclude : List[str]
+        Leave these columns out
+
+    Returns
+    -------
+    columns : Dict[str, list]
+        Values of each column in the order of the comments
+    """
+    columns = {name: [] for name, _ in _CommentMapping.return_schema(keys=keys, exclude=exclude)}
+    for comment in comments:
+        for name, column in columns.items():
+            column.append(getattr(comment, name))
+    return columns
@@ -5,19 +5,25 @@ Hashtag
 """
 from __future__ import annotations
 
-from typing import List
+from typing import List, Union
 import time
 
-from instascrape.core._mappings import _HashtagMapping, _PostMapping
+from instascrape.core._edges import PostBatch
+from instascrape.core._mappings import _HashtagMapping
+from instascrape.core._pagination import _EdgePostsMixin
 from instascrape.core._static_scraper import _StaticHtmlScraper
 from instascrape.scrapers.post import Post
 
-class Hashtag(_StaticHtmlScraper):
+class Hashtag(_EdgePostsMixin, _StaticHtmlScraper):
     """Scraper for an Instagram hashtag page"""
 
     _Mapping = _HashtagMapping
+    _EDGES_PATH = ("entry_data", "TagPage", 0, "graphql", "hashtag", "edge_hashtag_to_media")
+    _RETAINED_JSON_PATHS = (_EDGES_PATH,)
+    _GRAPHQL_QUERY_HASH = "9b498c08113f1e09617a1703c22b2f32"
+    _GRAPHQL_EDGES_PATH = ("data", "hashtag", "edge_hashtag_to_media")
 
-    def get_recent_posts(self, amt: int = 71) -> List[Post]:
+    def get_recent_posts(self, amt: int = 71, batch: bool = False) -> Union[List[Post], PostBatch]:
         """
         Return a list of recent posts to the hasthag
 
@@ -25,24 +31,24 @@ class Hashtag(_StaticHtmlScraper):
         ----------
         amt : int
             Amount of recent posts to return
+        batch : bool
+            Return the posts decoded into a PostBatch of columns, where Post
+            objects are only built for the posts that are indexed
 
         Returns
         -------
-        posts : List[Post]
+        posts : Union[List[Post], PostBatch]
             List containing the recent 12 posts and their available data
         """
-        posts = []
         post_arr = self.json_dict["entry_data"]["TagPage"][0]["graphql"]["hashtag"]["edge_hashtag_to_media"]["edges"]
         amount_of_posts = len(post_arr)
         if amt > amount_of_posts:
             amt = amount_of_posts
-        for post in post_arr[:amt]:
-            json_dict = post["node"]
-            mapping = _PostMapping.post_from_hashtag_mapping()
-            post = Post(json_dict)
-            post.scrape(mapping=mapping)
-            posts.append(post)
-        return posts
+        posts = self._decode_edges(post_arr[:amt])
+        return posts if batch else posts.posts()
+
+    def _graphql_variables(self) -> dict:
+        return {"tag_name": self.name}
 
     def _url_from_suburl(self, suburl: str) -> str:
         return f"https://www.instagram.com/tags/{suburl}/"
\ No newline at end of file
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Union
 
-from instascrape.core._mappings import _LocationMapping, _PostMapping
+from instascrape.core._edges import PostBatch
+from instascrape.core._mappings import _LocationMapping
+from instascrape.core._pagination import _EdgePostsMixin
 from instascrape.core._static_scraper import _StaticHtmlScraper
 from instascrape.scrapers.post import Post
 
 
-class Location(_StaticHtmlScraper):
+class Location(_EdgePostsMixin, _StaticHtmlScraper):
     """Scraper for an Instagram profile page"""
 
     _Mapping = _LocationMapping
+    _EDGES_PATH = ("entry_data", "LocationsPage", 0, "graphql", "location", "edge_location_to_media")
+    _RETAINED_JSON_PATHS = (_EDGES_PATH,)
+    _GRAPHQL_QUERY_HASH = "36bd0f2bf5911908de389b8ceaa3be6d"
+    _GRAPHQL_EDGES_PATH = ("data", "location", "edge_location_to_media")
 
-    def get_recent_posts(self, amt: int = 24) -> List[Post]:
+    def get_recent_posts(self, amt: int = 24, batch: bool = False) -> Union[List[Post], PostBatch]:
         """
         Return a list of recent posts to the location
 
@@ -20,26 +26,26 @@ class Location(_StaticHtmlScraper):
         ----------
         amt : int
             Amount of recent posts to return
+        batch : bool
+            Return the posts decoded into a PostBatch of columns, where Post
+            objects are only built for the posts that are indexed
 
         Returns
         -------
-        posts : List[Post]
+        posts : Union[List[Post], PostBatch]
             List containing the recent 24 posts and their available data
         """
-        posts = []
         post_arr = self.json_dict["entry_data"]["LocationsPage"][0]["graphql"]["location"]["edge_location_to_media"][
             "edges"
         ]
         amount_of_posts = len(post_arr)
         if amt > amount_of_posts:
             amt = amount_of_posts
-        for post in post_arr[:amt]:
-            json_dict = post["node"]
-            mapping = _PostMapping.post_from_hashtag_mapping()
-            post = Post(json_dict)
-            post.scrape(mapping=mapping)
-            posts.append(post)
-        return posts
+        posts = self._decode_edges(post_arr[:amt])
+        return posts if batch else posts.posts()
+
+    def _graphql_variables(self) -> dict:
+        return {"id": self.id}
 
     def _url_from_suburl(self, suburl):
         return f"https://www.instagram.com/explore/locations/{suburl}/"
@@ -6,23 +6,35 @@ Post
 from __future__ import annotations
 
 import datetime
-from typing import List
+from typing import Iterator, List
 import re
-import shutil
 import pathlib
 import math
 
 import requests
 
+from instascrape.core._async import DEFAULT_HEADERS
 from instascrape.core._mappings import _PostMapping
-from instascrape.core._static_scraper import _StaticHtmlScraper
+from instascrape.core._download import DEFAULT_CHUNK_SIZE, download_file, media_url
+from instascrape.core._pagination import DEFAULT_PAGE_SIZE, iter_cursor_pages
+from instascrape.core._rate_limit import TokenBucket
+from instascrape.core._static_scraper import RETENTION_POLICIES, _StaticHtmlScraper
+from instascrape.core.json_algos import _MISSING, _follow_path
 from instascrape.scrapers.scrape_tools import parse_data_from_json
-from instascrape.scrapers.comment import Comment
+from instascrape.scrapers.comment import Comment, iter_thread
 
 class Post(_StaticHtmlScraper):
     """Scraper for an Instagram post page"""
 
     _Mapping = _PostMapping
+    _EXTRA_FLAT_KEYS = ("full_name",)
+    _COMMENTS_PATH = ("entry_data", "PostPage", 0, "graphql", "shortcode_media", "edge_media_to_parent_comment")
+    _RETAINED_JSON_PATHS = (
+        _COMMENTS_PATH,
+        ("entry_data", "PostPage", 0, "graphql", "shortcode_media", "edge_media_to_tagged_user"),
+    )
+    _GRAPHQL_COMMENTS_QUERY_HASH = "bc3296d1ce80a24b1b6e40b1e72903f5"
+    _GRAPHQL_COMMENTS_PATH = ("data", "shortcode_media", "edge_media_to_parent_comment")
     SUPPORTED_DOWNLOAD_EXTENSIONS = [".mp3", ".mp4", ".png", ".jpg"]
 
     def scrape(
@@ -35,14 +47,17 @@ class Post(_StaticHtmlScraper):
             },
             inplace=True,
             session=None,
-            webdriver=None
+            webdriver=None,
+            engine="iterative",
+            extractor="scanner",
+            retain="all"
         ) -> None:
         """
         Scrape data from the source
 
         Parameters
         ----------
-        mapping : Dict[str, deque]
+        mapping : Union[_CompiledMapping, Dict[str, deque]]
             Dictionary of parsing queue's that tell the JSON engine how to
             process the JSON data
         keys : List[str]
@@ -56,10 +71,23 @@ class Post(_StaticHtmlScraper):
             Determines if data modified inplace or return a new object with the
             scraped data
         session : requests.Session
-            Session for making the GET request
+            Session for making the GET request, the calling thread's pooled
+            session from the SessionManager if None
         webdriver : selenium.webdriver.chrome.webdriver.WebDriver
             Webdriver for scraping the page, overrides any default or passed
             session
+        engine : str
+            JSON engine used for flattening the scraped JSON, "iterative",
+            the original "tree", or "path" to flatten only the mapped keys
+        extractor : str
+            How the JSON is found in HTML, "scanner" scans the raw HTML and
+            only builds the soup when .soup is accessed, "soup" parses the
+            HTML with BeautifulSoup first
+        retain : str
+            What to keep once the data is scraped, "all" of the html, soup and
+            JSON, only the nested "json" so the soup is never built, or "none"
+            of it beyond the comments and tagged users get_recent_comments and
+            tagged_users are read from
 
         Returns
         -------
@@ -68,6 +96,8 @@ class Post(_StaticHtmlScraper):
             if inplace arg is True
         """
         # pylint: disable=no-member, attribute-defined-outside-init
+        if retain not in RETENTION_POLICIES:
+            raise ValueError(f"{retain} is not a valid retention policy, use all, json or none")
         if hasattr(self, "shortcode"):
             self.source = self.shortcode
         return_instance = super().scrape(
@@ -77,7 +107,10 @@ class Post(_StaticHtmlScraper):
                             headers=headers,
                             inplace=inplace,
                             session=session,
-                            webdriver=webdriver
+                            webdriver=webdriver,
+                            engine=engine,
+                            extractor=extractor,
+                            retain="all"
                         )
         if return_instance is None:
             return_instance = self
@@ -97,16 +130,24 @@ class Post(_StaticHtmlScraper):
                     return_instance.full_name = return_instance.flat_json_dict["full_name"]
             except TypeError:
                 pass
+        # Released only now since the post processing above reads the JSON
+        return_instance._release(retain)
         return return_instance if return_instance is not self else None
 
-    def download(self, fp: str) -> None:
+    def download(self, fp: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
         """
         Download an image or video from a post to your local machine at the given filepath
 
+        The media is streamed to fp + ".part" and renamed to fp once complete,
+        so an interrupted download is resumed by downloading again. Use
+        download_posts for many posts at once.
+
         Parameters
         ----------
         fp : str
             Filepath to download the image to
+        chunk_size : int
+            Bytes read from the network and written to disk at a time
         """
         # pylint: disable=no-member
 
@@ -115,13 +156,7 @@ class Post(_StaticHtmlScraper):
             raise NameError(
                 f"{ext} is not a supported file extension. Please use {', '.join(self.SUPPORTED_DOWNLOAD_EXTENSIONS)}"
             )
-        url = self.video_url if self.is_video else self.display_url
-
-        resp = requests.get(url, stream=True)
-        if not self.is_video:
-            self._download_photo(fp, resp)
-        else:
-            self._download_video(fp, resp)
+        download_file(media_url(self), str(fp), chunk_size=chunk_size)
 
     def get_recent_comments(self) -> List[Comment]:
         """
@@ -139,6 +174,70 @@ class Post(_StaticHtmlScraper):
         comments_arr = [Comment(comment_dict) for comment_dict in list_of_dicts]
         return comments_arr
 
+    def iter_comments(
+        self,
+        amount: int = None,
+        replies: bool = False,
+        fetch_replies: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        headers: dict = DEFAULT_HEADERS,
+        session: requests.Session = None,
+        limiter: TokenBucket = None,
+        prefetch: bool = True,
+    ) -> Iterator[Comment]:
+        """
+        Yield the post's comments page by page, starting with the ones on the
+        scraped page and following their end_cursor through Instagram's
+        GraphQL endpoint for the rest
+
+        Parameters
+        ----------
+        amount : int
+            Amount of top level comments to yield, default is all of them
+        replies : bool
+            Yield each comment's replies right after it, see iter_thread
+        fetch_replies : bool
+            Page through the replies of every comment instead of only
+            yielding the ones embedded in its JSON, implies replies
+        page_size : int
+            Comments requested per page after the first
+        headers : Dict[str, str]
+            Request headers passed on every page request, e.g. with a
+            sessionid cookie
+        session : requests.Session
+            Session for requesting the pages, the pooled session if None
+        limiter : TokenBucket
+            Rate limiter to wait on before requesting each page
+        prefetch : bool
+            Request the next page in the background while the current one is
+            being consumed
+
+        Yields
+        ------
+        comment : Comment
+            Each comment, lazily parsed from its JSON
+        """
+        edge = _follow_path(self.json_dict, self._COMMENTS_PATH) if self.json_dict else _MISSING
+        if edge is _MISSING:
+            raise ValueError(
+                "Can't page through comments without first scraping the Post. Call the scrape method on your object first."
+            )
+        if amount is not None and amount <= 0:
+            return
+        page_kwargs = dict(page_size=page_size, headers=headers, session=session, limiter=limiter, prefetch=prefetch)
+        pages = iter_cursor_pages(
+            edge,
+            self._GRAPHQL_COMMENTS_QUERY_HASH,
+            {"shortcode": self.shortcode},
+            self._GRAPHQL_COMMENTS_PATH,
+            amount=amount,
+            **page_kwargs,
+        )
+        comments = (Comment(comment_dict) for edges in pages for comment_dict in edges)
+        if replies or fetch_replies:
+            comments = iter_thread(comments, fetch_replies=fetch_replies, **page_kwargs)
+        yield from comments
+
     def embed(self) -> str:
         """
         Return embeddable HTML str for this post
@@ -155,18 +254,11 @@ class Post(_StaticHtmlScraper):
     def _url_from_suburl(suburl: str) -> str:
         return f"https://www.instagram.com/p/{suburl}/"
 
-    def _download_photo(self, fp: str, resp: requests.models.Response) -> None:
-        with open(fp, "wb") as outfile:
-            resp.raw.decode_content = True
-            shutil.copyfileobj(resp.raw, outfile)
-
-    def _download_video(self, fp: str, resp: requests.models.Response) -> None:
-        """Write the media to file at given fp from the response"""
-        with open(fp, "wb") as outfile:
-            for chunk in resp.iter_content(chunk_size=1024):
-                if chunk:
-                    outfile.write(chunk)
-                    outfile.flush()
+    def _source_url(self) -> str:
+        # pylint: disable=no-member
+        if hasattr(self, "shortcode"):
+            return self._url_from_suburl(self.shortcode)
+        return super()._source_url()
 
     def _parse_tagged_users(self, json_dict: dict) -> List[str]:
         """Parse the tagged users from JSON dict containing the tagged users"""
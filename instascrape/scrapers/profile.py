@@ -1,21 +1,47 @@
 from __future__ import annotations
 
+import datetime
 import time
+from collections import namedtuple
 
-from typing import List
+from typing import List, Union
 
-from bs4 import BeautifulSoup
-
-from instascrape.core._mappings import _PostMapping, _ProfileMapping
+from instascrape.core._edges import PostBatch
+from instascrape.core._mappings import _CompiledMapping, _PostMapping, _ProfileMapping
+from instascrape.core._pagination import _EdgePostsMixin
 from instascrape.core._static_scraper import _StaticHtmlScraper
 from instascrape.scrapers.post import Post
 
-class Profile(_StaticHtmlScraper):
+# Scrolls to the bottom of the page and returns its height along with the href
+# of every post thumbnail that an earlier call hasn't returned yet, so each
+# scroll only sends the newly loaded posts back instead of the whole page
+_JS_SCROLL_AND_HARVEST_SCRIPT = """
+window.scrollTo(0, document.body.scrollHeight);
+var hrefs = [];
+document.querySelectorAll("a:not([data-instascrape-seen])").forEach(function (anchor) {
+    if (anchor.querySelector("div.eLAPa") !== null) {
+        anchor.setAttribute("data-instascrape-seen", "");
+        hrefs.push(anchor.getAttribute("href"));
+    }
+});
+return [document.body.scrollHeight, hrefs];
+"""
+_JS_PAGE_LENGTH_SCRIPT = "var lenOfPage=document.body.scrollHeight; return lenOfPage;"
+
+# Timing of one scroll of get_posts
+ScrollIteration = namedtuple("ScrollIteration", ["seconds", "new_posts", "total_posts", "page_height"])
+
+class Profile(_EdgePostsMixin, _StaticHtmlScraper):
     """Scraper for an Instagram profile page"""
 
     _Mapping = _ProfileMapping
+    _METADATA_KEYS = _StaticHtmlScraper._METADATA_KEYS + ["scroll_stats"]
+    _EDGES_PATH = ("entry_data", "ProfilePage", 0, "graphql", "user", "edge_owner_to_timeline_media")
+    _RETAINED_JSON_PATHS = (_EDGES_PATH,)
+    _GRAPHQL_QUERY_HASH = "003056d32c2554def87228bc3fd9668a"
+    _GRAPHQL_EDGES_PATH = ("data", "user", "edge_owner_to_timeline_media")
 
-    def get_recent_posts(self, amt: int = 12) -> List[Post]:
+    def get_recent_posts(self, amt: int = 12, batch: bool = False) -> Union[List[Post], PostBatch]:
         """
         Return a list of the profiles recent posts. Max available for return
         is 12.
@@ -24,17 +50,19 @@ class Profile(_StaticHtmlScraper):
         ----------
         amt : int
             Amount of recent posts to return
+        batch : bool
+            Return the posts decoded into a PostBatch of columns, where Post
+            objects are only built for the posts that are indexed
 
         Returns
         -------
-        posts : List[Post]
+        posts : Union[List[Post], PostBatch]
             List containing the recent 12 posts and their available data
         """
         if amt > 12:
             raise IndexError(
-                f"{amt} is too large, 12 is max available posts. Getting more posts will require an out-of-the-box extension."
+                f"{amt} is too large, 12 is max available posts. Use iter_recent_posts to page through more of them."
             )
-        posts = []
         try:
             post_arr = self.json_dict["entry_data"]["ProfilePage"][0]["graphql"]["user"][
                 "edge_owner_to_timeline_media"
@@ -43,16 +71,17 @@ class Profile(_StaticHtmlScraper):
             raise ValueError(
                 "Can't return posts without first scraping the Profile. Call the scrape method on your object first."
             )
+        posts = self._decode_edges(post_arr[:amt])
+        return posts if batch else posts.posts()
 
-        for post in post_arr[:amt]:
-            json_dict = post["node"]
-            mapping = _PostMapping.post_from_profile_mapping()
-            post = Post(json_dict)
-            post.scrape(mapping=mapping)
-            post.username = self.username
-            post.full_name = self.full_name
-            posts.append(post)
-        return posts
+    def _edge_mapping(self) -> _CompiledMapping:
+        return _PostMapping.compile_post_from_profile_mapping()
+
+    def _decode_edges_kwargs(self) -> dict:
+        return {"username": self.username, "full_name": self.full_name}
+
+    def _graphql_variables(self) -> dict:
+        return {"id": self.id}
 
     def get_posts(self, webdriver, amount=None, login_first=False, login_pause=60, max_failed_scroll=300, scrape=False, scrape_pause=5):
         """
@@ -79,12 +108,76 @@ class Profile(_StaticHtmlScraper):
         Returns
         -------
         posts : List[Post]
-            Post objects gathered from the profile page
+            Post objects gathered from the profile page. The time each scroll
+            took is left in the scroll_stats attribute as ScrollIteration's
         """
+        posts = list(
+            self.iter_posts(
+                webdriver,
+                amount=amount,
+                login_first=login_first,
+                login_pause=login_pause,
+                max_failed_scroll=max_failed_scroll,
+            )
+        )
 
-        JS_SCROLL_SCRIPT = "window.scrollTo(0, document.body.scrollHeight); var lenOfPage=document.body.scrollHeight; return lenOfPage;"
-        JS_PAGE_LENGTH_SCRIPT = "var lenOfPage=document.body.scrollHeight; return lenOfPage;"
+        # If scrape arg is True, scrape all posts using webdriver
+        scraped_posts = []
+        if scrape:
+            for post in posts:
+                scraped_posts.append(post.scrape(inplace=False, webdriver=webdriver))
+                time.sleep(scrape_pause)
+            posts = scraped_posts
 
+        return posts
+
+    def iter_posts(
+        self,
+        webdriver,
+        amount=None,
+        until=None,
+        login_first=False,
+        login_pause=60,
+        max_failed_scroll=300,
+        scrape=False,
+        headers=None,
+        session=None,
+    ):
+        """
+        Yield Post objects from the profile as soon as scrolling loads them,
+        so they can be scraped or exported while the webdriver keeps scrolling
+
+        Parameters
+        ----------
+        webdriver : selenium.webdriver.chrome.webdriver.WebDriver
+            Selenium webdriver for rendering JavaScript and loading dynamic
+            content
+        amount : int
+            Amount of posts to yield, default is all of them
+        until : Union[datetime.datetime, datetime.date]
+            Stop at the first post uploaded at or before this time, a date
+            meaning its midnight. Posts have to be scraped to know their
+            upload date, so this implies scrape
+        login_first : bool
+            Start on login page to allow user to manually login to Instagram
+        login_pause : int
+            Length of time in seconds to pause before starting scrape
+        max_failed_scroll : int
+            Maximum amount of scroll attempts before stopping if scroll is stuck
+        scrape : bool
+            Scrape each post before yielding it. The webdriver is busy
+            scrolling, so posts are scraped with session and headers instead
+        headers : Dict[str, str]
+            Request headers for scraping the posts, e.g. with a sessionid
+            cookie
+        session : requests.Session
+            Session for scraping the posts, the pooled session if None
+
+        Yields
+        ------
+        post : Post
+            Each post found on the profile page, newest first
+        """
         # Determine how many posts are available on the page
         try:
             posts_len = self.posts
@@ -94,6 +187,12 @@ class Profile(_StaticHtmlScraper):
                 raise ValueError(f"{amount} posts requested but {self.username} only has {posts_len} posts")
         except AttributeError:
             raise AttributeError(f"{type(self)} must be scraped first")
+        scrape = scrape or until is not None
+        if isinstance(until, datetime.date) and not isinstance(until, datetime.datetime):
+            until = datetime.datetime(until.year, until.month, until.day)
+        scrape_kwargs = {"session": session}
+        if headers is not None:
+            scrape_kwargs["headers"] = headers
 
         # Manual login
         if login_first:
@@ -103,71 +202,57 @@ class Profile(_StaticHtmlScraper):
         # Get profile page
         webdriver.get(self.url)
 
-        # Continuously scroll, collect HTML, and parse Post objects
-        posts = []
-        shortcodes = []
-        scroll_attempts = 0
-        last_position = webdriver.execute_script(JS_PAGE_LENGTH_SCRIPT)
-        scrolling = True
-        while scrolling:
-            current_position = webdriver.execute_script(JS_SCROLL_SCRIPT)
-            source_data = webdriver.page_source
-            found_posts = self._separate_posts(source_data)
-
-            # Append found posts into total posts
+        # Continuously scroll and yield the newly loaded posts
+        yielded = 0
+        for found_posts in self._harvest_posts(webdriver, max_failed_scroll):
             for post in found_posts:
-                if post.source not in shortcodes:
-                    shortcodes.append(post.source)
-                    posts.append(post)
+                if yielded >= amount:
+                    return
+                if scrape:
+                    post.scrape(**scrape_kwargs)
+                    if until is not None and post.upload_date <= until:
+                        return
+                yield post
+                yielded += 1
+            if yielded >= amount:
+                return
+
+    def _harvest_posts(self, webdriver, max_failed_scroll):
+        """
+        Scroll the profile page loaded in the webdriver and yield the Post
+        objects each scroll loaded that weren't found before, until scrolling
+        is stuck for more than max_failed_scroll attempts
+        """
+        self.scroll_stats = []
+        shortcodes = set()
+        scroll_attempts = 0
+        last_position = webdriver.execute_script(_JS_PAGE_LENGTH_SCRIPT)
+        while True:
+            start = time.perf_counter()
+            current_position, post_hrefs = webdriver.execute_script(_JS_SCROLL_AND_HARVEST_SCRIPT)
+            found_posts = []
+            for href in post_hrefs:
+                shortcode = self._shortcode_from_href(href)
+                if shortcode not in shortcodes:
+                    shortcodes.add(shortcode)
+                    found_posts.append(Post(shortcode))
+            self.scroll_stats.append(
+                ScrollIteration(time.perf_counter() - start, len(found_posts), len(shortcodes), current_position)
+            )
+            yield found_posts
 
-            # If scroll is stuck and exceeds max allowed attempts, exit loop
+            # If scroll is stuck and exceeds max allowed attempts, stop
             if current_position == last_position:
                 scroll_attempts += 1
                 if scroll_attempts > max_failed_scroll:
-                    scrolling = False
+                    return
             else:
                 scroll_attempts = 0
                 last_position = current_position
 
-            current_post_len = len(posts)
-            if (current_post_len >= posts_len) or (current_post_len >= amount):
-                break
-
-        # Remove excess posts from right of list
-        posts = posts[:amount]
-
-        # If scrape arg is True, scrape all posts using webdriver
-        scraped_posts = []
-        if scrape:
-            for post in posts:
-                scraped_posts.append(post.scrape(inplace=False, webdriver=webdriver))
-                time.sleep(scrape_pause)
-            posts = scraped_posts
-
-        return posts
-
-    def _separate_posts(self, source_data):
-        """Separate the HTML and parse out BeautifulSoup for every post"""
-        post_soup = []
-
-        soup = BeautifulSoup(source_data, features="lxml")
-        anchor_tags = soup.find_all("a")
-        post_tags = [tag for tag in anchor_tags if tag.find(
-            "div", {"class": "eLAPa"})]
-
-        #Filter new posts that have not been stored yet
-        new_posts = [tag for tag in post_tags if tag not in post_soup]
-        post_soup += new_posts
-
-        return self._create_post_objects(post_soup)
-
-    def _create_post_objects(self, post_soup):
-        """Create a Post object from the given shortcode"""
-        posts = []
-        for post in post_soup:
-            shortcode = post["href"].replace("/p/", "")[:-1]
-            posts.append(Post(shortcode))
-        return posts
+    @staticmethod
+    def _shortcode_from_href(href):
+        return href.replace("/p/", "")[:-1]
 
     def _url_from_suburl(self, suburl):
         return f"https://www.instagram.com/{suburl}/"
@@ -5,39 +5,138 @@ from typing import Any, Dict, Union, Callable, List
 from collections import deque
 import datetime
 from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 import copy
+import threading
 import time
 
 import requests
 from bs4 import BeautifulSoup
 
-from instascrape.core.json_algos import _JSONTree, _parse_json_str
+from instascrape.core.json_algos import _FLATTEN_ENGINES, _SUFFIX_CACHE, _parse_json_str, _scan_json_str
+from instascrape.core._html_parsers import (
+    available_html_parsers,
+    get_html_parser,
+    json_strs_from_html,
+    set_html_parser,
+)
+from instascrape.core._async import HostRateLimiter, scrape_many
+from instascrape.core._backoff import AdaptiveRateController
+from instascrape.core._batch import BatchReport, ParsedPage, iter_pages, iter_parsed, parse_pages
+from instascrape.core._checkpoint import CheckpointJournal, post_key
+from instascrape.core._download import DownloadReport, DownloadResult, download_posts
+from instascrape.core._edges import PostBatch, decode_edges
+from instascrape.core._export import arrow_schema, export_schema, to_arrow, to_ndjson, to_parquet
+from instascrape.core._hooks import ScrapeHooks, add_hooks, get_hooks, remove_hooks
+from instascrape.core._http import SessionManager, get_session_manager, http_session, set_session_manager
+from instascrape.core._metrics import PrometheusExporter
+from instascrape.core._page_cache import PageCache, get_page_cache, set_page_cache
+from instascrape.core._records import record_type
+from instascrape.core._replay import RecordingAdapter, ReplayAdapter, ReplayArchive, record_traffic, replay_traffic
+from instascrape.core._rate_limit import TokenBucket
+from instascrape.core._stats import ScrapeStats, StatsAggregator, get_stats_aggregator, set_stats_aggregator
+from instascrape.core._trace import JsonlTraceSink
 
 JSONDict = Dict[str, Any]
 
-def parse_data_from_json(json_dict, map_dict, default_value=float('nan')):
+# The core API is re-exported here so it can be imported from instascrape
+__all__ = [
+    "determine_json_type",
+    "flatten_dict",
+    "json_from_html",
+    "json_from_soup",
+    "json_from_url",
+    "parse_data_from_json",
+    "scrape_posts",
+    "AdaptiveRateController",
+    "BatchReport",
+    "CheckpointJournal",
+    "DownloadReport",
+    "DownloadResult",
+    "HostRateLimiter",
+    "JsonlTraceSink",
+    "PageCache",
+    "ParsedPage",
+    "PostBatch",
+    "PrometheusExporter",
+    "RecordingAdapter",
+    "ReplayAdapter",
+    "ReplayArchive",
+    "ScrapeHooks",
+    "ScrapeStats",
+    "SessionManager",
+    "StatsAggregator",
+    "TokenBucket",
+    "add_hooks",
+    "arrow_schema",
+    "available_html_parsers",
+    "decode_edges",
+    "download_posts",
+    "export_schema",
+    "get_hooks",
+    "get_html_parser",
+    "get_page_cache",
+    "get_session_manager",
+    "get_stats_aggregator",
+    "http_session",
+    "iter_pages",
+    "iter_parsed",
+    "json_strs_from_html",
+    "parse_pages",
+    "post_key",
+    "record_traffic",
+    "record_type",
+    "remove_hooks",
+    "replay_traffic",
+    "scrape_many",
+    "set_html_parser",
+    "set_page_cache",
+    "set_session_manager",
+    "set_stats_aggregator",
+    "to_arrow",
+    "to_ndjson",
+    "to_parquet",
+]
+
+def parse_data_from_json(json_dict, map_dict, default_value=float('nan'), nested_json_dict=None):
     """
     Parse data from a JSON dictionary using a mapping dictionary that tells
     the program how to parse the data
+
+    The first step of each directive is looked up in the flattened json_dict
+    and any further steps traverse into that value. If that fails and the
+    nested_json_dict the flattened dictionary came from is given, the steps
+    are followed from its root instead, which is how directives such as
+    ["edge_media_to_caption", "edges", 0, "node", "text"] reach their value.
+    The map_dict is never modified.
     """
     return_data = {}
-    for key in map_dict:
-        steps_to_value = map_dict[key]
+    for key, steps_to_value in map_dict.items():
 
         # Loop through all steps into the JSON dict that will give us our data
-        first_step = steps_to_value.popleft()
+        steps = iter(steps_to_value)
         try:
-            value = json_dict[first_step]
-        except KeyError:
+            value = json_dict[next(steps)]
+            for step in steps:
+                value = value[step]
+        except (KeyError, IndexError, TypeError):
             value = default_value
-        else:
-            for step in steps_to_value:
-                value = json_dict[step]
-        finally:
-            return_data[key] = value
+            if nested_json_dict is not None:
+                value = _traverse_json(nested_json_dict, steps_to_value, default_value)
+        return_data[key] = value
     return return_data
 
-def flatten_dict(json_dict: JSONDict) -> JSONDict:
+def _traverse_json(json_dict, steps, default_value):
+    """Follow the steps from the root of a nested JSON dict"""
+    value = json_dict
+    try:
+        for step in steps:
+            value = value[step]
+    except (KeyError, IndexError, TypeError):
+        value = default_value
+    return value
+
+def flatten_dict(json_dict: JSONDict, engine: str = "iterative", keys: List[str] = None) -> JSONDict:
     """
     Returns a flattened dictionary of data
 
@@ -45,25 +144,30 @@ def flatten_dict(json_dict: JSONDict) -> JSONDict:
     ----------
     json_dict : dict
         Input dictionary for flattening
+    engine : str
+        Flattening engine to use, either "iterative" (single stack-based pass)
+        or "tree" (the original _JSONTree implementation). Both produce the
+        same keys. The "path" engine only keys the given ones, with the same
+        values a full flatten gives them.
+    keys : List[str]
+        Flattened keys needed by the "path" engine, ignored by the others
 
     Returns
     -------
     flattened_dict : dict
         Flattened dictionary
     """
-    json_tree = _JSONTree(json_dict)
-    flattened_dict = {}
-    for leaf_node in json_tree.leaf_nodes:
-        key_arr = deque([])
-        for key in leaf_node.prior_keys[::-1]:
-            key_arr.appendleft(str(key))
-            new_key = "_".join(key_arr)
-            if new_key not in flattened_dict:
-                break
-        flattened_dict[new_key] = list(leaf_node.json_data.values())[0]
-    return flattened_dict
+    if engine == "path" and keys is not None:
+        return _SUFFIX_CACHE.flatten(json_dict, keys)
+    if engine == "path":
+        engine = "iterative"
+    try:
+        flatten_engine = _FLATTEN_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"{engine} is not a valid engine, use one of {', '.join(_FLATTEN_ENGINES)}")
+    return flatten_engine(json_dict)
 
-def json_from_html(source: Union[str, "BeautifulSoup"], as_dict: bool = True, flatten=False) -> Union[JSONDict, str]:
+def json_from_html(source: Union[str, "BeautifulSoup"], as_dict: bool = True, flatten=False, extractor="scanner") -> Union[JSONDict, str]:
     """
     Return JSON data parsed from Instagram source HTML
 
@@ -75,6 +179,10 @@ def json_from_html(source: Union[str, "BeautifulSoup"], as_dict: bool = True, fl
         Return JSON as dict if True else return JSON as string
     flatten : bool
         Flatten the dictionary prior to returning it
+    extractor : str
+        "scanner" finds the JSON by scanning the raw HTML string for script
+        tags, "soup" parses the HTML with the backend set by set_html_parser
+        first. A BeautifulSoup source is always read as a soup.
 
     Returns
     -------
@@ -83,13 +191,22 @@ def json_from_html(source: Union[str, "BeautifulSoup"], as_dict: bool = True, fl
         or just the string serialization
     """
 
-    soup = BeautifulSoup(source, features="html.parser")
-    json_data = json_from_soup(source=soup, as_dict=as_dict, flatten=flatten)
+    if extractor not in ("scanner", "soup"):
+        raise ValueError(f"{extractor} is not a valid extractor, use scanner or soup")
+
+    if isinstance(source, BeautifulSoup):
+        json_data = json_from_soup(source=source, as_dict=as_dict, flatten=flatten)
+    elif extractor == "scanner":
+        json_data = _json_from_strs(_scan_json_str(source), as_dict=as_dict, flatten=flatten)
+    else:
+        json_data = _json_from_strs(json_strs_from_html(source), as_dict=as_dict, flatten=flatten)
     return json_data
 
 def json_from_soup(source, as_dict: bool = True, flatten=False):
     json_data = _parse_json_str(source=source)
+    return _json_from_strs(json_data, as_dict=as_dict, flatten=flatten)
 
+def _json_from_strs(json_data: List[str], as_dict: bool = True, flatten=False):
     if as_dict:
         json_data = [json.loads(json_str) for json_str in json_data]
     if flatten:
@@ -126,7 +243,8 @@ def json_from_url(
     headers={
         "user-agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Mobile Safari/537.36 Edg/87.0.664.57"
     },
-    flatten=False
+    flatten=False,
+    extractor="scanner"
 ) -> Union[JSONDict, str]:
     """
     Return JSON data parsed from a provided Instagram URL
@@ -141,6 +259,8 @@ def json_from_url(
             Dictionary of request headers to be passed on the GET request
     flatten : bool
         Flatten the dictionary prior to returning it
+    extractor : str
+        "scanner" or "soup", see json_from_html
 
     Returns
     -------
@@ -148,8 +268,14 @@ def json_from_url(
         Parsed JSON data from the URL as either a JSON-like dictionary
         or just the string serialization
     """
-    source = requests.get(url, headers=headers).text
-    return json_from_html(source, as_dict=as_dict, flatten=flatten)
+    cache = get_page_cache()
+    source = cache.get(url, headers) if cache is not None else None
+    if source is None:
+        response = http_session().get(url, headers=headers)
+        source = response.text
+        if cache is not None and response.status_code == 200:
+            cache.set(url, source, headers)
+    return json_from_html(source, as_dict=as_dict, flatten=flatten, extractor=extractor)
 
 
 def scrape_posts(
@@ -163,52 +289,213 @@ def scrape_posts(
         pause: int = 5,
         on_exception: str = "raise",
         silent: bool = True,
-        inplace: bool = False
+        inplace: bool = False,
+        workers: int = None,
+        rate: float = None,
+        burst: int = 1,
+        limiter: TokenBucket = None,
+        controller: AdaptiveRateController = None,
+        retain: str = "all",
+        checkpoint: Union[str, CheckpointJournal] = None
     ):
+    """
+    Scrape a list of Post objects in order
+
+    Parameters
+    ----------
+    posts : List[Post]
+        Posts to scrape, newest first if limit is a date
+    session : requests.Session
+        Session for making the GET requests
+    webdriver : selenium.webdriver.chrome.webdriver.WebDriver
+        Webdriver for scraping the posts, can't be combined with workers
+    limit : Union[int, datetime.datetime]
+        Amount of posts to scrape, or the upload date to stop scraping at
+    headers : Dict[str, str]
+        Dictionary of request headers to be passed on every GET request
+    pause : int
+        Seconds to sleep between posts when no rate limiter is given. With
+        workers it's turned into a rate of 1/pause requests per second
+    on_exception : str
+        "raise" the exception, "pass" over the post, or "return" what was
+        scraped so far
+    silent : bool
+        Don't print progress
+    inplace : bool
+        Scrape the given posts instead of copies of them
+    workers : int
+        Scrape on a pool of this many threads instead of one post at a time
+    rate : float
+        Maximum requests per second, replaces pause
+    burst : int
+        Amount of requests allowed at once before rate applies
+    limiter : TokenBucket
+        Token bucket to share between several calls, overrides rate and burst
+    controller : AdaptiveRateController
+        Backs off and eventually stops requesting with a session once
+        Instagram redirects to login, serves error pages or rate limits it
+    retain : str
+        What each post keeps of its page once scraped, "all", "json" or
+        "none", see Post.scrape
+    checkpoint : Union[str, CheckpointJournal]
+        Journal filepath, or an open CheckpointJournal, that each scraped
+        post's shortcode is appended to. Posts already in it are skipped and
+        count towards an int limit, so rerunning the same call after a crash
+        or rate limit resumes where it stopped
+
+    Returns
+    -------
+    scraped_posts, unscraped_posts : Tuple[List[Post], List[Post]]
+        Posts that were scraped and posts that weren't, in the order given.
+        Posts skipped because of the checkpoint are in neither
+    """
 
     # Default setup
-    if not inplace:
-        posts = copy.deepcopy(posts)
     if limit is None:
         limit = len(posts)
+    if limiter is None and rate is not None:
+        limiter = TokenBucket(rate, burst)
+    if workers is not None:
+        if webdriver is not None:
+            raise ValueError("A webdriver can't be shared between workers, use a session instead")
+        if limiter is None and pause:
+            limiter = TokenBucket(1 / pause, burst)
 
-    scraped_posts = []
+    journal = CheckpointJournal(checkpoint) if isinstance(checkpoint, str) else checkpoint
+    results = None
+    try:
+        to_scrape = posts[:limit] if isinstance(limit, int) else posts
+        if journal is not None:
+            posts = [post for post in posts if post_key(post) not in journal]
+            to_scrape = [post for post in to_scrape if post_key(post) not in journal]
+
+        # Posts are only copied, shallowly, as they're scraped. Scraping sets
+        # new attributes rather than mutating existing ones, so the originals
+        # stay as they were
+        scrape_args = (session, webdriver, headers, controller, retain, inplace, limiter)
+        if workers is None:
+            results = _scrape_posts_serial(to_scrape, pause, *scrape_args)
+        else:
+            results = _scrape_posts_threaded(to_scrape, workers, *scrape_args)
+
+        scraped_posts = []
+        handled_indices = set()
+        for i, post, exception in results:
+            if exception is not None:
+                if _handle_scrape_exception(exception, on_exception, silent):
+                    break
+                continue
+            # html and JSON sources only reveal their shortcode once scraped
+            if journal is not None and post.shortcode in journal:
+                handled_indices.add(i)
+                continue
+            if not silent:
+                output_str = f"{i}: {post.shortcode} - {post.upload_date}"
+                print(output_str)
+            # The post past a date limit isn't returned as scraped
+            if isinstance(limit, (datetime.datetime, datetime.date)) and post.upload_date <= limit:
+                break
+            scraped_posts.append(post)
+            handled_indices.add(i)
+            if journal is not None:
+                journal.add(post.shortcode)
+    finally:
+        if results is not None:
+            results.close()
+        if journal is not None and journal is not checkpoint:
+            journal.close()
+
+    if inplace:
+        return scraped_posts, None
+    unscraped_posts = [post for i, post in enumerate(posts) if i not in handled_indices]
+    return scraped_posts, unscraped_posts
+
+def _scrape_posts_serial(posts, pause, session, webdriver, headers, controller, retain, inplace, limiter):
+    """Scrape posts one at a time, yielding the index, post and exception of each"""
     for i, post in enumerate(posts):
-        temporary_post = copy.deepcopy(post)
+        if not inplace:
+            post = copy.copy(post)
+        if limiter is not None:
+            limiter.acquire()
+        elif i:
+            # Pause between posts, not after the last one
+            time.sleep(pause)
         try:
-            post.scrape(session=session, webdriver=webdriver, headers=headers)
-            scraped_posts.append(post)
+            _scrape_post(post, session, webdriver, headers, controller, retain)
+            yield i, post, None
         except Exception as e:
-            if on_exception == "raise":
-                raise
-            elif on_exception == "pass":
-                if not silent:
-                    print(f"PASSING EXCEPTION: {e}")
-                pass
-            elif on_exception == "return":
-                if not silent:
-                    print(f"{e}, RETURNING SCRAPED AND UNSCRAPED")
-                break
+            yield i, post, e
+
+def _scrape_posts_threaded(posts, workers, session, webdriver, headers, controller, retain, inplace, limiter):
+    """
+    Scrape posts on a thread pool while yielding results in the original
+    order, so limit and on_exception behave as they do when scraping serially.
+    Only a few posts beyond the one being handled are ever in flight, and
+    once the caller stops, e.g. at a date limit, those still queued or
+    waiting for the limiter are dropped without being requested.
+    """
+    stop = threading.Event()
+
+    def _scrape(post):
+        if limiter is not None:
+            delay = limiter.reserve()
+            if delay and stop.wait(delay):
+                return
+        if stop.is_set():
+            return
+        _scrape_post(post, session, None, headers, controller, retain, stop)
+
+    pending = deque()
+    post_iter = iter(enumerate(posts))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def _fill():
+            while len(pending) < 2 * workers:
+                try:
+                    i, post = next(post_iter)
+                except StopIteration:
+                    return
+                if not inplace:
+                    post = copy.copy(post)
+                pending.append((i, post, executor.submit(_scrape, post)))
+
+        _fill()
+        try:
+            while pending:
+                i, post, future = pending.popleft()
+                try:
+                    future.result()
+                    yield i, post, None
+                except Exception as e:
+                    yield i, post, e
+                _fill()
+        finally:
+            stop.set()
+            for _, _, future in pending:
+                future.cancel()
+
+def _scrape_post(post, session, webdriver, headers, controller, retain, stop=None):
+    """
+    Scrape a post, waiting on and reporting to the controller if there is
+    one. The post isn't scraped if stop is set while waiting on the controller
+    """
+    if controller is None:
+        post.scrape(session=session, webdriver=webdriver, headers=headers, retain=retain)
+    else:
+        key = controller.session_key(headers, webdriver if webdriver is not None else session)
+        controller.call(
+            key, post.scrape, session=session, webdriver=webdriver, headers=headers, retain=retain, stop=stop
+        )
+
+def _handle_scrape_exception(e, on_exception, silent):
+    """Raise or report an exception from scraping a post, return True to stop"""
+    if on_exception == "raise":
+        raise e
+    elif on_exception == "pass":
+        if not silent:
+            print(f"PASSING EXCEPTION: {e}")
+    elif on_exception == "return":
         if not silent:
-            output_str = f"{i}: {post.shortcode} - {post.upload_date}"
-            print(output_str)
-        if _stop_scraping(limit, post, i):
-            break
-        time.sleep(pause)
-
-    unscraped_posts = list(set(posts) - set(scraped_posts))
-    if not isinstance(limit, int):
-        scraped_posts.pop()
-        unscraped_posts.insert(0, temporary_post)
-
-    return scraped_posts, unscraped_posts if not inplace else None
-
-def _stop_scraping(limit, post, i):
-    stop = False
-    if isinstance(limit, int):
-        if i == limit - 1:
-            stop = True
-    elif (isinstance(limit, datetime.datetime) or isinstance(limit, datetime.date)):
-        if post.upload_date <= limit:
-            stop = True
-    return stop
+            print(f"{e}, RETURNING SCRAPED AND UNSCRAPED")
+        return True
+    return False
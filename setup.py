@@ -14,6 +14,13 @@ setuptools.setup(
     url="https://github.com/chris-greening/instascrape",
     packages=["instascrape", "instascrape.core", "instascrape.scrapers", "instascrape.exceptions"],
     install_requires=["requests", "beautifulsoup4"],
+    entry_points={"console_scripts": ["instascrape-batch=instascrape.core._batch:main"]},
+    extras_require={
+        "async": ["aiohttp"],
+        "lxml": ["lxml"],
+        "parquet": ["pyarrow"],
+        "selectolax": ["selectolax"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
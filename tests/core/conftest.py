@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import instascrape.core._pagination as pagination
+from instascrape import Hashtag, Post
+
+
+def shared_data_html(json_dict):
+    return f'<html><script type="text/javascript">window._sharedData = {json.dumps(json_dict)};</script></html>'
+
+
+def page_html(page_type, graphql):
+    return shared_data_html({"config": {}, "entry_data": {page_type: [{"graphql": graphql}]}})
+
+
+def tag_html(name):
+    return page_html("TagPage", {"hashtag": {"id": "1", "name": name}})
+
+
+def post_html(shortcode):
+    media = {
+        "id": shortcode,
+        "shortcode": shortcode,
+        "taken_at_timestamp": 1609459200,
+        "edge_media_to_tagged_user": {"edges": []},
+        "owner": {"full_name": "Chris Greening"},
+    }
+    return page_html("PostPage", {"shortcode_media": media})
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that doesn't log, for tests to route with their own do_GET"""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_body(self, body, content_type="text/html", status=200, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer(ThreadingHTTPServer):
+    # Pooled connections stay open, so don't wait on their handlers to close
+    daemon_threads = True
+    block_on_close = False
+
+
+class PageHandler(QuietHandler):
+    """Serves the server's media bytes under /media, a PostPage under /p and a TagPage anywhere else"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        parts = self.path.strip("/").split("/")
+        if parts[0] == "media":
+            body, content_type = self.server.media, "image/jpeg"
+        elif parts[0] == "p":
+            body, content_type = post_html(parts[1]).encode(), "text/html"
+        elif parts[-1] == "login":
+            body, content_type = page_html("LoginAndSignupPage", {}).encode(), "text/html"
+        else:
+            body, content_type = tag_html(parts[-1]).encode(), "text/html"
+        time.sleep(self.server.delay)
+        self.send_body(body, content_type)
+
+
+class GraphQLHandler(QuietHandler):
+    """Answers each query with the server's respond(variables), sent as the query's data when it is a dict"""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        variables = json.loads(query["variables"][0])
+        self.server.requests.append((time.monotonic(), query["query_hash"][0], variables))
+        root = self.server.respond(variables)
+        time.sleep(self.server.delay)
+        if isinstance(root, dict):
+            self.send_body(json.dumps({"data": root, "status": "ok"}).encode(), "application/json")
+        else:
+            self.send_body(root.encode())
+
+
+@pytest.fixture
+def local_server():
+    """Start a LocalServer on a free port with handler, setting attrs on it for the handler to read"""
+    servers = []
+
+    def _start(handler, **attrs):
+        httpd = LocalServer(("127.0.0.1", 0), handler)
+        for key, value in attrs.items():
+            setattr(httpd, key, value)
+        httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return httpd
+
+    yield _start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture
+def page_server(local_server, monkeypatch):
+    """Start a page server and point Hashtag and Post scrapes at it"""
+
+    def _start(handler=PageHandler, media=b"", delay=0):
+        httpd = local_server(handler, media=media, delay=delay, requests=0)
+        monkeypatch.setattr(Hashtag, "_url_from_suburl", lambda self, suburl: f"{httpd.url}/explore/tags/{suburl}/")
+        monkeypatch.setattr(Post, "_url_from_suburl", lambda self, suburl: f"{httpd.url}/p/{suburl}/")
+        return httpd
+
+    return _start
+
+
+@pytest.fixture
+def graphql_server(local_server, monkeypatch):
+    """Start a GraphQL server answering with respond and point pagination at it"""
+
+    def _start(respond, delay=0):
+        httpd = local_server(GraphQLHandler, respond=respond, delay=delay, requests=[])
+        monkeypatch.setattr(pagination, "GRAPHQL_URL", f"{httpd.url}/graphql/query/")
+        return httpd
+
+    return _start
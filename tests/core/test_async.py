@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from instascrape import Hashtag, PageCache, Post, scrape_many, set_page_cache
+from instascrape.core._rate_limit import TokenBucket
+from tests.core.conftest import tag_html
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+class FakeResponse:
+
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+        self.status = session.status
+
+    async def __aenter__(self):
+        self.session.in_flight += 1
+        self.session.max_in_flight = max(self.session.max_in_flight, self.session.in_flight)
+        await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *args):
+        self.session.in_flight -= 1
+
+    async def text(self):
+        return tag_html(self.url.rstrip("/").split("/")[-1])
+
+
+class FakeSession:
+    """Stands in for aiohttp.ClientSession"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.urls = []
+
+    def get(self, url, headers):
+        self.urls.append(url)
+        return FakeResponse(self, url)
+
+
+class TestAsync:
+
+    def test_ascrape(self):
+        session = FakeSession()
+        hashtag = Hashtag("kotlin")
+        asyncio.run(hashtag.ascrape(session=session))
+        assert session.urls == ["https://www.instagram.com/tags/kotlin/"]
+        assert hashtag.name == "kotlin"
+        assert hashtag.url == "https://www.instagram.com/tags/kotlin/"
+
+    def test_scrape_many_bounds_concurrency(self):
+        session = FakeSession()
+        hashtags = [Hashtag(f"tag{i}") for i in range(20)]
+        scraped = asyncio.run(scrape_many(hashtags, concurrency=4, session=session))
+        assert [hashtag.name for hashtag in scraped] == [f"tag{i}" for i in range(20)]
+        assert session.max_in_flight == 4
+
+    def test_scrape_many_not_inplace(self):
+        hashtags = [Hashtag("python")]
+        scraped = asyncio.run(scrape_many(hashtags, session=FakeSession(), inplace=False))
+        assert scraped[0] is not hashtags[0]
+        assert scraped[0].name == "python"
+
+    @pytest.mark.parametrize("status", [200, 404])
+    def test_ascrape_caches_only_ok_pages(self, tmp_path, status):
+        cache = PageCache(str(tmp_path / "pages.sqlite3"))
+        set_page_cache(cache)
+        try:
+            asyncio.run(Hashtag("kotlin").ascrape(session=FakeSession(status)))
+        finally:
+            set_page_cache(None)
+        assert cache.stats()["entries"] == (1 if status == 200 else 0)
+
+    def test_ascrape_without_request(self):
+        post = Post({"id": "1", "shortcode": "CJpBmOtAmNr", "taken_at_timestamp": 1609459200})
+        asyncio.run(post.ascrape(mapping={"id": ["id"]}))
+        assert post.id == "1"
+
+
+class TestTokenBucket:
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
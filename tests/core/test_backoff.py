@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+
+from instascrape import AdaptiveRateController, scrape_posts
+from instascrape.exceptions.exceptions import (
+    CircuitOpenError,
+    InstagramLoginRedirectError,
+    InstagramRateLimitError,
+)
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyPost:
+    """Post stand in whose scrape raises the queued exceptions first"""
+
+    shortcode = "CJpB0000000"
+    upload_date = None
+
+    def __init__(self, exceptions):
+        self.exceptions = list(exceptions)
+        self.scraped = 0
+
+    def scrape(self, **kwargs):
+        if self.exceptions:
+            raise self.exceptions.pop(0)
+        self.scraped += 1
+
+
+class TestAdaptiveRateController:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def controller(self, clock):
+        return AdaptiveRateController(
+            base_delay=1, max_delay=8, jitter=0, failure_threshold=3, recovery_time=60, clock=clock
+        )
+
+    def test_delay_grows_exponentially_and_resets(self, controller):
+        assert controller.before_request("a") == 0
+        delays = []
+        for _ in range(2):
+            controller.record_failure("a", InstagramRateLimitError())
+            delays.append(controller.before_request("a"))
+        assert delays == [1, 2]
+        controller.record_success("a")
+        assert controller.before_request("a") == 0
+
+    def test_delay_is_capped(self, clock):
+        controller = AdaptiveRateController(base_delay=1, max_delay=4, jitter=0, failure_threshold=100, clock=clock)
+        for _ in range(10):
+            controller.record_failure("a", InstagramRateLimitError())
+        assert controller.before_request("a") == 4
+
+    def test_jitter_stays_within_bounds(self, clock):
+        controller = AdaptiveRateController(base_delay=10, jitter=0.5, failure_threshold=100, clock=clock)
+        controller.record_failure("a", InstagramRateLimitError())
+        assert 5 <= controller.before_request("a") <= 10
+
+    def test_other_exceptions_are_ignored(self, controller):
+        assert not controller.record_failure("a", KeyError("x"))
+        assert controller.before_request("a") == 0
+
+    def test_circuit_opens_half_opens_and_closes(self, controller, clock):
+        for _ in range(3):
+            controller.record_failure("a", InstagramLoginRedirectError())
+        assert controller.state()["a"]["state"] == "open"
+        with pytest.raises(CircuitOpenError) as excinfo:
+            controller.before_request("a")
+        assert excinfo.value.retry_after == 60
+
+        clock.now = 61
+        assert controller.before_request("a") == 0
+        assert controller.state()["a"]["state"] == "half_open"
+        with pytest.raises(CircuitOpenError):
+            controller.before_request("a")
+        controller.record_success("a")
+        assert controller.state()["a"]["state"] == "closed"
+
+    def test_failed_probe_doubles_open_time(self, controller, clock):
+        for _ in range(3):
+            controller.record_failure("a", InstagramRateLimitError())
+        clock.now = 61
+        controller.before_request("a")
+        controller.record_failure("a", InstagramRateLimitError())
+        assert controller.state()["a"]["retry_in"] == 120
+
+    def test_other_exception_on_probe_keeps_backoff(self, controller, clock):
+        for _ in range(3):
+            controller.record_failure("a", InstagramRateLimitError())
+        clock.now = 61
+        with pytest.raises(ConnectionError):
+            controller.call("a", FlakyPost([ConnectionError()]).scrape)
+        state = controller.state()["a"]
+        assert state["state"] == "half_open"
+        assert state["consecutive_failures"] == 3 and state["total_successes"] == 0
+        # The next request probes in its place
+        assert controller.before_request("a") == 0
+        controller.record_failure("a", InstagramRateLimitError())
+        assert controller.state()["a"]["retry_in"] == 120
+
+    def test_stop_ends_wait(self):
+        controller = AdaptiveRateController(failure_threshold=1, recovery_time=600)
+        controller.record_failure("a", InstagramRateLimitError())
+        post, stop = FlakyPost([]), threading.Event()
+        waiter = threading.Thread(target=controller.call, args=("a", post.scrape), kwargs={"stop": stop}, daemon=True)
+        waiter.start()
+        stop.set()
+        waiter.join(timeout=5)
+        assert not waiter.is_alive() and post.scraped == 0
+        assert controller.wait("b", stop) is True
+
+    def test_sessions_are_independent(self, controller):
+        for _ in range(3):
+            controller.record_failure("a", InstagramRateLimitError())
+        assert controller.before_request("b") == 0
+        assert set(controller.state()) == {"a", "b"}
+
+    def test_session_key_hashes_sessionid(self):
+        key = AdaptiveRateController.session_key({"cookie": "sessionid=secret;"})
+        assert key.startswith("sessionid:")
+        assert "secret" not in key
+        assert AdaptiveRateController.session_key({}) == "default"
+
+    def test_scrape_posts_backs_off(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr("instascrape.core._backoff.time.sleep", sleeps.append)
+        controller = AdaptiveRateController(base_delay=1, jitter=0, failure_threshold=10)
+        posts = [FlakyPost([InstagramRateLimitError()]), FlakyPost([InstagramRateLimitError()]), FlakyPost([])]
+
+        scraped, unscraped = scrape_posts(posts, pause=0, on_exception="pass", inplace=True, controller=controller)
+        assert [s for s in sleeps if s] == [1, 2]
+        assert scraped == posts[2:]
+        assert controller.state()["default"]["consecutive_failures"] == 0
+        assert controller.state()["default"]["total_failures"] == 2
@@ -0,0 +1,147 @@
+import gzip
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from benchmarks._corpus import CORPUS_DIR, load_corpus
+from instascrape import BatchReport, iter_pages, iter_parsed, parse_pages
+from instascrape.core._batch import detect_page, main
+from instascrape.core._export import export_rows, export_schema
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+CORPUS = load_corpus()
+KINDS = ["hashtag", "igtv", "location", "post", "profile", "reel"]
+
+
+@pytest.fixture
+def pages_dir(tmp_path):
+    directory = tmp_path / "pages"
+    (directory / "nested").mkdir(parents=True)
+    for name, (_, html) in CORPUS.items():
+        if name in ("post", "reel"):
+            (directory / "nested" / f"{name}.html").write_text(html, encoding="utf-8")
+        else:
+            (directory / f"{name}.html.gz").write_bytes(gzip.compress(html.encode("utf-8")))
+    (directory / "notes.txt").write_text("not a page")
+    return directory
+
+
+def _read_ndjson(fp):
+    return [json.loads(line) for line in fp.read_text(encoding="utf-8").splitlines()]
+
+
+class TestPages:
+
+    def test_iter_dir(self, pages_dir):
+        names = [page[1].rsplit("/", 1)[-1] for page in iter_pages(str(pages_dir))]
+        assert "notes.txt" not in names
+        assert len(names) == len(CORPUS)
+
+    def test_iter_archives(self, tmp_path):
+        zip_fp, tar_fp = tmp_path / "pages.zip", tmp_path / "pages.tar.gz"
+        with zipfile.ZipFile(zip_fp, "w") as archive, tarfile.open(tar_fp, "w:gz") as tar:
+            for path in sorted(CORPUS_DIR.glob("*.html.gz")):
+                archive.write(path, f"saved/{path.name}")
+                tar.add(path, f"saved/{path.name}")
+        for fp in (zip_fp, tar_fp):
+            report = parse_pages(str(fp), str(tmp_path / fp.name.split(".")[0]), workers=0)
+            assert sorted(report.kinds) == KINDS and report.failed == 1
+
+    def test_corrupt_members(self, tmp_path):
+        fp = tmp_path / "pages.zip"
+        broken_gz = bytearray(gzip.compress(CORPUS["post"][1].encode("utf-8")))
+        broken_gz[10] = 0xFF  # Invalid deflate block type
+        with zipfile.ZipFile(fp, "w") as archive:
+            archive.writestr("saved/profile.html", CORPUS["profile"][1])
+            archive.writestr("saved/bad_crc.html", "<html>" + "x" * 100 + "</html>")
+            archive.writestr("saved/bad_deflate.html.gz", bytes(broken_gz))
+        fp.write_bytes(fp.read_bytes().replace(b"x" * 100, b"y" * 100))
+        parsed = {page.name.rsplit("/", 1)[-1]: page for page in iter_parsed(str(fp), workers=0)}
+        assert parsed["profile.html"].ok
+        assert parsed["bad_crc.html"].error.startswith("BadZipFile")
+        assert "invalid block type" in parsed["bad_deflate.html.gz"].error
+
+    def test_not_an_archive(self, tmp_path):
+        fp = tmp_path / "page.html"
+        fp.write_text("<html></html>")
+        with pytest.raises(ValueError):
+            list(iter_pages(str(fp)))
+
+    @pytest.mark.parametrize("name", list(CORPUS))
+    def test_detect_page(self, name):
+        kind, json_dict = detect_page(CORPUS[name][1])
+        assert kind == ("LoginAndSignupPage" if name == "login" else name)
+        assert "entry_data" in json_dict
+
+    def test_detect_inconclusive(self):
+        assert detect_page("<html><body>Nothing saved</body></html>") == ("Inconclusive", None)
+
+
+class TestIterParsed:
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_rows_match_scrape(self, pages_dir, workers):
+        parsed = {page.kind: page for page in iter_parsed(str(pages_dir), workers=workers, chunk_size=2)}
+        assert sorted(parsed) == sorted(KINDS + ["LoginAndSignupPage"])
+        assert not parsed["LoginAndSignupPage"].ok
+        for kind in KINDS:
+            scraper_cls, html = CORPUS[kind]
+            scraper = scraper_cls(html)
+            scraper.scrape()
+            expected = next(export_rows([scraper], export_schema(scraper_cls)))
+            assert parsed[kind].row == expected
+
+    def test_unreadable_page(self, tmp_path):
+        (tmp_path / "broken.html.gz").write_bytes(b"not gzipped")
+        (parsed,) = iter_parsed(str(tmp_path), workers=0)
+        assert parsed.name.endswith("broken.html.gz") and parsed.error.startswith("BadGzipFile")
+
+
+class TestParsePages:
+
+    def test_ndjson(self, pages_dir, tmp_path):
+        reports = []
+        out = tmp_path / "parsed"
+        report = parse_pages(str(pages_dir), str(out), workers=2, chunk_size=3, progress=reports.append)
+        assert isinstance(report, BatchReport)
+        assert dict(report.kinds) == {kind: 1 for kind in KINDS}
+        assert report.failed == 1 and report.pages == len(CORPUS)
+        assert report.bytes > 0 and report.pages_per_second > 0
+        assert reports[-1] is report
+        assert _read_ndjson(out / "profile.ndjson")[0]["username"] == CORPUS["profile"][0](CORPUS["profile"][1]).scrape(
+            inplace=False
+        ).username
+        errors = _read_ndjson(out / "errors.ndjson")
+        assert errors == [
+            {
+                "page": errors[0]["page"],
+                "kind": "LoginAndSignupPage",
+                "error": "LoginAndSignupPage is not a page that can be parsed",
+            }
+        ]
+
+    def test_exclude(self, pages_dir, tmp_path):
+        parse_pages(str(pages_dir), str(tmp_path), workers=0, exclude=["username"])
+        assert "username" not in _read_ndjson(tmp_path / "profile.ndjson")[0]
+
+    def test_parquet(self, pages_dir, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        parse_pages(str(pages_dir), str(tmp_path), format="parquet", workers=0, batch_size=1)
+        table = pq.read_table(str(tmp_path / "post.parquet"))
+        assert table.num_rows == 1
+        assert table.schema.names == [name for name, _ in export_schema(CORPUS["post"][0])]
+
+    def test_invalid_format(self, pages_dir, tmp_path):
+        with pytest.raises(ValueError):
+            parse_pages(str(pages_dir), str(tmp_path), format="csv")
+
+    def test_cli(self, pages_dir, tmp_path, capsys):
+        out = tmp_path / "parsed"
+        assert main([str(pages_dir), str(out), "--workers", "0", "--exclude", "username"]) == 0
+        assert "7 pages" in capsys.readouterr().err
+        assert sorted(fp.name for fp in out.iterdir()) == sorted(
+            [f"{kind}.ndjson" for kind in KINDS] + ["errors.ndjson"]
+        )
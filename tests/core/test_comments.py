@@ -0,0 +1,159 @@
+import datetime
+import json
+
+import pytest
+
+from instascrape import Comment, Post, comment_columns, iter_thread, to_ndjson
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+TOTAL_COMMENTS = 30
+TOTAL_REPLIES = 7
+EMBEDDED = 10
+EMBEDDED_REPLIES = 2
+
+
+def _node(comment_id, replies=None):
+    node = {
+        "id": comment_id,
+        "text": f"Comment {comment_id}",
+        "created_at": 1609459200,
+        "did_report_as_spam": False,
+        "owner": {"id": "1", "is_verified": False, "profile_pic_url": "pic.jpg", "username": f"user_{comment_id}"},
+        "viewer_has_liked": False,
+        "edge_liked_by": {"count": 3},
+        "is_restricted_pending": False,
+    }
+    if replies is not None:
+        node["edge_threaded_comments"] = replies
+    return {"node": node}
+
+
+def _page(ids, total, cursor_prefix, replies=None):
+    stop = int(ids[-1].rsplit("_", 1)[1]) + 1 if ids else 0
+    has_next_page = stop < total
+    return {
+        "count": total,
+        "page_info": {"has_next_page": has_next_page, "end_cursor": f"{cursor_prefix}{stop}" if has_next_page else None},
+        "edges": [_node(comment_id, replies(comment_id) if replies else None) for comment_id in ids],
+    }
+
+
+def _replies(comment_id, start=0, stop=EMBEDDED_REPLIES):
+    return _page([f"{comment_id}r_{i}" for i in range(start, stop)], TOTAL_REPLIES, "reply")
+
+
+def _comments(start, stop):
+    return _page([f"c_{i}" for i in range(start, stop)], TOTAL_COMMENTS, "cursor", replies=_replies)
+
+
+def _respond(variables):
+    """Page of the comment thread starting after the end_cursor in variables"""
+    if "comment_id" in variables:
+        start = int(variables["after"].replace("reply", ""))
+        edge = _replies(variables["comment_id"], start, min(TOTAL_REPLIES, start + variables["first"]))
+        return {"comment": {"edge_threaded_comments": edge}}
+    start = int(variables["after"].replace("cursor", ""))
+    edge = _comments(start, min(TOTAL_COMMENTS, start + variables["first"]))
+    return {"shortcode_media": {"edge_media_to_parent_comment": edge}}
+
+
+@pytest.fixture
+def server(graphql_server):
+    return graphql_server(_respond)
+
+
+@pytest.fixture
+def post():
+    shortcode_media = {"shortcode": "CJpB0000001", "edge_media_to_parent_comment": _comments(0, EMBEDDED)}
+    post = Post({"config": {}, "entry_data": {"PostPage": [{"graphql": {"shortcode_media": shortcode_media}}]}})
+    post.json_dict = post.source
+    post.shortcode = "CJpB0000001"
+    return post
+
+
+class TestComment:
+
+    def test_attributes(self):
+        comment = Comment(_node("c_0", _replies("c_0")))
+        assert comment.id == "c_0"
+        assert comment.text == "Comment c_0"
+        assert comment.username == "user_c_0"
+        assert comment.likes == 3
+        assert comment.created_at == datetime.datetime.fromtimestamp(1609459200)
+        assert comment.reply_count == TOTAL_REPLIES
+        assert comment.parent_id is None
+
+    def test_slotted(self):
+        comment = Comment(_node("c_0"))
+        assert not hasattr(comment, "__dict__")
+
+    def test_replies_built_on_access(self):
+        comment = Comment(_node("c_0", _replies("c_0")))
+        assert comment._replies is None
+        replies = comment.replies
+        assert [reply.id for reply in replies] == ["c_0r_0", "c_0r_1"]
+        assert all(reply.parent_id == "c_0" for reply in replies)
+        assert comment.replies is replies
+
+    def test_no_replies(self):
+        comment = Comment(_node("c_0"))
+        assert comment.replies == []
+        assert comment.reply_count == 0
+
+    def test_iter_replies(self, server):
+        comment = Comment(_node("c_0", _replies("c_0")))
+        replies = list(comment.iter_replies(page_size=3))
+        assert [reply.id for reply in replies] == [f"c_0r_{i}" for i in range(TOTAL_REPLIES)]
+        assert [variables["after"] for _, _, variables in server.requests] == ["reply2", "reply5"]
+        assert server.requests[0][1] == Comment._GRAPHQL_QUERY_HASH
+
+
+class TestIterComments:
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_follows_cursor(self, server, post, prefetch):
+        comments = list(post.iter_comments(page_size=8, prefetch=prefetch))
+        assert [comment.id for comment in comments] == [f"c_{i}" for i in range(TOTAL_COMMENTS)]
+        assert [variables["after"] for _, _, variables in server.requests] == ["cursor10", "cursor18", "cursor26"]
+        assert all(variables["shortcode"] == "CJpB0000001" for _, _, variables in server.requests)
+        assert server.requests[0][1] == Post._GRAPHQL_COMMENTS_QUERY_HASH
+
+    def test_amount(self, server, post):
+        assert len(list(post.iter_comments(amount=EMBEDDED))) == EMBEDDED
+        assert server.requests == []
+
+    def test_embedded_replies(self, server, post):
+        comments = list(post.iter_comments(amount=2, replies=True))
+        assert [comment.id for comment in comments] == ["c_0", "c_0r_0", "c_0r_1", "c_1", "c_1r_0", "c_1r_1"]
+        assert server.requests == []
+
+    def test_fetch_replies(self, server, post):
+        comments = list(post.iter_comments(amount=2, fetch_replies=True, page_size=50))
+        assert len(comments) == 2 + 2 * TOTAL_REPLIES
+        assert [comment.parent_id for comment in comments[1 : TOTAL_REPLIES + 1]] == ["c_0"] * TOTAL_REPLIES
+
+    def test_needs_scrape(self):
+        with pytest.raises(ValueError):
+            list(Post("CJpB0000001").iter_comments())
+
+
+class TestCommentColumns:
+
+    def test_thread(self, post):
+        columns = comment_columns(iter_thread(post.get_recent_comments()))
+        assert len(columns["id"]) == EMBEDDED * (1 + EMBEDDED_REPLIES)
+        assert columns["parent_id"][:3] == [None, "c_0", "c_0"]
+        assert columns["likes"][0] == 3
+        assert list(columns)[-1] == "parent_id"
+
+    def test_keys(self, post):
+        columns = comment_columns(post.get_recent_comments(), keys=["id", "username"])
+        assert list(columns) == ["id", "username"]
+
+    def test_exporters(self, post, tmp_path):
+        fp = tmp_path / "comments.ndjson"
+        assert to_ndjson(iter_thread(post.get_recent_comments()), str(fp)) == EMBEDDED * (1 + EMBEDDED_REPLIES)
+        comment, reply = [json.loads(line) for line in fp.read_text().splitlines()[:2]]
+        assert comment["reply_count"] == TOTAL_REPLIES and comment["parent_id"] is None
+        assert reply["parent_id"] == "c_0" and reply["reply_count"] == 0
@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks._corpus import SCRAPERS, load_corpus
+from benchmarks.suite import regressions, stages
+from instascrape.exceptions.exceptions import InstagramLoginRedirectError
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+CORPUS = load_corpus()
+
+
+class TestCorpus:
+
+    def test_every_kind_of_page(self):
+        assert set(SCRAPERS) <= set(CORPUS)
+
+    @pytest.mark.parametrize("name", [name for name in CORPUS if name != "login"])
+    def test_scrapes_offline(self, name):
+        scraper_cls, html = CORPUS[name]
+        scraper = scraper_cls(html)
+        scraper.scrape()
+        assert isinstance(scraper.id, str)
+
+    def test_login_redirect(self):
+        scraper_cls, html = CORPUS["login"]
+        with pytest.raises(InstagramLoginRedirectError):
+            scraper_cls(html).scrape()
+
+    def test_stages_run(self):
+        scraper_cls, html = CORPUS["hashtag"]
+        page_stages = stages(scraper_cls, "hashtag", html)
+        for _, func in page_stages:
+            func()
+        assert [name for name, _ in page_stages] == [
+            "json_from_html",
+            "flatten_dict",
+            "parse_data_from_json",
+            "scrape",
+            "get_recent_posts",
+        ]
+
+
+class TestRegressions:
+
+    def test_tolerance_and_noise_floor(self):
+        baseline = {"post/scrape": {"seconds": 0.010, "peak": 2 ** 20}, "post/parse": {"seconds": 10e-6, "peak": 100}}
+        results = {"post/scrape": {"seconds": 0.014, "peak": 2 ** 20}, "post/parse": {"seconds": 20e-6, "peak": 200}}
+        assert regressions(results, baseline, tolerance=0.5) == []
+        lines = regressions(results, baseline, tolerance=0.25)
+        assert len(lines) == 1 and lines[0].startswith("post/scrape seconds")
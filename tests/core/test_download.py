@@ -0,0 +1,99 @@
+import os
+import re
+
+import pytest
+
+from instascrape import Post, download_posts
+from instascrape.core._download import PARTIAL_SUFFIX
+from tests.core.conftest import QuietHandler
+
+MEDIA = {f"/media/{i}.jpg": os.urandom(300_000 + i) for i in range(6)}
+
+
+class RangeHandler(QuietHandler):
+
+    def do_GET(self):
+        body = MEDIA.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match and int(match.group(1)) >= len(body):
+            self.send_body(b"", "image/jpeg", status=416, headers={"Content-Range": f"bytes */{len(body)}"})
+            return
+        if not match:
+            self.send_body(body, "image/jpeg")
+        else:
+            start = int(match.group(1))
+            content_range = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            self.send_body(body[start:], "image/jpeg", status=206, headers={"Content-Range": content_range})
+        self.server.ranges.append(self.headers.get("Range"))
+
+
+@pytest.fixture
+def server(local_server):
+    return local_server(RangeHandler, ranges=[])
+
+
+def _post(server, path, shortcode):
+    post = Post({})
+    post.shortcode = shortcode
+    post.is_video = False
+    post.display_url = f"{server.url}{path}"
+    return post
+
+
+class TestDownloadPosts:
+
+    def test_downloads_concurrently(self, server, tmp_path):
+        posts = [_post(server, path, f"CJpB{i}") for i, path in enumerate(MEDIA)]
+        report = download_posts(posts, directory=str(tmp_path), workers=4, chunk_size=64 * 1024)
+        assert len(report.downloaded) == len(MEDIA)
+        assert report.bytes == sum(len(body) for body in MEDIA.values())
+        assert report.bytes_per_second > 0
+        for (path, body), result in zip(MEDIA.items(), report):
+            assert result.post.display_url.endswith(path)
+            with open(result.path, "rb") as infile:
+                assert infile.read() == body
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(PARTIAL_SUFFIX)]
+
+    def test_resumes_partial_file(self, server, tmp_path):
+        path, body = next(iter(MEDIA.items()))
+        with open(tmp_path / f"CJpB0.jpg{PARTIAL_SUFFIX}", "wb") as outfile:
+            outfile.write(body[:1000])
+        report = download_posts([_post(server, path, "CJpB0")], directory=str(tmp_path))
+        result = report.results[0]
+        assert result.resumed
+        assert result.bytes == len(body) - 1000
+        assert server.ranges == ["bytes=1000-"]
+        with open(result.path, "rb") as infile:
+            assert infile.read() == body
+
+    @pytest.mark.parametrize("extra", [b"", b"stale"])
+    def test_unsatisfiable_range(self, server, tmp_path, extra):
+        path, body = next(iter(MEDIA.items()))
+        with open(tmp_path / f"CJpB0.jpg{PARTIAL_SUFFIX}", "wb") as outfile:
+            outfile.write(body + extra)
+        result = download_posts([_post(server, path, "CJpB0")], directory=str(tmp_path)).results[0]
+        # A complete partial file is put in place, a longer one downloaded again
+        assert server.ranges == ([None] if extra else [])
+        assert result.resumed is not bool(extra)
+        with open(result.path, "rb") as infile:
+            assert infile.read() == body
+
+    def test_skips_existing_and_records_failures(self, server, tmp_path):
+        path = next(iter(MEDIA))
+        (tmp_path / "CJpB0.jpg").write_bytes(b"done")
+        posts = [_post(server, path, "CJpB0"), _post(server, "/missing.jpg", "CJpB1")]
+        report = download_posts(posts, directory=str(tmp_path), on_exception="pass")
+        assert report.results[0].skipped
+        assert len(report.failed) == 1
+        assert not os.path.exists(tmp_path / "CJpB1.jpg")
+        with pytest.raises(Exception):
+            download_posts(posts[1:], directory=str(tmp_path))
+
+    def test_post_download(self, server, tmp_path):
+        path, body = next(iter(MEDIA.items()))
+        post = _post(server, path, "CJpB0")
+        post.download(str(tmp_path / "photo.png"))
+        assert (tmp_path / "photo.png").read_bytes() == body
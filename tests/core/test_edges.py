@@ -0,0 +1,149 @@
+import datetime
+import math
+
+import pytest
+
+from instascrape import Hashtag, Post, PostBatch, Profile, decode_edges
+from instascrape.core._mappings import _PostMapping
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _node(i):
+    node = {
+        "__typename": "GraphImage",
+        "id": str(i),
+        "shortcode": f"CJpB{i:07d}",
+        "dimensions": {"height": 1080, "width": 1080},
+        "display_url": f"https://scontent.cdninstagram.com/{i}.jpg",
+        "edge_media_to_tagged_user": {"edges": []},
+        "owner": {"id": "787132"},
+        "is_video": False,
+        "accessibility_caption": f"Photo {i}",
+        "edge_media_to_caption": {"edges": [{"node": {"text": f"Post {i} #python"}}]},
+        "edge_media_to_comment": {"count": i},
+        "comments_disabled": False,
+        "taken_at_timestamp": 1609459200 - i * 3600,
+        "edge_liked_by": {"count": 100 + i},
+        "edge_media_preview_like": {"count": 100 + i},
+        "location": None,
+    }
+    if i % 5 == 3:
+        # Shaped unlike the others, which shifts the flattened key names
+        node = {"video_view_count": 7, "is_video": True, **node}
+        node["edge_media_to_caption"] = {"edges": []}
+        node["location"] = {"id": "212988663", "name": "New York"}
+    return node
+
+
+def _edges(amount):
+    return [{"node": _node(i)} for i in range(amount)]
+
+
+def _same(a, b):
+    return a == b or (isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b))
+
+
+def _scraped_one_by_one(edges, mapping):
+    posts = []
+    for edge in edges:
+        post = Post(edge["node"])
+        post.scrape(mapping=mapping)
+        posts.append(post)
+    return posts
+
+
+class TestDecodeEdges:
+
+    @pytest.mark.parametrize(
+        "mapping",
+        [
+            _PostMapping.compile_post_from_hashtag_mapping(),
+            _PostMapping.compile_post_from_profile_mapping(),
+            _PostMapping.post_from_hashtag_mapping(),
+        ],
+    )
+    def test_matches_scraping_each_edge(self, mapping):
+        edges = _edges(20)
+        batch = decode_edges(edges, mapping)
+        expected = _scraped_one_by_one(edges, mapping)
+        for i, post in enumerate(expected):
+            row = batch.row(i)
+            for key in list(mapping) + ["url"] + (["upload_date"] if "timestamp" in mapping else []):
+                assert _same(row[key], getattr(post, key)), (i, key)
+
+    def test_mixed_shapes(self):
+        mapping = _PostMapping.compile_post_from_profile_mapping()
+        nodes = [_node(0), _node(1)]
+        del nodes[0]["edge_liked_by"], nodes[1]["edge_liked_by"]
+        nodes[0]["edge_media_to_comment"] = {"count": 1}
+        nodes[0]["edge_media_preview_like"] = {"count": 5}
+        # Without a comment count the like count is flattened to count
+        del nodes[1]["edge_media_to_comment"]
+        nodes[1]["edge_media_preview_like"] = {"count": 7}
+        edges = [{"node": node} for node in nodes] * 3
+        batch = decode_edges(edges, mapping)
+        for i, post in enumerate(_scraped_one_by_one(edges, mapping)):
+            row = batch.row(i)
+            for key in mapping:
+                assert _same(row[key], getattr(post, key)), (i, key)
+        assert batch.columns["comments"][:2] == [1, 7]
+        assert batch.columns["likes"][0] == 5 and math.isnan(batch.columns["likes"][1])
+
+    def test_columns(self):
+        batch = decode_edges(_edges(10), _PostMapping.compile_post_from_hashtag_mapping(), username="chris_greening")
+        assert len(batch) == 10
+        assert batch.columns["likes"] == [100 + i for i in range(10)]
+        assert batch.columns["username"] == ["chris_greening"] * 10
+        assert batch.columns["url"][1] == "https://www.instagram.com/p/CJpB0000001/"
+        assert math.isnan(batch.columns["caption"][3])
+
+    def test_posts_built_on_demand(self):
+        batch = decode_edges(_edges(3), _PostMapping.compile_post_from_profile_mapping())
+        post = batch[1]
+        assert isinstance(post, Post)
+        assert post.shortcode == "CJpB0000001"
+        assert post.upload_date == datetime.datetime.fromtimestamp(1609459200 - 3600)
+        assert post.json_dict is batch.nodes[1]
+        assert [post.id for post in batch] == ["0", "1", "2"]
+
+    def test_records(self):
+        records = decode_edges(_edges(3), _PostMapping.compile_post_from_profile_mapping()).records()
+        assert [record.likes for record in records] == [100, 101, 102]
+        assert type(records[0]).__name__ == "PostRecord"
+
+    def test_empty(self):
+        batch = decode_edges([], _PostMapping.compile_post_from_hashtag_mapping())
+        assert len(batch) == 0
+        assert batch.posts() == []
+
+
+class TestGetRecentPosts:
+
+    @pytest.fixture
+    def hashtag(self):
+        hashtag_json = {"id": "1", "name": "python", "edge_hashtag_to_media": {"count": 70, "edges": _edges(70)}}
+        json_dict = {"config": {}, "entry_data": {"TagPage": [{"graphql": {"hashtag": hashtag_json}}]}}
+        hashtag = Hashtag(json_dict)
+        hashtag.scrape()
+        return hashtag
+
+    def test_hashtag(self, hashtag):
+        posts = hashtag.get_recent_posts(30)
+        assert len(posts) == 30
+        assert posts[29].shortcode == "CJpB0000029"
+
+    def test_batch(self, hashtag):
+        batch = hashtag.get_recent_posts(batch=True)
+        assert isinstance(batch, PostBatch)
+        assert len(batch) == 70
+
+    def test_profile_constants(self):
+        profile = Profile("chris_greening")
+        profile.username = "chris_greening"
+        profile.full_name = "Chris Greening"
+        profile.json_dict = {
+            "entry_data": {"ProfilePage": [{"graphql": {"user": {"edge_owner_to_timeline_media": {"edges": _edges(12)}}}}]}
+        }
+        posts = profile.get_recent_posts()
+        assert all(post.username == "chris_greening" and post.full_name == "Chris Greening" for post in posts)
@@ -0,0 +1,91 @@
+import datetime
+import io
+import json
+
+import pytest
+
+from instascrape import Hashtag, Post, export_schema, to_arrow, to_ndjson, to_parquet
+from instascrape.core._export import _convert
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _post_dict(i):
+    shortcode_media = {
+        "id": str(i),
+        "shortcode": f"CJpB{i:07d}",
+        "is_video": False,
+        "edge_media_to_tagged_user": {"edges": [{"node": {"user": {"username": "chris_greening"}}}]},
+        "edge_media_to_caption": {"edges": [{"node": {"text": f"Post {i} #python #data"}}]},
+        "edge_media_to_parent_comment": {"count": i},
+        "edge_media_preview_like": {"count": 10 * i},
+        "taken_at_timestamp": 1609459200 - i * 86400,
+        "owner": {"username": "chris_greening", "full_name": "Chris Greening"},
+    }
+    return {"config": {}, "entry_data": {"PostPage": [{"graphql": {"shortcode_media": shortcode_media}}]}}
+
+
+class TestExport:
+
+    @pytest.fixture
+    def posts(self):
+        posts = [Post(_post_dict(i)) for i in range(5)]
+        for post in posts:
+            post.scrape()
+        return posts
+
+    def test_schema_from_mapping(self):
+        schema = dict(export_schema(Post))
+        assert schema["likes"] == "int"
+        assert schema["upload_date"] == "timestamp"
+        assert schema["hashtags"] == "list<str>"
+        assert schema["gating_info"] == "json"
+        assert export_schema(Hashtag, keys=["name", "amount_of_posts"]) == [("name", "str"), ("amount_of_posts", "int")]
+
+    def test_ndjson_streams_generator(self, posts):
+        buffer = io.StringIO()
+        count = to_ndjson((post for post in posts), buffer, exclude=["gating_info"])
+        lines = buffer.getvalue().splitlines()
+        assert count == len(lines) == 5
+        row = json.loads(lines[1])
+        assert list(row) == [name for name, _ in export_schema(Post, exclude=["gating_info"])]
+        assert row["shortcode"] == "CJpB0000001"
+        assert row["likes"] == 10
+        assert row["hashtags"] == ["python", "data"]
+        assert row["tagged_users"] == ["chris_greening"]
+        assert row["upload_date"] == datetime.datetime.fromtimestamp(1609459200 - 86400).isoformat()
+        assert row["video_url"] is None
+
+    def test_empty_collection_needs_schema(self, tmp_path):
+        with pytest.raises(ValueError):
+            to_ndjson([], str(tmp_path / "posts.ndjson"))
+        assert to_ndjson([], str(tmp_path / "posts.ndjson"), schema_from=Post) == 0
+
+    def test_ndjson_path(self, posts, tmp_path):
+        fp = tmp_path / "posts.ndjson"
+        assert to_ndjson(posts, fp) == 5
+        assert len(fp.read_text(encoding="utf-8").splitlines()) == 5
+
+    @pytest.mark.parametrize("value, expected", [(True, True), (0, False), (1.0, True), ("False", None), ("yes", None)])
+    def test_bool_column(self, value, expected):
+        assert _convert(value, "bool") is expected
+
+    @pytest.mark.parametrize("writer", [to_parquet, to_arrow])
+    def test_columnar(self, posts, tmp_path, writer):
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        fp = str(tmp_path / "posts.out")
+        assert writer(iter(posts), fp, batch_size=2) == 5
+        if writer is to_parquet:
+            table = pyarrow.parquet.read_table(fp)
+            assert pyarrow.parquet.ParquetFile(fp).num_row_groups == 3
+        else:
+            table = pyarrow.ipc.open_file(fp).read_all()
+        assert table.num_rows == 5
+        assert table.schema.field("likes").type == pa.int64()
+        assert table.schema.field("upload_date").type == pa.timestamp("ms")
+        assert table.column("likes").to_pylist() == [0, 10, 20, 30, 40]
+        assert table.column("hashtags").to_pylist()[0] == ["python", "data"]
+        assert table.column("video_url").null_count == 5
@@ -0,0 +1,260 @@
+import json
+import urllib.request
+
+import pytest
+import requests
+
+from instascrape import (
+    Hashtag,
+    JsonlTraceSink,
+    PrometheusExporter,
+    ScrapeHooks,
+    SessionManager,
+    add_hooks,
+    get_hooks,
+    get_session_manager,
+    remove_hooks,
+    set_session_manager,
+)
+from instascrape.core._download import download_file
+from instascrape.exceptions.exceptions import InstagramLoginRedirectError
+from tests.core.conftest import PageHandler
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+MEDIA = b"\xff" * 5000
+
+
+class FaultyMediaHandler(PageHandler):
+    """PageHandler that also fails downloads under /media/missing and /media/truncated"""
+
+    def do_GET(self):
+        if self.path.startswith("/media/missing"):
+            self.send_body(b"", status=404)
+        elif self.path.startswith("/media") and self.headers.get("Range"):
+            # Every partial file asked to resume already holds all of MEDIA
+            self.send_body(b"", status=416, headers={"Content-Range": f"bytes */{len(MEDIA)}"})
+        elif self.path.startswith("/media/truncated"):
+            # Promise all of MEDIA and hang up partway through
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(MEDIA)))
+            self.end_headers()
+            self.wfile.write(MEDIA[:2048])
+            self.close_connection = True
+        else:
+            super().do_GET()
+
+
+@pytest.fixture
+def server(page_server):
+    httpd = page_server(FaultyMediaHandler, media=MEDIA)
+    previous = get_session_manager()
+    set_session_manager(SessionManager())
+    yield httpd
+    set_session_manager(previous)
+
+
+@pytest.fixture
+def register():
+    registered = []
+
+    def _register(hooks):
+        add_hooks(hooks)
+        registered.append(hooks)
+        return hooks
+
+    yield _register
+    for hooks in registered:
+        remove_hooks(hooks)
+
+
+class RecordingHooks(ScrapeHooks):
+    def __init__(self):
+        self.events = []
+
+    def request_started(self, method, url):
+        self.events.append(("request_started", url))
+
+    def request_finished(self, method, url, status, seconds, size, error):
+        self.events.append(("request_finished", status, size))
+
+    def redirect_detected(self, url, kind):
+        self.events.append(("redirect_detected", kind))
+
+    def scrape_succeeded(self, scraper, seconds):
+        self.events.append(("scrape_succeeded", scraper.name))
+
+    def scrape_failed(self, scraper, seconds, error):
+        self.events.append(("scrape_failed", type(error).__name__))
+
+    def download_progress(self, url, fp, written, total, chunk):
+        self.events.append(("download_progress", written, total, chunk))
+
+    def download_finished(self, url, fp, written, total, error):
+        self.events.append(("download_finished", written, total, type(error).__name__ if error else None))
+
+
+class TestHooks:
+
+    def test_scrape_events(self, server, register):
+        hooks = register(RecordingHooks())
+        Hashtag("kotlin").scrape()
+        names = [event[0] for event in hooks.events]
+        assert names == ["request_started", "request_finished", "scrape_succeeded"]
+        assert hooks.events[1][1] == 200 and hooks.events[1][2] > 0
+        assert hooks.events[2] == ("scrape_succeeded", "kotlin")
+
+    def test_redirect(self, server, register):
+        hooks = register(RecordingHooks())
+        with pytest.raises(InstagramLoginRedirectError):
+            Hashtag("login").scrape()
+        assert hooks.events[-2:] == [("redirect_detected", "login"), ("scrape_failed", "InstagramLoginRedirectError")]
+
+    def test_download_progress(self, server, register, tmp_path):
+        hooks = register(RecordingHooks())
+        download_file(f"{server.url}/media/1.jpg", str(tmp_path / "1.jpg"), chunk_size=2048)
+        assert [event for event in hooks.events if event[0].startswith("download")] == [
+            ("download_progress", 2048, 5000, 2048),
+            ("download_progress", 4096, 5000, 2048),
+            ("download_progress", 5000, 5000, 904),
+            ("download_finished", 5000, 5000, None),
+        ]
+
+    def test_failed_download_finishes(self, server, register, tmp_path):
+        hooks = register(RecordingHooks())
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            download_file(f"{server.url}/media/truncated.jpg", str(tmp_path / "1.jpg"), chunk_size=1024)
+        assert hooks.events[-1] == ("download_finished", 2048, 5000, "ChunkedEncodingError")
+
+    def test_error_status_finishes(self, server, register, tmp_path):
+        hooks = register(RecordingHooks())
+        with pytest.raises(requests.exceptions.HTTPError):
+            download_file(f"{server.url}/media/missing.jpg", str(tmp_path / "1.jpg"))
+        assert hooks.events[-1] == ("download_finished", 0, None, "HTTPError")
+
+    def test_complete_partial_file_finishes(self, server, register, tmp_path):
+        hooks = register(RecordingHooks())
+        fp = tmp_path / "1.jpg"
+        (tmp_path / "1.jpg.part").write_bytes(MEDIA)
+        download_file(f"{server.url}/media/1.jpg", str(fp))
+        assert hooks.events[-1] == ("download_finished", 5000, 5000, None)
+        assert fp.read_bytes() == MEDIA
+
+    def test_registry(self, register):
+        hooks = register(ScrapeHooks())
+        assert hooks in get_hooks()
+        remove_hooks(hooks)
+        assert hooks not in get_hooks()
+
+    def test_failing_hook_warns(self, server, register):
+        class Broken(ScrapeHooks):
+            def scrape_succeeded(self, scraper, seconds):
+                raise RuntimeError("broken")
+
+        register(Broken())
+        hashtag = Hashtag("kotlin")
+        with pytest.warns(RuntimeWarning):
+            hashtag.scrape()
+        assert hashtag.name == "kotlin"
+
+
+class TestPrometheusExporter:
+
+    def test_render(self, server, register):
+        exporter = register(PrometheusExporter())
+        for name in ("kotlin", "python"):
+            Hashtag(name).scrape()
+        with pytest.raises(InstagramLoginRedirectError):
+            Hashtag("login").scrape()
+        text = exporter.render()
+        assert 'instascrape_requests_total{method="GET",status="200"} 3' in text
+        assert 'instascrape_scrapes_total{scraper="Hashtag",outcome="success"} 2' in text
+        assert 'instascrape_scrapes_total{scraper="Hashtag",outcome="failure"} 1' in text
+        assert 'instascrape_scrape_errors_total{scraper="Hashtag",error="InstagramLoginRedirectError"} 1' in text
+        assert 'instascrape_redirects_total{kind="login"} 1' in text
+        assert 'instascrape_scrape_duration_seconds_bucket{scraper="Hashtag",le="+Inf"} 3' in text
+        assert 'instascrape_scrape_duration_seconds_count{scraper="Hashtag"} 3' in text
+        assert "instascrape_requests_in_flight 0" in text
+
+    def test_histogram_buckets(self):
+        exporter = PrometheusExporter(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.1, 0.5, 2.0):
+            exporter.scrape_succeeded(Hashtag("kotlin"), seconds)
+        text = exporter.render()
+        assert 'instascrape_scrape_duration_seconds_bucket{scraper="Hashtag",le="0.1"} 2' in text
+        assert 'instascrape_scrape_duration_seconds_bucket{scraper="Hashtag",le="1"} 3' in text
+        assert 'instascrape_scrape_duration_seconds_bucket{scraper="Hashtag",le="+Inf"} 4' in text
+        assert 'instascrape_scrape_duration_seconds_sum{scraper="Hashtag"} 2.65' in text
+
+    def test_download_bytes(self):
+        exporter = PrometheusExporter()
+        for written in (2048, 4096, 5000):
+            exporter.download_progress("url", "fp", written, 5000, 2048 if written < 5000 else 904)
+        assert "instascrape_download_bytes_total 5000" in exporter.render()
+
+    def test_resumed_download_bytes(self):
+        exporter = PrometheusExporter()
+        # 1000 bytes were already on disk, only the last 100 are new
+        for written in (1050, 1100):
+            exporter.download_progress("url", "fp", written, 1100, 50)
+        exporter.download_finished("url", "fp", 1100, 1100, None)
+        assert "instascrape_download_bytes_total 100" in exporter.render()
+
+    def test_write(self, tmp_path):
+        exporter = PrometheusExporter()
+        fp = tmp_path / "instascrape.prom"
+        exporter.write(str(fp))
+        assert fp.read_text() == exporter.render()
+
+    def test_serve(self):
+        exporter = PrometheusExporter()
+        exporter.redirect_detected("url", "login")
+        httpd = exporter.serve(port=0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{httpd.server_address[1]}/metrics") as response:
+                assert 'instascrape_redirects_total{kind="login"} 1' in response.read().decode()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+
+class TestJsonlTraceSink:
+
+    def test_trace(self, server, register, tmp_path):
+        fp = tmp_path / "trace.jsonl"
+        with JsonlTraceSink(str(fp)) as sink:
+            register(sink)
+            Hashtag("kotlin").scrape()
+            with pytest.raises(InstagramLoginRedirectError):
+                Hashtag("login").scrape()
+        events = [json.loads(line) for line in fp.read_text().splitlines()]
+        assert [event["event"] for event in events] == [
+            "request_started",
+            "request_finished",
+            "scrape_succeeded",
+            "request_started",
+            "request_finished",
+            "redirect_detected",
+            "scrape_failed",
+        ]
+        assert events[2]["scraper"] == "Hashtag" and events[2]["url"].endswith("/explore/tags/kotlin/")
+        assert events[6]["error"].startswith("InstagramLoginRedirectError")
+        assert all(isinstance(event["time"], float) for event in events)
+
+    def test_progress_every(self, tmp_path):
+        fp = tmp_path / "trace.jsonl"
+        with JsonlTraceSink(str(fp), progress_every=4096) as sink:
+            for written in (1024, 2048, 4096, 5000):
+                sink.download_progress("url", "fp", written, 5000, 1024)
+        assert [json.loads(line)["written"] for line in fp.read_text().splitlines()] == [4096, 5000]
+
+    def test_download_finished(self, tmp_path):
+        fp = tmp_path / "trace.jsonl"
+        with JsonlTraceSink(str(fp), progress_every=1024) as sink:
+            for written in (1024, 2048):
+                sink.download_progress("url", "fp", written, None, 1024)
+            sink.download_finished("url", "fp", 2048, None, ConnectionError("reset"))
+            assert not sink._progress
+        events = [json.loads(line) for line in fp.read_text().splitlines()]
+        assert [event["event"] for event in events] == ["download_progress"] * 2 + ["download_finished"]
+        assert events[-1]["written"] == 2048 and events[-1]["error"].startswith("ConnectionError")
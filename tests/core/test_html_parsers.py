@@ -0,0 +1,53 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from instascrape.core._html_parsers import (
+    _parser_from_env,
+    available_html_parsers,
+    get_html_parser,
+    json_strs_from_html,
+    set_html_parser,
+    soup_from_html,
+)
+
+HTML = (
+    "<html><body>"
+    '<a href="/p/CJpBmOtAmNr/"><div class="v1Nh3 eLAPa"><img src="1.jpg"></div></a>'
+    '<a href="/explore/"><div class="other">Explore</div></a>'
+    '<a href="/p/CGX0G64hu4Q/"><div class="eLAPa"></div></a>'
+    '<script type="text/javascript">window._sharedData = {"config": {"viewer": null}};</script>'
+    "</body></html>"
+)
+
+
+class TestHtmlParsers:
+
+    @pytest.fixture(autouse=True)
+    def reset_parser(self):
+        yield
+        set_html_parser(None)
+
+    def test_defaults(self, monkeypatch):
+        monkeypatch.delenv("INSTASCRAPE_HTML_PARSER", raising=False)
+        _parser_from_env()
+        assert get_html_parser() == "html.parser"
+        assert get_html_parser("lxml") == "lxml"
+
+    def test_invalid_parser(self):
+        with pytest.raises(ValueError):
+            set_html_parser("html5lib-but-misspelled")
+
+    def test_env_var(self, monkeypatch):
+        monkeypatch.setenv("INSTASCRAPE_HTML_PARSER", "html.parser")
+        _parser_from_env()
+        assert get_html_parser("lxml") == "html.parser"
+        monkeypatch.setenv("INSTASCRAPE_HTML_PARSER", "html5lib-but-misspelled")
+        with pytest.raises(ValueError, match="INSTASCRAPE_HTML_PARSER"):
+            _parser_from_env()
+
+    @pytest.mark.parametrize("parser", available_html_parsers())
+    def test_backends_agree(self, parser):
+        set_html_parser(parser)
+        assert get_html_parser() == parser
+        assert isinstance(soup_from_html(HTML), BeautifulSoup)
+        assert json_strs_from_html(HTML) == ['{"config": {"viewer": null}}']
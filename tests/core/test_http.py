@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from instascrape import Hashtag, SessionManager, get_session_manager, set_session_manager
+from instascrape.scrapers.scrape_tools import json_from_url
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+@pytest.fixture
+def server(page_server):
+    return page_server().url
+
+
+@pytest.fixture
+def manager():
+    previous = get_session_manager()
+    manager = SessionManager(pool_maxsize=4)
+    set_session_manager(manager)
+    yield manager
+    set_session_manager(previous)
+    manager.close()
+
+
+class TestSessionManager:
+
+    def test_connections_are_reused(self, server, manager):
+        for i in range(5):
+            assert json_from_url(f"{server}/explore/tags/tag{i}/")[0]["entry_data"]["TagPage"]
+        stats = manager.stats()
+        assert stats["requests"] == 5
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4
+
+    def test_scrape_goes_through_pool(self, server, manager):
+        for _ in range(3):
+            hashtag = Hashtag("kotlin")
+            hashtag.scrape()
+            assert hashtag.name == "kotlin"
+        assert manager.stats()["connections_opened"] == 1
+
+    def test_session_per_thread_shares_pool(self, server, manager):
+        def _fetch(i):
+            session = manager.session()
+            session.get(f"{server}/explore/tags/tag{i}/").raise_for_status()
+            return session
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            sessions = set(executor.map(_fetch, range(40)))
+        stats = manager.stats()
+        assert len(sessions) == stats["sessions"] <= 4
+        assert stats["requests"] == 40
+        assert stats["connections_opened"] <= 4
+
+    def test_shared_session(self, manager):
+        shared = SessionManager(per_thread=False)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            sessions = set(executor.map(lambda _: shared.session(), range(8)))
+        assert len(sessions) == 1
@@ -0,0 +1,106 @@
+import pytest
+
+from instascrape.core.json_algos import _SUFFIX_CACHE
+from instascrape.scrapers.scrape_tools import flatten_dict
+
+
+class TestFlattenDict:
+
+    @pytest.fixture
+    def json_dict(self):
+        return {
+            "config": {"id": 1, "viewer": None},
+            "entry_data": {
+                "PostPage": [
+                    {
+                        "graphql": {
+                            "shortcode_media": {
+                                "id": "2",
+                                "owner": {"id": "3", "username": "chris_greening"},
+                                "tagged": {"edges": [{"node": {"username": "a"}}, {"node": {"username": "b"}}]},
+                                "likes": {"count": 10},
+                                "comments": {"count": 4, "edges": []},
+                                "empty": {},
+                            }
+                        }
+                    }
+                ]
+            },
+            "1_count": "collides with a joined key",
+            "count": "last",
+        }
+
+    @pytest.mark.parametrize("engine", ["tree", "iterative"])
+    def test_collisions(self, json_dict, engine):
+        flat_dict = flatten_dict(json_dict, engine=engine)
+        assert flat_dict["id"] == 1
+        assert flat_dict["shortcode_media_id"] == "2"
+        assert flat_dict["owner_id"] == "3"
+        assert flat_dict["username"] == "chris_greening"
+        assert flat_dict["node_username"] == "a"
+        assert flat_dict["1_node_username"] == "b"
+        assert flat_dict["comments_count"] == 4
+        assert flat_dict["1_count"] == "collides with a joined key"
+        assert flat_dict["count"] == "last"
+
+    def test_engines_agree(self, json_dict):
+        tree_dict = flatten_dict(json_dict, engine="tree")
+        iterative_dict = flatten_dict(json_dict, engine="iterative")
+        assert list(tree_dict.items()) == list(iterative_dict.items())
+
+    def test_path_engine_agrees(self, json_dict):
+        keys = ["id", "shortcode_media_id", "owner_id", "node_username", "1_node_username", "1_count", "count", "nope"]
+        flat_dict = flatten_dict(json_dict)
+        path_dict = flatten_dict(json_dict, engine="path", keys=keys)
+        assert path_dict == {key: flat_dict[key] for key in keys if key in flat_dict}
+
+    def test_invalid_engine(self, json_dict):
+        with pytest.raises(ValueError):
+            flatten_dict(json_dict, engine="recursive")
+
+
+class TestPathEngine:
+
+    @pytest.fixture
+    def page(self):
+        return {
+            "entry_data": {
+                "PostPage": [
+                    {
+                        "graphql": {
+                            "shortcode_media": {
+                                "id": "2",
+                                "display_url": "https://instagram.com/image.jpg",
+                                "location": {"name": "Boston"},
+                            }
+                        }
+                    }
+                ]
+            }
+        }
+
+    @pytest.fixture
+    def keys(self):
+        return ["id", "display_url", "name", "video_url"]
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        _SUFFIX_CACHE.clear()
+
+    def test_only_requested_keys(self, page, keys):
+        flat_dict = flatten_dict(page, engine="path", keys=keys)
+        assert flat_dict == {"id": "2", "display_url": "https://instagram.com/image.jpg", "name": "Boston"}
+        assert flatten_dict(page, engine="path", keys=keys) == flat_dict
+
+    def test_finds_key_missing_from_earlier_page(self, page, keys):
+        flatten_dict(page, engine="path", keys=keys)
+        page["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]["video_url"] = "video.mp4"
+        assert flatten_dict(page, engine="path", keys=keys)["video_url"] == "video.mp4"
+
+    def test_layout_changes_between_pages(self, page, keys):
+        keys = keys + ["shortcode_media_id"]
+        flatten_dict({"config": {"viewer": None}, **page}, engine="path", keys=keys)
+        flat_dict = flatten_dict({"config": {"viewer": {"id": "viewer"}}, **page}, engine="path", keys=keys)
+        assert flat_dict["id"] == "viewer" and flat_dict["shortcode_media_id"] == "2"
+        page["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]["location"] = None
+        assert "name" not in flatten_dict(page, engine="path", keys=keys)
@@ -0,0 +1,68 @@
+from collections import deque
+import math
+
+import pytest
+
+from instascrape.core._mappings import _CompiledMapping, _PostMapping
+from instascrape.scrapers.scrape_tools import flatten_dict, parse_data_from_json
+
+
+class TestCompiledMapping:
+
+    @pytest.fixture
+    def node(self):
+        return {
+            "id": "1",
+            "dimensions": {"height": 1080, "width": 1080},
+            "edge_media_to_caption": {"edges": [{"node": {"text": "Hello #world"}}]},
+            "edge_media_to_comment": {"count": 4},
+            "owner": {"id": "2"},
+        }
+
+    def test_compile_is_cached(self):
+        assert _PostMapping.compile_mapping(keys=["id"]) is _PostMapping.compile_mapping(keys="id")
+        assert _PostMapping.compile_post_from_hashtag_mapping() is _PostMapping.compile_post_from_hashtag_mapping()
+
+    def test_post_mappings_are_dicts(self):
+        mapping = _PostMapping.post_from_hashtag_mapping()
+        assert mapping["owner"] == deque(["owner", "id"])
+        mapping["owner"].append("extra")
+        assert _PostMapping.post_from_hashtag_mapping()["owner"] == deque(["owner", "id"])
+        compiled = _PostMapping.compile_post_from_profile_mapping()
+        assert dict(compiled.items()) == {
+            key: tuple(steps) for key, steps in _PostMapping.post_from_profile_mapping().items()
+        }
+
+    def test_compile_matches_return_mapping(self):
+        compiled = _PostMapping.compile_mapping(exclude=["id"])
+        returned = _PostMapping.return_mapping(exclude=["id"])
+        assert list(compiled) == list(returned)
+        assert all(steps == tuple(returned[key]) for key, steps in compiled.items())
+
+    def test_with_overrides(self):
+        compiled = _PostMapping.compile_mapping(keys=["id", "shortcode"])
+        overrides = (("id", ("owner_id",)), ("profile_pic_url", ("user_profile_pic_url",)))
+        patched = compiled.with_overrides(overrides)
+        assert patched is compiled.with_overrides(overrides)
+        assert dict(patched.items()) == {
+            "id": ("owner_id",),
+            "shortcode": ("shortcode",),
+            "profile_pic_url": ("user_profile_pic_url",),
+        }
+        assert dict(compiled.items())["id"] == ("id",)
+
+    def test_multi_step_traversal(self, node):
+        mapping = _PostMapping.post_from_hashtag_mapping()
+        data = parse_data_from_json(flatten_dict(node), mapping, nested_json_dict=node)
+        assert data["caption"] == "Hello #world"
+        assert data["comments"] == 4
+        assert data["owner"] == "2"
+        assert data["dimensions"] == {"height": 1080, "width": 1080}
+        assert math.isnan(data["likes"])
+
+    def test_parse_does_not_consume_mapping(self, node):
+        mapping = {"id": deque(["id"]), "owner": deque(["owner", "id"])}
+        parse_data_from_json(flatten_dict(node), mapping, nested_json_dict=node)
+        data = parse_data_from_json(flatten_dict(node), _CompiledMapping(mapping.items()), nested_json_dict=node)
+        assert mapping == {"id": deque(["id"]), "owner": deque(["owner", "id"])}
+        assert data == {"id": "1", "owner": "2"}
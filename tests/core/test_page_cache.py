@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import zlib
+
+import pytest
+import requests
+
+from instascrape import Hashtag, PageCache, set_page_cache
+from instascrape.core._page_cache import page_type_from_url
+from tests.core.conftest import tag_html
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+TAG_URL = Hashtag("kotlin")._source_url()
+
+
+def _store_pages(path, worker):
+    cache = PageCache(path)
+    for i in range(20):
+        cache.set(f"https://www.instagram.com/p/{worker}-{i}/", tag_html(f"{worker}-{i}"))
+        cache.get(f"https://www.instagram.com/p/{worker}-{i}/")
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+
+class CountingSession(requests.Session):
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return FakeResponse(tag_html(url.rstrip("/").split("/")[-1]))
+
+
+class TestPageCache:
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return PageCache(str(tmp_path))
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("instascrape.core._page_cache.time.time", lambda: now[0])
+        return now
+
+    def test_roundtrip_and_stats(self, cache):
+        assert cache.get(TAG_URL) is None
+        assert cache.set(TAG_URL, tag_html("kotlin"))
+        assert cache.get(TAG_URL) == tag_html("kotlin")
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 1, 1, 1)
+        assert stats["bytes"] < len(tag_html("kotlin"))
+
+    def test_keyed_by_sessionid(self, cache):
+        cache.set(TAG_URL, tag_html("kotlin"), headers={"cookie": "sessionid=abc;"})
+        assert cache.get(TAG_URL) is None
+        assert cache.get(TAG_URL, headers={"cookie": "sessionid=xyz;"}) is None
+        assert cache.get(TAG_URL, headers={"cookie": "sessionid=abc;"}) is not None
+
+    def test_ttl_per_page_type(self, tmp_path, clock):
+        cache = PageCache(str(tmp_path), ttls={"hashtag": 60, "post": 3600})
+        post_url = "https://www.instagram.com/p/CJpBmOtAmNr/"
+        cache.set(TAG_URL, tag_html("kotlin"))
+        cache.set(post_url, tag_html("post"))
+        clock[0] += 61
+        assert cache.get(TAG_URL) is None
+        assert cache.get(post_url) is not None
+        assert cache.stats()["expired"] == 1
+
+    def test_lru_eviction(self, tmp_path, clock):
+        pages = {f"https://www.instagram.com/p/{i}/": tag_html(os.urandom(1000).hex()) for i in range(6)}
+        urls = list(pages)
+        cache = PageCache(str(tmp_path), max_bytes=3 * max(len(zlib.compress(html.encode())) for html in pages.values()))
+        for url in urls[:3]:
+            cache.set(url, pages[url])
+            clock[0] += 1
+        cache.get(urls[0])
+        clock[0] += 1
+        cache.set(urls[3], pages[urls[3]])
+        assert cache.stats()["bytes"] <= cache.max_bytes
+        assert cache.stats()["evictions"] == 1
+        assert cache.get(urls[1]) is None
+        assert cache.get(urls[0]) is not None
+
+    def test_rejected_pages_are_not_cached(self, cache):
+        assert not cache.set(TAG_URL, '{"entry_data": {"LoginAndSignupPage": [{}]}}')
+        assert cache.stats()["entries"] == 0
+
+    def test_page_types(self):
+        assert page_type_from_url("https://www.instagram.com/p/CJpBmOtAmNr/") == "post"
+        assert page_type_from_url("https://www.instagram.com/explore/locations/212988663/") == "location"
+        assert page_type_from_url(TAG_URL) == "hashtag"
+        assert page_type_from_url("https://www.instagram.com/explore/tags/kotlin/") == "hashtag"
+        assert page_type_from_url("https://www.instagram.com/chris_greening/") == "profile"
+
+    def test_shared_between_processes(self, tmp_path):
+        path = str(tmp_path / "shared.sqlite3")
+        PageCache(path)
+        processes = [multiprocessing.Process(target=_store_pages, args=(path, worker)) for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert all(process.exitcode == 0 for process in processes)
+        stats = PageCache(path).stats()
+        assert (stats["entries"], stats["stores"], stats["hits"]) == (80, 80, 80)
+
+    def test_scrape_uses_cache(self, cache):
+        set_page_cache(cache)
+        try:
+            session = CountingSession()
+            for _ in range(3):
+                hashtag = Hashtag(TAG_URL)
+                hashtag.scrape(session=session)
+                assert hashtag.name == "kotlin"
+        finally:
+            set_page_cache(None)
+        assert session.requests == 1
+        assert cache.stats()["hits"] == 2
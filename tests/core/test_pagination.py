@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+import instascrape.core._pagination as pagination
+from instascrape import Hashtag, Location, Profile
+from instascrape.core._static_scraper import _StaticHtmlScraper
+from instascrape.exceptions.exceptions import InstagramLoginRedirectError
+from tests.core.conftest import page_html
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+PAGE_SIZE = 12
+TOTAL_POSTS = 40
+
+
+def _edge(start, stop):
+    edges = [
+        {"node": {"id": str(i), "shortcode": f"CJpB{i:07d}", "taken_at_timestamp": 1609459200 - i}}
+        for i in range(start, stop)
+    ]
+    has_next_page = stop < TOTAL_POSTS
+    page_info = {"has_next_page": has_next_page, "end_cursor": f"cursor{stop}" if has_next_page else None}
+    return {"count": TOTAL_POSTS, "page_info": page_info, "edges": edges}
+
+
+def _profile_html():
+    user = {"id": "2", "username": "chris_greening", "full_name": "Chris Greening", "edge_owner_to_timeline_media": _edge(0, 12)}
+    return page_html("ProfilePage", {"user": user})
+
+
+def _respond(variables):
+    """Page of the timeline starting after the end_cursor in variables, or a login page past a login cursor"""
+    if "login" in variables.get("after", ""):
+        return "<html>Login</html>"
+    start = int(variables["after"].replace("cursor", ""))
+    edge = _edge(start, min(TOTAL_POSTS, start + variables["first"]))
+    return {"user": {"edge_owner_to_timeline_media": edge}}
+
+
+@pytest.fixture
+def server(graphql_server):
+    return graphql_server(_respond)
+
+
+@pytest.fixture
+def profile():
+    profile = Profile(_profile_html())
+    profile.scrape()
+    profile.username = "chris_greening"
+    return profile
+
+
+class TestIterRecentPosts:
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_follows_cursor(self, server, profile, prefetch):
+        posts = list(profile.iter_recent_posts(page_size=PAGE_SIZE, prefetch=prefetch))
+        assert [post.shortcode for post in posts] == [f"CJpB{i:07d}" for i in range(TOTAL_POSTS)]
+        assert all(post.username == "chris_greening" for post in posts)
+        assert [variables["after"] for _, _, variables in server.requests] == ["cursor12", "cursor24", "cursor36"]
+        assert all(variables["id"] == "2" and variables["first"] == PAGE_SIZE for _, _, variables in server.requests)
+        assert server.requests[0][1] == Profile._GRAPHQL_QUERY_HASH
+
+    def test_amount(self, server, profile):
+        posts = list(profile.iter_recent_posts(amount=20, page_size=PAGE_SIZE, prefetch=False))
+        assert len(posts) == 20
+        assert len(server.requests) == 1
+
+    def test_first_page_needs_no_requests(self, server, profile):
+        posts = list(profile.iter_recent_posts(amount=12))
+        assert len(posts) == 12
+        assert server.requests == []
+
+    def test_prefetch(self, server, profile):
+        server.delay = 0.2
+        posts = profile.iter_recent_posts(page_size=PAGE_SIZE)
+        next(posts)
+        started = time.monotonic()
+        time.sleep(0.3)
+        for _ in range(11):
+            next(posts)
+        assert len(server.requests) == 1
+        # The second page downloaded while the first one was being consumed
+        next(posts)
+        assert time.monotonic() - started < 0.45
+
+    def test_login_redirect(self, server, profile):
+        profile.json_dict["entry_data"]["ProfilePage"][0]["graphql"]["user"]["edge_owner_to_timeline_media"][
+            "page_info"
+        ]["end_cursor"] = "login"
+        with pytest.raises(InstagramLoginRedirectError):
+            list(profile.iter_recent_posts())
+
+    def test_needs_scrape(self):
+        with pytest.raises(ValueError):
+            list(Profile("chris_greening").iter_recent_posts())
+
+    def test_variables(self):
+        hashtag = Hashtag("kotlin")
+        hashtag.name = "kotlin"
+        location = Location("212988663")
+        location.id = "212988663"
+        assert hashtag._graphql_variables() == {"tag_name": "kotlin"}
+        assert location._graphql_variables() == {"id": "212988663"}
+
+    def test_variables_required(self):
+        class NoVariables(pagination._EdgePostsMixin, _StaticHtmlScraper):
+            _Mapping = Hashtag._Mapping
+            _url_from_suburl = Hashtag._url_from_suburl
+
+        with pytest.raises(TypeError, match="_graphql_variables"):
+            NoVariables("kotlin")
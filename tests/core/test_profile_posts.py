@@ -0,0 +1,114 @@
+import datetime
+
+import pytest
+
+from instascrape import Post, Profile
+from instascrape.scrapers.profile import ScrollIteration, _JS_SCROLL_AND_HARVEST_SCRIPT
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+class FakeWebDriver:
+    """Serves a profile page that loads 12 more posts per scroll, overlapping the previous batch"""
+
+    def __init__(self, amount, per_scroll=12):
+        self.amount = amount
+        self.per_scroll = per_scroll
+        self.loaded = 0
+        self.scrolls = 0
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script):
+        if script != _JS_SCROLL_AND_HARVEST_SCRIPT:
+            return self.loaded
+        self.scrolls += 1
+        start = max(0, self.loaded - 3)
+        self.loaded = min(self.amount, self.loaded + self.per_scroll)
+        return [self.loaded, [f"/p/CJpB{i:07d}/" for i in range(start, self.loaded)]]
+
+    @property
+    def page_source(self):
+        raise AssertionError("get_posts shouldn't reparse the page source")
+
+
+@pytest.fixture
+def profile():
+    profile = Profile("chris_greening")
+    profile.posts = 40
+    profile.username = "chris_greening"
+    profile.url = "https://www.instagram.com/chris_greening/"
+    return profile
+
+
+class TestGetPosts:
+
+    def test_collects_every_post_once(self, profile):
+        webdriver = FakeWebDriver(40)
+        posts = profile.get_posts(webdriver)
+        assert [post.source for post in posts] == [f"CJpB{i:07d}" for i in range(40)]
+        assert webdriver.visited == [profile.url]
+        assert webdriver.scrolls == 4
+
+    def test_amount(self, profile):
+        webdriver = FakeWebDriver(40)
+        posts = profile.get_posts(webdriver, amount=15)
+        assert len(posts) == 15
+        assert webdriver.scrolls == 2
+
+    def test_stuck_scroll(self, profile):
+        profile.posts = 100
+        webdriver = FakeWebDriver(30)
+        posts = profile.get_posts(webdriver, max_failed_scroll=2)
+        assert len(posts) == 30
+        assert webdriver.scrolls == 3 + 3
+
+    def test_scroll_stats(self, profile):
+        profile.get_posts(FakeWebDriver(40))
+        assert all(isinstance(stat, ScrollIteration) for stat in profile.scroll_stats)
+        assert [stat.new_posts for stat in profile.scroll_stats] == [12, 12, 12, 4]
+        assert [stat.total_posts for stat in profile.scroll_stats] == [12, 24, 36, 40]
+        assert "scroll_stats" not in profile.to_dict()
+
+
+class TestIterPosts:
+
+    def test_yields_while_scrolling(self, profile):
+        webdriver = FakeWebDriver(40)
+        posts = profile.iter_posts(webdriver)
+        assert next(posts).source == "CJpB0000000"
+        assert webdriver.scrolls == 1
+        assert len(list(posts)) == 39
+        assert webdriver.scrolls == 4
+
+    def test_amount(self, profile):
+        webdriver = FakeWebDriver(40)
+        assert len(list(profile.iter_posts(webdriver, amount=13))) == 13
+        assert webdriver.scrolls == 2
+
+    def test_stops_early(self, profile):
+        webdriver = FakeWebDriver(40)
+        for i, post in enumerate(profile.iter_posts(webdriver)):
+            if i == 2:
+                break
+        assert webdriver.scrolls == 1
+
+    def test_until(self, profile, monkeypatch):
+        scraped = []
+
+        def _scrape(post, **kwargs):
+            scraped.append(kwargs)
+            post.upload_date = datetime.datetime(2021, 1, 31) - datetime.timedelta(days=int(post.source[4:]))
+
+        monkeypatch.setattr(Post, "scrape", _scrape)
+        headers = {"cookie": "sessionid=1"}
+        posts = list(profile.iter_posts(FakeWebDriver(40), until=datetime.date(2021, 1, 10), headers=headers))
+        assert [post.upload_date.day for post in posts] == list(range(31, 10, -1))
+        assert scraped[0]["headers"] == headers
+        assert len(scraped) == len(posts) + 1
+
+    def test_too_many(self, profile):
+        with pytest.raises(ValueError):
+            list(profile.iter_posts(FakeWebDriver(40), amount=41))
@@ -0,0 +1,77 @@
+import pickle
+
+import pytest
+
+from instascrape import Post, Profile, decode_edges, record_type, to_ndjson
+from instascrape.core._mappings import _PostMapping
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _post_dict():
+    shortcode_media = {
+        "id": "1",
+        "shortcode": "CJpBmOtAmNr",
+        "edge_media_to_tagged_user": {"edges": []},
+        "edge_media_to_caption": {"edges": [{"node": {"text": "Records #python"}}]},
+        "taken_at_timestamp": 1609459200,
+        "owner": {"username": "chris_greening", "full_name": "Chris Greening"},
+    }
+    return {"config": {}, "entry_data": {"PostPage": [{"graphql": {"shortcode_media": shortcode_media}}]}}
+
+
+class TestRecords:
+
+    @pytest.fixture
+    def post(self):
+        post = Post(_post_dict())
+        post.scrape()
+        return post
+
+    def test_record_type_is_slotted(self, post):
+        record = post.to_record()
+        assert type(record) is record_type(Post)
+        assert type(record).__name__ == "PostRecord"
+        assert not hasattr(record, "__dict__")
+        assert not hasattr(record, "json_dict")
+        with pytest.raises(AttributeError):
+            record.html = "<html>"
+
+    def test_record_keeps_scraped_values(self, post):
+        record = post.to_record()
+        assert record.shortcode == "CJpBmOtAmNr"
+        assert record.caption == "Records #python"
+        assert record.hashtags == ["python"]
+        assert record.upload_date == post.upload_date
+        assert record.url == post.url
+
+    def test_back_to_post(self, post):
+        restored = post.to_record().to_scraper()
+        assert isinstance(restored, Post)
+        assert restored.source == "CJpBmOtAmNr"
+        assert restored.caption == post.caption
+        assert restored.to_record() == post.to_record()
+
+    def test_pickle(self, post):
+        record = post.to_record()
+        assert pickle.loads(pickle.dumps(record)) == record
+
+    def test_hashable(self, post):
+        records = {post.to_record(), post.to_record()}
+        assert len(records) == 1
+        assert post.to_record() in records
+
+    def test_keeps_edge_columns(self):
+        node = {"shortcode": "CJpBmOtAmNr", "dimensions": {"height": 1080, "width": 1080}, "owner": {"id": "787132"}}
+        (record,) = decode_edges([{"node": node}], _PostMapping.compile_post_from_hashtag_mapping()).records()
+        assert record.dimensions == {"height": 1080, "width": 1080}
+        assert record.owner == "787132"
+
+    def test_types_per_scraper(self):
+        assert record_type(Profile).__name__ == "ProfileRecord"
+        assert "followers" in record_type(Profile)._fields
+        assert record_type(Post) is record_type(Post)
+
+    def test_export(self, post, tmp_path):
+        fp = str(tmp_path / "records.ndjson")
+        assert to_ndjson([post.to_record()], fp, schema_from=Post) == 1
@@ -0,0 +1,122 @@
+import os
+import time
+import zipfile
+
+import pytest
+import requests
+
+from instascrape import Hashtag, Post, ReplayAdapter, ReplayArchive, record_traffic, replay_traffic, scrape_posts
+from instascrape.core._download import download_file
+from instascrape.exceptions.exceptions import ReplayMissError
+from instascrape.scrapers.scrape_tools import json_from_url
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+MEDIA = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def server(page_server):
+    return page_server(media=MEDIA)
+
+
+def _run(server_url, tmp_path, name):
+    hashtag = Hashtag("kotlin")
+    hashtag.scrape()
+    json_dict = json_from_url(f"{server_url}/explore/tags/python/")[0]
+    fp = str(tmp_path / f"{name}.jpg")
+    download_file(f"{server_url}/media/1.jpg", fp)
+    with open(fp, "rb") as infile:
+        media = infile.read()
+    return hashtag.name, json_dict, media
+
+
+class TestRecordReplay:
+
+    def test_replay_matches_recording(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        with record_traffic(archive_fp) as archive:
+            recorded = _run(server.url, tmp_path, "recorded")
+        assert len(archive) == 3
+        requests_made = server.requests
+
+        with replay_traffic(archive_fp):
+            replayed = _run(server.url, tmp_path, "replayed")
+        assert replayed == recorded
+        assert replayed[2] == MEDIA
+        assert server.requests == requests_made
+
+    def test_works_offline(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        with record_traffic(archive_fp):
+            Hashtag("kotlin").scrape()
+        server.shutdown()
+        server.server_close()
+        with replay_traffic(archive_fp):
+            hashtag = Hashtag("kotlin")
+            hashtag.scrape()
+        assert hashtag.name == "kotlin"
+
+    def test_miss(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        with record_traffic(archive_fp):
+            Hashtag("kotlin").scrape()
+        with replay_traffic(archive_fp):
+            with pytest.raises(ReplayMissError):
+                Hashtag("python").scrape()
+
+    def test_repeated_requests(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        with record_traffic(archive_fp):
+            Hashtag("kotlin").scrape()
+        with replay_traffic(archive_fp):
+            for _ in range(3):
+                hashtag = Hashtag("kotlin")
+                hashtag.scrape()
+                assert hashtag.name == "kotlin"
+
+    def test_bodies_stored_once(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        with record_traffic(archive_fp) as archive:
+            for _ in range(5):
+                Hashtag("kotlin").scrape()
+        assert len(archive) == 5
+        with zipfile.ZipFile(archive_fp) as zip_file:
+            assert len([name for name in zip_file.namelist() if name.startswith("bodies/")]) == 1
+
+    def test_latency(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        server.delay = 0.2
+        with record_traffic(archive_fp):
+            Hashtag("kotlin").scrape()
+        with replay_traffic(archive_fp, latency="recorded"):
+            start = time.monotonic()
+            Hashtag("kotlin").scrape()
+            assert time.monotonic() - start >= 0.2
+        with replay_traffic(archive_fp):
+            start = time.monotonic()
+            Hashtag("kotlin").scrape()
+            assert time.monotonic() - start < 0.1
+
+    def test_scrape_posts(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        shortcodes = [f"CJpB{i:07d}" for i in range(12)]
+        with record_traffic(archive_fp):
+            recorded, _ = scrape_posts([Post(shortcode) for shortcode in shortcodes], pause=0, workers=4)
+        with replay_traffic(archive_fp):
+            replayed, _ = scrape_posts([Post(shortcode) for shortcode in shortcodes], pause=0, workers=4)
+        assert sorted(post.shortcode for post in replayed) == sorted(post.shortcode for post in recorded) == shortcodes
+
+    def test_explicit_session(self, server, tmp_path):
+        archive_fp = str(tmp_path / "run.zip")
+        with record_traffic(archive_fp):
+            Hashtag("kotlin").scrape()
+        with ReplayArchive(archive_fp) as archive:
+            session = requests.Session()
+            session.mount("http://", ReplayAdapter(archive))
+            response = session.get(f"{server.url}/explore/tags/kotlin/")
+            assert response.status_code == 200 and "kotlin" in response.text
+
+    def test_invalid_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            ReplayArchive(os.fspath(tmp_path / "run.zip"), "a")
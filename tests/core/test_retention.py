@@ -0,0 +1,117 @@
+import pytest
+
+from instascrape import Post, Profile, scrape_posts
+from instascrape.core.json_algos import _prune_json
+from tests.core.conftest import shared_data_html
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _comment(i):
+    return {
+        "node": {
+            "id": str(i),
+            "text": f"Comment {i}",
+            "created_at": 1609459200,
+            "did_report_as_spam": False,
+            "owner": {"username": "chris_greening", "is_verified": False, "profile_pic_url": ""},
+            "viewer_has_liked": False,
+            "edge_liked_by": {"count": i},
+            "is_restricted_pending": False,
+        }
+    }
+
+
+def _postshared_data_html():
+    shortcode_media = {
+        "id": "1",
+        "shortcode": "CJpBmOtAmNr",
+        "edge_media_to_tagged_user": {"edges": [{"node": {"user": {"username": "chris_greening"}}}]},
+        "edge_media_to_caption": {"edges": [{"node": {"text": "Retention #python"}}]},
+        "edge_media_to_parent_comment": {"count": 2, "edges": [_comment(1), _comment(2)]},
+        "taken_at_timestamp": 1609459200,
+        "owner": {"username": "chris_greening", "full_name": "Chris Greening"},
+    }
+    return shared_data_html({"config": {}, "entry_data": {"PostPage": [{"graphql": {"shortcode_media": shortcode_media}}]}})
+
+
+def _profileshared_data_html():
+    edges = [
+        {"node": {"id": str(i), "shortcode": f"CJpB{i:07d}", "taken_at_timestamp": 1609459200 - i}}
+        for i in range(3)
+    ]
+    user = {
+        "id": "2",
+        "username": "chris_greening",
+        "biography": "Python",
+        "edge_followed_by": {"count": 100},
+        "edge_owner_to_timeline_media": {"count": 3, "edges": edges},
+    }
+    return shared_data_html({"config": {}, "entry_data": {"ProfilePage": [{"graphql": {"user": user}}]}})
+
+
+class TestRetention:
+
+    def test_all_keeps_everything(self):
+        post = Post(_postshared_data_html())
+        post.scrape()
+        assert post.html is not None
+        assert post.soup is not None
+        assert post.flat_json_dict is not None
+        assert post.source.startswith("<html>")
+
+    def test_json_releasesshared_data_html(self):
+        post = Post(_postshared_data_html())
+        post.scrape(retain="json")
+        assert post.html is None
+        assert post.soup is None
+        assert post.flat_json_dict is None
+        assert post.source == post.url
+        assert "owner" in post.json_dict["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]
+
+    def test_none_keeps_what_methods_read(self):
+        post = Post(_postshared_data_html())
+        post.scrape(retain="none")
+        assert post.html is None and post.soup is None and post.flat_json_dict is None
+        shortcode_media = post.json_dict["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]
+        assert set(shortcode_media) == {"edge_media_to_parent_comment", "edge_media_to_tagged_user"}
+        assert post.shortcode == "CJpBmOtAmNr"
+        assert post.full_name == "Chris Greening"
+        assert post.tagged_users == ["chris_greening"]
+        assert [comment.text for comment in post.get_recent_comments()] == ["Comment 1", "Comment 2"]
+
+    def test_profile_recent_posts(self):
+        profile = Profile(_profileshared_data_html())
+        profile.scrape(retain="none")
+        assert profile.html is None
+        assert profile.followers == 100
+        assert [post.shortcode for post in profile.get_recent_posts(3)] == ["CJpB0000000", "CJpB0000001", "CJpB0000002"]
+
+    def test_not_inplace(self):
+        post = Post(_postshared_data_html())
+        scraped = post.scrape(retain="none", inplace=False)
+        assert scraped.html is None
+        assert scraped.tagged_users == ["chris_greening"]
+
+    def test_scrape_posts(self):
+        posts = [Post(_postshared_data_html()) for _ in range(2)]
+        scraped, _ = scrape_posts(posts, pause=0, retain="none")
+        assert all(post.html is None and post.tagged_users == ["chris_greening"] for post in scraped)
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            Post(_postshared_data_html()).scrape(retain="soup")
+        with pytest.raises(ValueError):
+            Profile(_profileshared_data_html()).scrape(retain="soup")
+
+
+class TestPruneJson:
+
+    def test_keeps_paths(self):
+        json_dict = {"a": [{"b": {"c": 1, "d": 2}}, {"e": 3}], "f": 4}
+        assert _prune_json(json_dict, (("a", 0, "b", "c"), ("f",))) == {"a": [{"b": {"c": 1}}], "f": 4}
+        assert _prune_json(json_dict, (("a", 1, "e"),)) == {"a": [None, {"e": 3}]}
+
+    def test_missing_paths(self):
+        assert _prune_json({"a": 1}, (("b", 0),)) is None
+        assert _prune_json({"a": 1}, ()) is None
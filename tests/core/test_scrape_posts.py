@@ -0,0 +1,134 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from instascrape import CheckpointJournal, Post, scrape_posts
+from instascrape.core._rate_limit import TokenBucket
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _post_dict(i):
+    shortcode_media = {
+        "id": str(i),
+        "shortcode": f"CJpB{i:07d}",
+        "edge_media_to_tagged_user": {"edges": []},
+        "edge_media_to_caption": {"edges": [{"node": {"text": f"Post {i} #python"}}]},
+        "taken_at_timestamp": 1609459200 - i * 86400,
+        "owner": {"username": "chris_greening", "full_name": "Chris Greening"},
+    }
+    return {"config": {}, "entry_data": {"PostPage": [{"graphql": {"shortcode_media": shortcode_media}}]}}
+
+
+class TestScrapePosts:
+
+    @pytest.fixture
+    def posts(self):
+        return [Post(_post_dict(i)) for i in range(10)]
+
+    @pytest.mark.parametrize("workers", [None, 4])
+    def test_limit(self, posts, workers):
+        scraped, unscraped = scrape_posts(posts, limit=6, pause=0, workers=workers)
+        assert [post.shortcode for post in scraped] == [f"CJpB{i:07d}" for i in range(6)]
+        assert len(unscraped) == 4
+
+    @pytest.mark.parametrize("workers", [None, 4])
+    def test_date_limit(self, posts, workers):
+        limit = datetime.datetime.fromtimestamp(1609459200 - 3 * 86400)
+        scraped, unscraped = scrape_posts(posts, limit=limit, pause=0, workers=workers)
+        assert [post.id for post in scraped] == ["0", "1", "2"]
+        assert not hasattr(unscraped[0], "id")
+
+    def test_pause_between_posts_only(self, posts):
+        start = time.monotonic()
+        scrape_posts(posts[:2], pause=0.2)
+        assert 0.2 <= time.monotonic() - start < 0.35
+
+    def test_date_limit_stops_in_flight_posts(self, posts, monkeypatch):
+        scraped_ids = []
+        scrape = Post.scrape
+
+        def _counting_scrape(self, *args, **kwargs):
+            scraped_ids.append(self.source["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]["id"])
+            return scrape(self, *args, **kwargs)
+
+        monkeypatch.setattr(Post, "scrape", _counting_scrape)
+        limit = datetime.datetime.fromtimestamp(1609459200 - 3 * 86400)
+        start = time.monotonic()
+        scraped, _ = scrape_posts(posts, limit=limit, workers=4, limiter=TokenBucket(rate=10, burst=1))
+        assert [post.id for post in scraped] == ["0", "1", "2"]
+        assert sorted(scraped_ids)[:4] == ["0", "1", "2", "3"] and len(scraped_ids) <= 5
+        assert time.monotonic() - start < 0.6
+
+    @pytest.mark.parametrize("workers", [None, 4])
+    def test_on_exception(self, posts, workers):
+        posts.insert(3, Post({}))
+        with pytest.raises(ValueError):
+            scrape_posts(posts, pause=0, workers=workers)
+        scraped, _ = scrape_posts(posts, pause=0, workers=workers, on_exception="return")
+        assert len(scraped) == 3
+
+    def test_inplace(self, posts):
+        scrape_posts(posts, pause=0, workers=3, inplace=True)
+        assert all(post.caption.startswith("Post") for post in posts)
+
+    def test_webdriver_with_workers(self, posts):
+        with pytest.raises(ValueError):
+            scrape_posts(posts, webdriver=object(), workers=2)
+
+    def test_shared_limiter(self, posts):
+        limiter = TokenBucket(rate=100, burst=1)
+        start = time.monotonic()
+        scrape_posts(posts, workers=4, limiter=limiter)
+        assert time.monotonic() - start >= 0.08
+
+    def test_originals_untouched(self, posts):
+        scraped, unscraped = scrape_posts(posts, limit=4, pause=0)
+        assert all(not hasattr(post, "caption") for post in posts)
+        assert all(post is not original for post, original in zip(scraped, posts))
+        assert unscraped == posts[4:]
+
+    @pytest.mark.parametrize("workers", [None, 4])
+    def test_checkpoint_resumes(self, posts, workers, tmp_path):
+        fp = str(tmp_path / "checkpoint.txt")
+        posts[5] = Post({})
+        scraped, _ = scrape_posts(posts, pause=0, workers=workers, on_exception="return", checkpoint=fp)
+        assert len(scraped) == 5
+        with open(fp) as journal:
+            assert journal.read().split() == [f"CJpB{i:07d}" for i in range(5)]
+
+        posts[5] = Post(_post_dict(5))
+        scraped, unscraped = scrape_posts(
+            [Post(f"CJpB{i:07d}") for i in range(5)] + posts[5:], pause=0, workers=workers, checkpoint=fp
+        )
+        assert [post.id for post in scraped] == [str(i) for i in range(5, 10)]
+        assert unscraped == []
+        assert len(CheckpointJournal(fp)) == 10
+
+    def test_checkpoint_counts_towards_limit(self, posts, tmp_path):
+        fp = str(tmp_path / "checkpoint.txt")
+        scrape_posts(posts, limit=3, pause=0, checkpoint=fp)
+        scraped, _ = scrape_posts(posts, limit=5, pause=0, checkpoint=fp)
+        assert [post.id for post in scraped] == ["3", "4"]
+
+
+class TestCheckpointJournal:
+
+    def test_torn_write(self, tmp_path):
+        fp = tmp_path / "checkpoint.txt"
+        fp.write_text("CJpB0000000\nCJpB0000001\nCJpB00")
+        with CheckpointJournal(str(fp)) as journal:
+            assert len(journal) == 2
+            assert "CJpB0000001" in journal
+            journal.add("CJpB0000002")
+            journal.add("CJpB0000002")
+        assert fp.read_text() == "CJpB0000000\nCJpB0000001\nCJpB0000002\n"
+
+    def test_keys_from_sources(self):
+        from instascrape.core._checkpoint import post_key
+
+        assert post_key(Post("https://www.instagram.com/p/CJpB0000000/")) == "CJpB0000000"
+        assert post_key(Post("CJpB0000000")) == "CJpB0000000"
+        assert post_key(Post(_post_dict(0))) is None
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from bs4 import BeautifulSoup
+
+from instascrape import Hashtag, Post
+from instascrape.exceptions.exceptions import InstagramLoginRedirectError
+from instascrape.scrapers.scrape_tools import json_from_html
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _html(*payloads):
+    scripts = "".join(f'<script type="text/javascript">{payload}</script>' for payload in payloads)
+    return (
+        '<!DOCTYPE html><html><head><script src="/static/bundle.js"></script></head>'
+        f'<body><span id="react-root"></span>{scripts}<script>window.__initialDataLoaded();</script></body></html>'
+    )
+
+
+class TestExtractors:
+
+    @pytest.fixture
+    def json_dict(self):
+        return {
+            "config": {"viewer": None},
+            "entry_data": {"TagPage": [{"graphql": {"hashtag": {"id": "1", "name": "kotlin", "count": 1}}}]},
+        }
+
+    @pytest.fixture
+    def html(self, json_dict):
+        return _html(f"window._sharedData = {json.dumps(json_dict)};")
+
+    @pytest.mark.parametrize("extractor", ["scanner", "soup"])
+    def test_json_from_html(self, html, json_dict, extractor):
+        assert json_from_html(html, extractor=extractor) == [json_dict]
+
+    def test_additional_data(self, json_dict):
+        additional_data = {"graphql": {"shortcode_media": {"id": "2"}}, "config": 1}
+        html = _html(
+            f"window._sharedData = {json.dumps(json_dict)};",
+            f"window.__additionalDataLoaded('/p/CJpBmOtAmNr/',{json.dumps(additional_data)});",
+        )
+        assert json_from_html(html) == json_from_html(html, extractor="soup") == [json_dict, additional_data]
+
+    def test_scrape_builds_soup_lazily(self, html):
+        hashtag = Hashtag(html)
+        hashtag.scrape()
+        assert hashtag.name == "kotlin"
+        assert hashtag._soup is None
+        assert isinstance(hashtag.soup, BeautifulSoup)
+        assert "soup" not in hashtag.to_dict()
+
+    def test_scrape_with_soup_extractor(self, html):
+        hashtag = Hashtag(html)
+        hashtag.scrape(extractor="soup")
+        assert hashtag.name == "kotlin"
+        assert isinstance(hashtag._soup, BeautifulSoup)
+
+    def test_login_redirect(self):
+        login_dict = {"config": {}, "entry_data": {"LoginAndSignupPage": [{}]}}
+        with pytest.raises(InstagramLoginRedirectError):
+            Post(_html(f"window._sharedData = {json.dumps(login_dict)};")).scrape()
@@ -0,0 +1,107 @@
+import math
+
+import pytest
+
+from instascrape import Hashtag, Post, ScrapeStats, StatsAggregator, get_stats_aggregator, set_stats_aggregator
+from tests.core.conftest import tag_html
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+@pytest.fixture
+def aggregator():
+    previous = get_stats_aggregator()
+    aggregator = StatsAggregator()
+    set_stats_aggregator(aggregator)
+    yield aggregator
+    set_stats_aggregator(previous)
+
+
+class TestScrapeStats:
+
+    @pytest.mark.parametrize("extractor, stages", [
+        ("scanner", ["scan", "json_loads", "flatten", "parse", "total"]),
+        ("soup", ["soup", "scan", "json_loads", "flatten", "parse", "total"]),
+    ])
+    def test_stages(self, extractor, stages):
+        html = tag_html("kotlin")
+        hashtag = Hashtag(html)
+        hashtag.scrape(extractor=extractor)
+        stats = hashtag.scrape_stats
+        assert list(stats.stages) == stages
+        assert all(seconds >= 0 for seconds in stats.stages.values())
+        assert stats.stages["total"] >= sum(seconds for stage, seconds in stats.stages.items() if stage != "total")
+        assert stats.html_bytes == len(html)
+        assert stats.json_bytes == len(html) - len('<html><script type="text/javascript">window._sharedData = ;</script></html>')
+        assert stats.flat_keys == len(hashtag.flat_json_dict)
+
+    def test_json_source(self):
+        hashtag = Hashtag({"config": {}, "entry_data": {"TagPage": [{"graphql": {"hashtag": {"id": "1", "name": "kotlin"}}}]}})
+        hashtag.scrape()
+        assert list(hashtag.scrape_stats.stages) == ["flatten", "parse", "total"]
+        assert hashtag.scrape_stats.html_bytes is None
+
+    def test_not_returned_by_to_dict(self):
+        hashtag = Hashtag(tag_html("kotlin"))
+        hashtag.scrape()
+        assert "scrape_stats" not in hashtag.to_dict()
+
+    def test_not_inplace(self):
+        hashtag = Hashtag(tag_html("kotlin"))
+        scraped = hashtag.scrape(inplace=False)
+        assert isinstance(scraped.scrape_stats, ScrapeStats)
+
+    def test_disabled(self, aggregator, monkeypatch):
+        monkeypatch.setattr(Hashtag, "collect_stats", False)
+        hashtag = Hashtag(tag_html("kotlin"))
+        hashtag.scrape()
+        assert not hasattr(hashtag, "scrape_stats")
+        assert aggregator.count() == 0
+
+
+class TestStatsAggregator:
+
+    def test_scrapes_are_aggregated(self, aggregator):
+        for i in range(5):
+            Hashtag(tag_html(f"tag{i}")).scrape()
+        assert aggregator.count() == aggregator.count("Hashtag") == 5
+        assert aggregator.count("Post") == 0
+        summary = aggregator.summary()
+        assert list(summary) == ["scan", "json_loads", "flatten", "parse", "total", "html_bytes", "json_bytes", "flat_keys"]
+        assert summary["total"]["count"] == 5
+        assert summary["total"]["p50"] <= summary["total"]["p99"] <= summary["total"]["max"]
+
+    def test_percentiles(self):
+        aggregator = StatsAggregator()
+        for i in range(1, 101):
+            stats = ScrapeStats()
+            stats.stages["total"] = i / 1000
+            stats.html_bytes = i
+            aggregator.record("Post", stats)
+        assert aggregator.percentile("total", 50) == pytest.approx(0.0505)
+        assert aggregator.percentile("html_bytes", 90, kind="Post") == pytest.approx(90.1)
+        assert math.isnan(aggregator.percentile("total", 50, kind="Profile"))
+        assert aggregator.summary(percentiles=(75,))["total"]["p75"] == pytest.approx(0.07525)
+
+    def test_max_samples(self):
+        aggregator = StatsAggregator(max_samples=10)
+        for i in range(25):
+            stats = ScrapeStats()
+            stats.stages["total"] = float(i)
+            aggregator.record("Post", stats)
+        assert aggregator.count() == 10
+        assert aggregator.summary()["total"]["mean"] == pytest.approx(19.5)
+        aggregator.reset()
+        assert aggregator.count() == 0
+
+    def test_post_scrape(self, aggregator):
+        media = {
+            "id": "1",
+            "shortcode": "CJpB0000001",
+            "taken_at_timestamp": 1609459200,
+            "edge_media_to_tagged_user": {"edges": []},
+            "owner": {"full_name": "Chris Greening"},
+        }
+        post = Post({"config": {}, "entry_data": {"PostPage": [{"graphql": {"shortcode_media": media}}]}})
+        post.scrape()
+        assert aggregator.count("Post") == 1